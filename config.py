@@ -38,6 +38,18 @@ DATABASE_CONFIG = {
     "path": str(DATABASE_PATH),
     "backup_path": str(BACKUP_DIR),
     "max_connections": 10,
+    "pool_timeout": 30.0,  # segundos aguardando uma conexão livre no pool
+    "read_cache_rows": 50000,  # linhas guardadas no cache de leitura dos repositórios (0 desativa)
+    # PRAGMAs aplicados uma única vez, ao abrir cada conexão do pool
+    "pragmas": {
+        # WAL: leituras longas em segundo plano (importação, exportação, PDFs)
+        # não bloqueiam as gravações feitas pela interface, e vice-versa
+        "journal_mode": "WAL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+        "cache_size": -8000,  # ~8MB de cache de páginas por conexão
+    },
 }
 
 # Configurações de validação
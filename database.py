@@ -1,58 +1,333 @@
 import sqlite3
 import json
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+from migrations import get_version, migrate
+
+
+class PooledConnection:
+    """Conexão SQLite emprestada pelo pool.
+
+    Encaminha tudo para a conexão real, mas close() devolve a conexão ao
+    pool em vez de fechá-la. Dentro de pool.connection() o commit fica a
+    cargo do bloco mais externo, então commit() vira no-op.
+    """
+
+    def __init__(self, pool, conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+        self._depth = 0      # quantas vezes a thread dona adquiriu a conexão
+        self._managed = 0    # blocos pool.connection() ativos
+        self._owner = None   # thread que está usando a conexão
+        self._last_owner = None
+        self._discard = False
+        self._after_commit = []  # callbacks aguardando o commit do bloco mais externo
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        """Conexão sqlite3 subjacente"""
+        return self._conn
+
+    def close(self):
+        """Devolve a conexão ao pool"""
+        self._pool.release(self)
+
+    def commit(self):
+        if self._managed == 0:
+            self._conn.commit()
+            self._run_after_commit()
+
+    def rollback(self):
+        if self._managed == 0:
+            self._conn.rollback()
+            self._after_commit = []
+
+    def _run_after_commit(self):
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class ConnectionPool:
+    """Pool de conexões SQLite reutilizáveis e afins à thread.
+
+    Cada thread recebe sempre a mesma conexão enquanto a segura (aquisições
+    aninhadas são reentrantes) e, ao pedir outra depois, recebe de volta
+    preferencialmente a última que usou. O número de conexões abertas é
+    limitado por max_connections; acima disso a thread aguarda até timeout.
+    """
+
+    def __init__(self, db_path, max_connections: int = 10, timeout: float = 30.0,
+                 pragmas: dict = None):
+        self.db_path = str(db_path)
+        self.max_connections = max(1, int(max_connections))
+        self.timeout = timeout
+        self.pragmas = dict(pragmas or {})
+        self._cond = threading.Condition()
+        self._idle = []
+        self._open = []
+        self._by_thread = {}
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return PooledConnection(self, conn)
+
+    def _take_idle(self, ident):
+        # Preferir a conexão usada por último por esta mesma thread
+        for index in range(len(self._idle) - 1, -1, -1):
+            if self._idle[index]._last_owner == ident:
+                return self._idle.pop(index)
+        return self._idle.pop() if self._idle else None
+
+    def acquire(self) -> PooledConnection:
+        """Empresta uma conexão para a thread atual"""
+        ident = threading.get_ident()
+        with self._cond:
+            conn = self._by_thread.get(ident)
+            if conn is not None:
+                conn._depth += 1
+                self._hits += 1
+                return conn
+
+            started = None
+            while True:
+                conn = self._take_idle(ident)
+                if conn is not None:
+                    self._hits += 1
+                    break
+                if len(self._open) < self.max_connections:
+                    conn = self._connect()
+                    self._open.append(conn)
+                    self._misses += 1
+                    break
+                if started is None:
+                    started = time.perf_counter()
+                    self._waits += 1
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self._wait_time += time.perf_counter() - started
+                    raise sqlite3.OperationalError(
+                        "Tempo esgotado aguardando uma conexão livre no pool")
+                self._cond.wait(remaining)
+
+            if started is not None:
+                self._wait_time += time.perf_counter() - started
+            conn._depth = 1
+            conn._owner = ident
+            self._by_thread[ident] = conn
+            return conn
+
+    def release(self, conn: PooledConnection):
+        """Devolve uma conexão ao pool"""
+        with self._cond:
+            if conn._depth <= 0:
+                return
+            conn._depth -= 1
+            if conn._depth > 0:
+                return
+            # Trabalho não confirmado é descartado, como faria um close()
+            if conn._conn.in_transaction:
+                conn._conn.rollback()
+            conn._managed = 0
+            conn._after_commit = []
+            self._by_thread.pop(conn._owner, None)
+            conn._last_owner = conn._owner
+            conn._owner = None
+            if conn._discard:
+                conn._conn.close()
+                self._open.remove(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager com commit ao final (ou rollback em caso de erro).
+
+        Blocos aninhados na mesma thread compartilham a conexão e a transação;
+        apenas o bloco mais externo confirma.
+        """
+        conn = self.acquire()
+        conn._managed += 1
+        try:
+            yield conn
+        except BaseException:
+            conn._managed -= 1
+            if conn._managed == 0:
+                conn._conn.rollback()
+                conn._after_commit = []
+            raise
+        else:
+            conn._managed -= 1
+            if conn._managed == 0:
+                conn._conn.commit()
+                conn._run_after_commit()
+        finally:
+            self.release(conn)
+
+    def after_commit(self, callback):
+        """Executa callback após o commit da transação aberta na thread atual
+
+        A transação pode ser um bloco connection() ou uma escrita ainda não
+        confirmada com conn.commit(). Sem transação aberta (escrita já
+        confirmada) executa imediatamente; em rollback o callback é descartado.
+        """
+        with self._cond:
+            conn = self._by_thread.get(threading.get_ident())
+            if conn is not None and (conn._managed > 0 or conn._conn.in_transaction):
+                conn._after_commit.append(callback)
+                return
+        callback()
+
+    def in_transaction(self) -> bool:
+        """Se a conexão da thread atual tem gravações ainda não confirmadas"""
+        with self._cond:
+            conn = self._by_thread.get(threading.get_ident())
+            return conn is not None and conn._conn.in_transaction
+
+    def close_all(self):
+        """Fecha as conexões ociosas; as emprestadas são fechadas ao serem devolvidas"""
+        with self._cond:
+            for conn in self._idle:
+                conn._conn.close()
+                self._open.remove(conn)
+            self._idle = []
+            for conn in self._open:
+                conn._discard = True
+
+    def stats(self) -> dict:
+        """Contadores de uso do pool"""
+        with self._cond:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'waits': self._waits,
+                'wait_time': self._wait_time,
+                'open_connections': len(self._open),
+                'idle_connections': len(self._idle),
+                'in_use': len(self._open) - len(self._idle),
+                'max_connections': self.max_connections,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Cria (ou recria) o pool global de conexões
+def init_pool(db_path=None, max_connections=None):
+    global _pool
+    try:
+        from config import DATABASE_PATH, DATABASE_CONFIG
+    except ImportError:
+        DATABASE_PATH, DATABASE_CONFIG = 'database.db', {}
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = ConnectionPool(
+            db_path or DATABASE_PATH,
+            max_connections=max_connections or DATABASE_CONFIG.get('max_connections', 10),
+            timeout=DATABASE_CONFIG.get('pool_timeout', 30.0),
+            pragmas=DATABASE_CONFIG.get('pragmas'),
+        )
+        return _pool
+
+
+# Retorna o pool global, criando-o na primeira chamada
+def get_pool():
+    if _pool is None:
+        return init_pool()
+    return _pool
+
+
 # Função para conectar ao banco de dados
 def create_connection():
     try:
-        # Usar o caminho do banco de dados do config se disponível
-        try:
-            from config import DATABASE_PATH
-            db_path = DATABASE_PATH
-        except ImportError:
-            db_path = 'database.db'
-        
-        conn = sqlite3.connect(db_path)
-        return conn
+        # A conexão vem do pool; close() a devolve para reutilização
+        return get_pool().acquire()
     except Exception as e:
         print(f"Erro ao conectar ao banco de dados: {e}")
         return None
 
-# Criação das tabelas
+
+# Context manager: "with connection() as conn:" confirma ao final ou desfaz em erro
+def connection():
+    return get_pool().connection()
+
+
+# Executa callback quando a transação aberta na thread for confirmada (ou já, se não houver)
+def after_commit(callback):
+    get_pool().after_commit(callback)
+
+
+# Se a thread atual tem uma transação com gravações pendentes
+def in_transaction():
+    return _pool is not None and _pool.in_transaction()
+
+
+# Estatísticas do pool (acertos, conexões novas e tempo de espera)
+def get_pool_stats():
+    return get_pool().stats()
+
+
+# Fecha as conexões do pool (ex.: antes de restaurar um backup)
+def close_all_connections():
+    if _pool is not None:
+        _pool.close_all()
+
+# Criação/atualização das tabelas (migrações versionadas por PRAGMA user_version)
 def create_tables():
     conn = create_connection()
     if not conn:
         return
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            description TEXT NOT NULL,
-            code TEXT NOT NULL,
-            brand TEXT,
-            status TEXT NOT NULL,
-            quantity REAL NOT NULL,  -- Ajustado para REAL para suportar float
-            suppliers_prices TEXT NOT NULL
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS company (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            cnpj TEXT NOT NULL,
-            buyer_name TEXT NOT NULL
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS suppliers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            cnpj TEXT NOT NULL,
-            seller_name TEXT NOT NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    try:
+        version = get_version(conn)
+        if migrate(conn) != version:
+            # Estatísticas amostradas (sqlite_stat1) para o planejador escolher entre
+            # os índices quando filtro e ordenação pedem índices diferentes; sem
+            # migração nova elas são mantidas por optimize_database ao sair
+            conn.execute('PRAGMA analysis_limit = 1000')
+            conn.execute('ANALYZE')
+            conn.commit()
+    except Exception as e:
+        print(f"Erro ao migrar banco de dados: {e}")
+    finally:
+        conn.close()
+
+# Atualiza as estatísticas do planejador que estiverem desatualizadas (ao encerrar a aplicação)
+def optimize_database():
+    conn = create_connection()
+    if not conn:
+        return
+    try:
+        conn.execute('PRAGMA analysis_limit = 1000')
+        conn.execute('PRAGMA optimize')
+    except Exception as e:
+        print(f"Erro ao otimizar banco de dados: {e}")
+    finally:
+        conn.close()
 
 # Inserir novo item (substitui a função add_item)
 def insert_item(description, code, brand, status, quantity, suppliers_prices):
@@ -116,77 +391,22 @@ def delete_item(item_id):
 
 # Buscar todos os itens
 def get_all_items():
-    conn = create_connection()
-    if not conn:
-        return []
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM items')
-        items = cursor.fetchall()
-        return [(item[0], item[1], item[2], item[3], item[4], item[5], json.loads(item[6])) for item in items]
+        return list(iter_all_items())
     except Exception as e:
         print(f"Erro ao buscar itens: {e}")
         return []
-    finally:
-        conn.close()
 
-# Buscar itens por status
-def get_items_by_status(status):
-    conn = create_connection()
-    if not conn:
-        return []
-    try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM items WHERE status = ?', (status,))
-        items = cursor.fetchall()
-        return [(item[0], item[1], item[2], item[3], item[4], item[5], json.loads(item[6])) for item in items]
-    except Exception as e:
-        print(f"Erro ao buscar itens por status: {e}")
-        return []
-    finally:
-        conn.close()
-
-# Buscar itens por fornecedor
-def get_items_by_supplier(supplier):
-    conn = create_connection()
-    if not conn:
-        return []
-    try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM items')
-        items = cursor.fetchall()
-        result = []
-        for item in items:
-            suppliers_prices = json.loads(item[6])
-            if supplier in suppliers_prices:
-                result.append((item[0], item[1], item[2], item[3], item[4], item[5], suppliers_prices))
-        return result
-    except Exception as e:
-        print(f"Erro ao buscar itens por fornecedor: {e}")
-        return []
-    finally:
-        conn.close()
-
-# Busca combinada por status e fornecedor
-def get_items_by_status_and_supplier(status, supplier):
-    conn = create_connection()
-    if not conn:
-        return []
-    try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM items WHERE status = ?', (status,))
-        items = cursor.fetchall()
-        result = []
-        for item in items:
-            suppliers_prices = json.loads(item[6])
-            if supplier in suppliers_prices:
-                result.append((item[0], item[1], item[2], item[3], item[4], item[5], suppliers_prices))
-        return result
-    except Exception as e:
-        print(f"Erro ao buscar itens por status e fornecedor: {e}")
-        return []
-    finally:
-        conn.close()
+# Percorrer todos os itens em lotes (fetchmany), sem carregar a tabela inteira na memória
+def iter_all_items(batch_size=1000):
+    with connection() as conn:
+        cursor = conn.execute('SELECT * FROM items')
+        while True:
+            items = cursor.fetchmany(batch_size)
+            if not items:
+                break
+            for item in items:
+                yield (item[0], item[1], item[2], item[3], item[4], item[5], json.loads(item[6]))
 
 # Buscar fornecedores (ajustado para buscar a partir de suppliers_prices)
 def get_suppliers():
@@ -303,18 +523,20 @@ def update_supplier(supplier_id, name, cnpj, seller_name):
     finally:
         conn.close()
 
-# Excluir fornecedor
+# Excluir fornecedor (recusado se algum item tiver preço dele); retorna se excluiu
 def delete_supplier(supplier_id):
     conn = create_connection()
     if not conn:
-        return
+        return False
     try:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM suppliers WHERE id = ?', (supplier_id,))
         conn.commit()
         print(f"Fornecedor {supplier_id} excluído")
+        return True
     except Exception as e:
         print(f"Erro ao excluir fornecedor: {e}")
+        return False
     finally:
         conn.close()
 
@@ -2,9 +2,8 @@ import tkinter as tk
 from tkinter import messagebox, ttk, filedialog, simpledialog
 from PIL import Image, ImageTk
 import database
-import openpyxl
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from models import Company, ItemFilter, ItemRepository, OrderRepository
+from services import ImportService, ExportService, PdfService, unknown_suppliers_note
 import sys
 import os
 
@@ -14,6 +13,8 @@ database.create_tables()
 
 # Variáveis globais
 root = tk.Tk()
+# IDs dos itens na ordem em que aparecem na lista (a seleção é por posição)
+listed_ids = []
 root.title("Sistema de Compras")
 root.geometry("1400x800")
 
@@ -66,9 +67,11 @@ def add_item():
 
 def update_item_list(items=None):
     list_items.delete(0, tk.END)
+    listed_ids.clear()
     if items is None:
         items = database.get_all_items()
     for item in items:
+        listed_ids.append(item[0])
         item_text = f"Desc: {item[1]} | Código: {item[2]} | Marca: {item[3] or 'N/A'} | Status: {item[4]} | Qtd: {item[5]} | Forn/Preço: {', '.join([f'{s}: R${p:.2f}' for s, p in item[6].items()])}"
         list_items.insert(tk.END, item_text)
         if item[4] == "A Comprar":
@@ -91,7 +94,7 @@ def remove_item():
     if not selected:
         messagebox.showerror("Erro", "Selecione um item!")
         return
-    item_id = database.get_all_items()[selected[0]][0]
+    item_id = listed_ids[selected[0]]
     database.delete_item(item_id)
     update_item_list()
 
@@ -100,9 +103,10 @@ def mark_as_purchased():
     if not selected:
         messagebox.showerror("Erro", "Selecione um item!")
         return
-    item_id = database.get_all_items()[selected[0]][0]
-    item = database.get_all_items()[selected[0]]
-    database.update_item(item_id, item[1], item[2], item[3], "Comprado", item[5], item[6])
+    item = ItemRepository.get_by_id(listed_ids[selected[0]])
+    if item is None:
+        return
+    database.update_item(item.id, item.description, item.code, item.brand, "Comprado", item.quantity, item.suppliers_prices)
     update_item_list()
 
 def mark_as_partially_purchased():
@@ -110,110 +114,61 @@ def mark_as_partially_purchased():
     if not selected:
         messagebox.showerror("Erro", "Selecione um item!")
         return
-    item_id = database.get_all_items()[selected[0]][0]
-    item = database.get_all_items()[selected[0]]
-    database.update_item(item_id, item[1], item[2], item[3], "Parcialmente Comprado", item[5], item[6])
+    item = ItemRepository.get_by_id(listed_ids[selected[0]])
+    if item is None:
+        return
+    database.update_item(item.id, item.description, item.code, item.brand, "Parcialmente Comprado", item.quantity, item.suppliers_prices)
     update_item_list()
 
 def filter_items():
-    status = combo_status.get()
-    supplier = combo_supplier.get().strip()
-    if status and supplier:
-        items = database.get_items_by_status_and_supplier(status, supplier)
-    elif status:
-        items = database.get_items_by_status(status)
-    elif supplier:
-        items = database.get_items_by_supplier(supplier)
-    else:
-        items = database.get_all_items()
+    item_filter = ItemFilter(status=combo_status.get() or None, supplier=combo_supplier.get().strip() or None)
+    items = [
+        (item.id, item.description, item.code, item.brand, item.status, item.quantity, item.suppliers_prices)
+        for item in ItemRepository.find(item_filter)
+    ]
     update_item_list(items)
 
 def generate_excel():
     supplier = entry_export_supplier.get().strip()
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Itens"
-    ws.append(["Descrição", "Código", "Marca", "Fornecedor", "Preço", "Quantidade", "Status"])
-    items = database.get_all_items() if not supplier else database.get_items_by_supplier(supplier)
-    for item in items:
-        for s, p in item[6].items():
-            ws.append([item[1], item[2], item[3] or 'N/A', s, f"R${p:.2f}", item[5], item[4]])
-    wb.save("itens.xlsx")
-    messagebox.showinfo("Sucesso", "Planilha gerada como 'itens.xlsx'")
+    file_path = filedialog.asksaveasfilename(
+        title="Salvar planilha",
+        defaultextension=".xlsx",
+        initialfile="itens.xlsx",
+        filetypes=[("Excel files", "*.xlsx")]
+    )
+    if not file_path:
+        return
+    # Exportação em streaming (write_only), com preço e quantidade numéricos
+    rows = ExportService().export_items(file_path, supplier or None)
+    message = f"Planilha gerada com {rows} linhas em '{file_path}'"
+    unknown = ItemRepository.get_unregistered_suppliers(supplier=supplier or None)
+    if unknown:
+        message += "\nPreços não exportados de " + unknown_suppliers_note(unknown)
+    messagebox.showinfo("Sucesso", message)
+
 def import_excel():
     try:
         base_path = get_base_path()
         excel_path = os.path.join(base_path, "itens_preenchidos.xlsx")
         if not os.path.exists(excel_path):
             excel_path = filedialog.askopenfilename(
-                title="Selecione o arquivo Excel",
-                filetypes=[("Excel files", "*.xlsx")],
+                title="Selecione a planilha",
+                filetypes=[("Planilhas", "*.xlsx *.csv *.tsv"), ("Excel files", "*.xlsx"),
+                           ("CSV files", "*.csv *.tsv *.txt")],
                 initialdir=base_path
             )
             if not excel_path:
                 messagebox.showwarning("Aviso", "Importação cancelada. Nenhum arquivo selecionado.")
                 return
-        wb = openpyxl.load_workbook(excel_path)
-        ws = wb.active
-        updated_items = 0  # Contador para itens atualizados
-        added_items = 0    # Contador para itens adicionados
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            # Desempacotar os 6 primeiros valores e ignorar o restante
-            description, code, brand, supplier, price, quantity, *rest = row
-            print(f"Lendo da planilha: description={description}, code={code}, brand={brand}, supplier={supplier}, price={price}, quantity={quantity}")
-
-            # Normalizar os valores para comparação
-            description = str(description).strip().upper() if description else ""
-            code = str(code).strip() if code else ""
-            brand = str(brand).strip().upper() if brand else "N/A"
-            supplier = str(supplier).strip() if supplier else ""
-            status = "A Comprar"  # Status padrão para novos itens
-
-            items = database.get_all_items()
-            found_match = False
-            for item in items:
-                # Normalizar os valores do banco para comparação
-                item_description = str(item[1]).strip().upper() if item[1] else ""
-                item_code = str(item[2]).strip() if item[2] else ""
-                item_brand = str(item[3]).strip().upper() if item[3] else "N/A"
-
-                # Comparar descrição, código e marca
-                if (item_description == description and 
-                    item_code == code and 
-                    item_brand == brand):
-                    found_match = True
-                    suppliers_prices = item[6]
-                    if isinstance(price, str):
-                        price = price.replace('R$', '').replace(',', '.').strip()
-                    price_value = float(price) if price else 0.0
-                    print(f"Atualizando item existente (ID={item[0]}): Fornecedor: {supplier}, Novo preço: {price_value}")
-                    suppliers_prices[supplier] = price_value
-                    database.update_item(item[0], item[1], item[2], item[3], status, quantity, suppliers_prices)
-                    updated_items += 1
-                    break
-
-            # Se não encontrou correspondência, adicionar novo item
-            if not found_match and description and code:
-                try:
-                    suppliers_prices = {}
-                    if isinstance(price, str):
-                        price = price.replace('R$', '').replace(',', '.').strip()
-                    price_value = float(price) if price else 0.0
-                    quantity_value = float(quantity) if quantity else 0.0
-                    suppliers_prices[supplier] = price_value
-                    item_id = database.add_item(description, code, brand, quantity_value)  # Adiciona e retorna o ID
-                    if item_id:
-                        database.update_item(item_id, description, code, brand, status, quantity_value, suppliers_prices)
-                        print(f"Adicionado novo item (ID={item_id}): {description}, Preço: {price_value}")
-                        added_items += 1
-                    else:
-                        print(f"Falha ao adicionar item: {description}, {code}")
-                except Exception as e:
-                    print(f"Erro ao adicionar novo item ({description}, {code}): {e}")
+        # Mesmo motor de importação da interface principal (índice único + transação única)
+        result = ImportService().import_file(excel_path)
+        print(f"Importação concluída: {result} em {result.timings['total']:.2f}s")
+        for row_number, errors in result.rejected:
+            print(f"Linha {row_number} rejeitada: {errors}")
 
         update_item_list()
-        if updated_items > 0 or added_items > 0:
-            messagebox.showinfo("Sucesso", f"{updated_items} itens atualizados e {added_items} itens adicionados com sucesso!")
+        if result.updated > 0 or result.added > 0:
+            messagebox.showinfo("Sucesso", f"{result.updated} itens atualizados e {result.added} itens adicionados com sucesso!")
         else:
             messagebox.showwarning("Aviso", "Nenhum item foi atualizado ou adicionado. Verifique se os dados da planilha são válidos.")
     except Exception as e:
@@ -230,25 +185,28 @@ def generate_pdf():
     if not selected_indices:
         messagebox.showerror("Erro", "Selecione pelo menos um item para gerar o pedido!")
         return
-    items = [database.get_all_items()[i] for i in selected_indices]
-    order_number = len(database.get_all_items()) + 1
-    c = canvas.Canvas(f"pedido_{order_number}.pdf", pagesize=letter)
-    c.drawString(100, 750, f"Pedido #{order_number}")
-    c.drawString(100, 730, f"Empresa: {company[1]} - CNPJ: {company[2]}")
-    c.drawString(100, 710, f"Comprador: {company[3]}")
-    y = 690
-    for item in items:
-        # Informações do item
-        item_info = f"I: {item[1]}  Cdg: {item[2]}  M: {item[3] or 'N/A'}  Qtd: {item[5]}"
-        # Preços dos fornecedores
-        prices_str = "  Prç: " + ", ".join([f"{s}: R${p:.2f}" for s, p in item[6].items() if not supplier or s.strip() == supplier])
-        # Combinar tudo em uma única linha
-        full_line = item_info + prices_str
-        # Desenhar na mesma linha
-        c.drawString(100, y, full_line)
-        y -= 30  # Próximo item
-    c.save()
-    messagebox.showinfo("Sucesso", f"Pedido gerado como 'pedido_{order_number}.pdf'")
+    items = [ItemRepository.get_by_id(listed_ids[i]) for i in selected_indices]
+    file_path = filedialog.asksaveasfilename(
+        title="Salvar pedido",
+        defaultextension=".pdf",
+        initialfile=f"pedido_{OrderRepository.next_number()}.pdf",
+        filetypes=[("PDF files", "*.pdf")]
+    )
+    if not file_path:
+        return
+    # Uma linha por item/fornecedor: (item, descrição, código, marca, fornecedor, preço, quantidade)
+    lines = (
+        (item.id, item.description, item.code, item.brand, s, p, item.quantity)
+        for item in items if item is not None
+        for s, p in item.suppliers_prices.items()
+        if not supplier or s.strip() == supplier
+    )
+    order = OrderRepository.create_from_lines(Company.from_tuple(company), lines, supplier or None)
+    if order is None:
+        messagebox.showerror("Erro", "Não foi possível gravar o pedido!")
+        return
+    summary = PdfService().generate_order(file_path, order)
+    messagebox.showinfo("Sucesso", f"Pedido #{order.number} gerado em '{file_path}' ({summary['pages']} página(s))")
 
 def register_company():
     name = entry_company_name.get()
@@ -378,9 +336,11 @@ def delete_supplier():
             if supplier[0] == supplier_id:
                 confirm = messagebox.askyesno("Confirmação", "Tem certeza que deseja excluir este fornecedor?")
                 if confirm:
-                    database.delete_supplier(supplier_id)
-                    messagebox.showinfo("Sucesso", "Fornecedor excluído com sucesso!")
-                    update_supplier_comboboxes()
+                    if database.delete_supplier(supplier_id):
+                        messagebox.showinfo("Sucesso", "Fornecedor excluído com sucesso!")
+                        update_supplier_comboboxes()
+                    else:
+                        messagebox.showerror("Erro", "Falha ao excluir o fornecedor. Verifique se há itens com preço dele.")
                 return
         messagebox.showerror("Erro", "Fornecedor não encontrado!")
 
@@ -480,4 +440,5 @@ compras_menu.add_command(label="Gerar Pedido em PDF", command=generate_pdf)
 # Inicializar os fornecedores
 update_supplier_comboboxes()
 
-root.mainloop()
\ No newline at end of file
+root.mainloop()
+database.optimize_database()
\ No newline at end of file
@@ -3,6 +3,7 @@ Sistema de Compras v2.0 - Arquivo Principal
 """
 import sys
 import os
+import multiprocessing
 from pathlib import Path
 
 # Adicionar o diretório raiz ao path
@@ -22,6 +23,7 @@ def main():
         # Criar e executar a aplicação
         app = MainInterface()
         app.run()
+        database.optimize_database()
         
     except Exception as e:
         print(f"Erro ao iniciar aplicação: {e}")
@@ -41,6 +43,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # Necessário para os processos auxiliares da importação no executável (PyInstaller)
+    multiprocessing.freeze_support()
     main()
 
 
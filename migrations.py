@@ -0,0 +1,559 @@
+"""
+Migrações versionadas do banco de dados do Sistema de Compras
+
+Cada migração tem um número, uma descrição e um passo: um script SQL ou uma
+função que recebe a conexão. O número da última migração aplicada fica em
+PRAGMA user_version; cada passo roda em sua própria transação junto com a
+atualização da versão, então uma falha não deixa o banco pela metade.
+"""
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# Tabelas originais do sistema
+BASE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description TEXT NOT NULL,
+        code TEXT NOT NULL,
+        brand TEXT,
+        status TEXT NOT NULL,
+        quantity REAL NOT NULL,  -- Ajustado para REAL para suportar float
+        suppliers_prices TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS company (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        cnpj TEXT NOT NULL,
+        buyer_name TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS suppliers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        cnpj TEXT NOT NULL,
+        seller_name TEXT NOT NULL
+    );
+'''
+
+# JSON de preços tratado como objeto vazio quando inválido
+_PRICES_JSON = "CASE WHEN json_valid({0}) THEN {0} ELSE '{{}}' END"
+
+# Preços por fornecedor normalizados a partir de items.suppliers_prices.
+# A coluna JSON continua sendo a fonte de Item.suppliers_prices; os triggers
+# mantêm esta tabela sincronizada para que filtros por fornecedor usem índice.
+ITEM_SUPPLIER_PRICES_SCHEMA = f'''
+    CREATE TABLE IF NOT EXISTS item_supplier_prices (
+        item_id INTEGER NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+        supplier_id INTEGER NOT NULL REFERENCES suppliers(id) ON DELETE CASCADE,
+        price REAL NOT NULL,
+        PRIMARY KEY (item_id, supplier_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_item_supplier_prices_supplier
+        ON item_supplier_prices (supplier_id, item_id);
+    CREATE INDEX IF NOT EXISTS idx_suppliers_name ON suppliers (name);
+
+    -- Nomes do JSON sem fornecedor cadastrado ficam apenas no item
+    CREATE TRIGGER IF NOT EXISTS trg_items_prices_insert AFTER INSERT ON items
+    BEGIN
+        INSERT OR REPLACE INTO item_supplier_prices (item_id, supplier_id, price)
+            SELECT NEW.id, (SELECT MIN(s.id) FROM suppliers s WHERE s.name = j.key), j.value
+            FROM json_each({_PRICES_JSON.format('NEW.suppliers_prices')}) j
+            WHERE EXISTS (SELECT 1 FROM suppliers s WHERE s.name = j.key);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_items_prices_update AFTER UPDATE OF suppliers_prices ON items
+    WHEN NEW.suppliers_prices IS NOT OLD.suppliers_prices
+    BEGIN
+        DELETE FROM item_supplier_prices WHERE item_id = NEW.id;
+        INSERT OR REPLACE INTO item_supplier_prices (item_id, supplier_id, price)
+            SELECT NEW.id, (SELECT MIN(s.id) FROM suppliers s WHERE s.name = j.key), j.value
+            FROM json_each({_PRICES_JSON.format('NEW.suppliers_prices')}) j
+            WHERE EXISTS (SELECT 1 FROM suppliers s WHERE s.name = j.key);
+    END;
+
+    -- Excluir um fornecedor remove o preço dele do JSON dos itens
+    CREATE TRIGGER IF NOT EXISTS trg_suppliers_delete_prices BEFORE DELETE ON suppliers
+    BEGIN
+        UPDATE items SET suppliers_prices = (
+            SELECT json_group_object(s.name, p.price)
+            FROM item_supplier_prices p JOIN suppliers s ON s.id = p.supplier_id
+            WHERE p.item_id = items.id AND p.supplier_id <> OLD.id
+        )
+        WHERE id IN (SELECT item_id FROM item_supplier_prices WHERE supplier_id = OLD.id);
+    END;
+
+    -- Renomear um fornecedor renomeia a chave no JSON dos itens
+    CREATE TRIGGER IF NOT EXISTS trg_suppliers_rename_prices AFTER UPDATE OF name ON suppliers
+    WHEN NEW.name IS NOT OLD.name
+    BEGIN
+        UPDATE items SET suppliers_prices = (
+            SELECT json_group_object(s.name, p.price)
+            FROM item_supplier_prices p JOIN suppliers s ON s.id = p.supplier_id
+            WHERE p.item_id = items.id
+        )
+        WHERE id IN (SELECT item_id FROM item_supplier_prices WHERE supplier_id = NEW.id);
+    END;
+'''
+
+BACKFILL_ITEM_SUPPLIER_PRICES = f'''
+    INSERT OR REPLACE INTO item_supplier_prices (item_id, supplier_id, price)
+        SELECT i.id, (SELECT MIN(s.id) FROM suppliers s WHERE s.name = j.key), j.value
+        FROM items i, json_each({_PRICES_JSON.format('i.suppliers_prices')}) j
+        WHERE EXISTS (SELECT 1 FROM suppliers s WHERE s.name = j.key);
+'''
+
+
+# Índices para filtros por status, busca por código e chave natural dos itens
+ITEM_INDEXES = '''
+    CREATE INDEX IF NOT EXISTS idx_items_status ON items (status);
+    CREATE INDEX IF NOT EXISTS idx_items_code ON items (code);
+    CREATE INDEX IF NOT EXISTS idx_items_natural_key ON items (description, code, brand);
+'''
+
+
+def unique_supplier_cnpj(conn: sqlite3.Connection):
+    """CNPJ único por fornecedor (fornecedores criados sem CNPJ ficam de fora)"""
+    duplicates = conn.execute('''
+        SELECT cnpj, COUNT(*) FROM suppliers
+        WHERE cnpj <> ''
+        GROUP BY cnpj HAVING COUNT(*) > 1
+    ''').fetchall()
+    if duplicates:
+        cnpjs = ", ".join(cnpj for cnpj, _ in duplicates)
+        raise sqlite3.IntegrityError(f"Fornecedores com CNPJ duplicado: {cnpjs}")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_suppliers_cnpj ON suppliers (cnpj) WHERE cnpj <> ''")
+
+
+def backup_database(conn: sqlite3.Connection, label: str) -> Optional[str]:
+    """
+    Cópia do banco antes de uma migração que apaga dados
+    
+    Gravada em backups/ ao lado do arquivo do banco (o mesmo diretório do
+    BackupService). Deve ser chamada antes de a migração alterar qualquer
+    coisa; retorna o caminho da cópia, ou None para bancos em memória.
+    """
+    db_file = conn.execute('PRAGMA database_list').fetchone()[2]
+    if not db_file:
+        return None
+    backup_dir = Path(db_file).parent / 'backups'
+    backup_dir.mkdir(exist_ok=True)
+    backup_path = backup_dir / f"backup_{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+    # Lida por outra conexão: a da migração já segura a trava de escrita e
+    # sqlite3.Connection.backup esperaria por ela
+    source = sqlite3.connect(db_file)
+    target = sqlite3.connect(backup_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return str(backup_path)
+
+
+def unique_item_natural_key(conn: sqlite3.Connection):
+    """Chave natural (description, code, brand) única, exigida pelo upsert em lote.
+    
+    Itens repetidos são fundidos no de menor ID: os preços de todos são
+    combinados (os mais recentes prevalecem) e quantidade/status vêm do
+    registro mais recente. Antes da fusão o banco é copiado (backup_database)
+    e os IDs fundidos vão para o log.
+    """
+    groups = conn.execute('''
+        SELECT GROUP_CONCAT(id) FROM items
+        GROUP BY description, code, brand HAVING COUNT(*) > 1
+    ''').fetchall()
+    if groups:
+        backup_path = backup_database(conn, 'antes_migracao_5')
+        logger.warning("%d grupos de itens duplicados serão fundidos; cópia do banco em %s",
+                       len(groups), backup_path)
+    for (ids,) in groups:
+        ids = sorted(int(item_id) for item_id in ids.split(','))
+        placeholders = ','.join('?' * len(ids))
+        rows = conn.execute(
+            f'SELECT id, status, quantity, suppliers_prices FROM items WHERE id IN ({placeholders}) ORDER BY id',
+            ids
+        ).fetchall()
+        prices = {}
+        for _, _, _, suppliers_prices in rows:
+            try:
+                prices.update(json.loads(suppliers_prices) if suppliers_prices else {})
+            except ValueError:
+                pass
+        _, status, quantity, _ = rows[-1]
+        conn.execute(
+            'UPDATE items SET status = ?, quantity = ?, suppliers_prices = ? WHERE id = ?',
+            (status, quantity, json.dumps(prices), ids[0])
+        )
+        duplicates = ','.join('?' * len(ids[1:]))
+        conn.execute(f'DELETE FROM item_supplier_prices WHERE item_id IN ({duplicates})', ids[1:])
+        conn.execute(f'DELETE FROM items WHERE id IN ({duplicates})', ids[1:])
+        logger.warning("Itens %s fundidos no item %d", ', '.join(map(str, ids[1:])), ids[0])
+    conn.execute('DROP INDEX IF EXISTS idx_items_natural_key')
+    conn.execute('CREATE UNIQUE INDEX idx_items_natural_key ON items (description, code, brand)')
+
+
+# Pedidos persistidos: o número do pedido é o id (AUTOINCREMENT, nunca reutilizado)
+# e as linhas guardam uma cópia dos dados do item, para reimpressões fiéis
+ORDERS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        company_name TEXT NOT NULL,
+        company_cnpj TEXT NOT NULL,
+        buyer_name TEXT NOT NULL,
+        supplier TEXT,  -- NULL quando o pedido inclui todos os fornecedores
+        line_count INTEGER NOT NULL DEFAULT 0,
+        total REAL NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS order_lines (
+        order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+        line_no INTEGER NOT NULL,
+        item_id INTEGER REFERENCES items(id) ON DELETE SET NULL,
+        description TEXT NOT NULL,
+        code TEXT NOT NULL,
+        brand TEXT,
+        supplier TEXT NOT NULL,
+        price REAL NOT NULL,
+        quantity REAL NOT NULL,
+        PRIMARY KEY (order_id, line_no)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_order_lines_item ON order_lines (item_id);
+'''
+
+
+# Resumo de estatísticas mantido por triggers, para o dashboard não varrer items.
+# stats_items guarda a contribuição de cada item (status, quantidade e valor =
+# quantidade × menor preço); depois de qualquer alteração no item os triggers o
+# reavaliam: tiram a contribuição gravada, gravam a nova e somam de volta.
+# Alterações de preço só recalculam o valor, com a quantidade gravada. Como cada
+# passo parte do que foi gravado, o resultado não depende da ordem em que os
+# triggers de uma mesma instrução disparam. stats_supplier_summary soma
+# quantidade × preço por fornecedor, também com a quantidade gravada.
+_REFRESH_ITEM_STATS = '''
+        UPDATE stats_supplier_summary SET total_value = total_value +
+            ((SELECT quantity FROM items WHERE id = {0})
+             - COALESCE((SELECT quantity FROM stats_items WHERE item_id = {0}), 0))
+            * (SELECT p.price FROM item_supplier_prices p
+               WHERE p.item_id = {0} AND p.supplier_id = stats_supplier_summary.supplier_id)
+        WHERE (SELECT quantity FROM items WHERE id = {0})
+              IS NOT (SELECT quantity FROM stats_items WHERE item_id = {0})
+          AND EXISTS (SELECT 1 FROM items WHERE id = {0})
+          AND supplier_id IN (SELECT supplier_id FROM item_supplier_prices WHERE item_id = {0});
+        UPDATE stats_summary SET
+            item_count = item_count - 1,
+            total_value = total_value - (SELECT value FROM stats_items WHERE item_id = {0})
+        WHERE status = (SELECT status FROM stats_items WHERE item_id = {0});
+        DELETE FROM stats_items WHERE item_id = {0};
+        INSERT INTO stats_items (item_id, status, quantity, value)
+            SELECT id, status, quantity,
+                   quantity * COALESCE((SELECT MIN(price) FROM item_supplier_prices WHERE item_id = {0}), 0)
+            FROM items WHERE id = {0};
+        INSERT INTO stats_summary (status, item_count, total_value)
+            SELECT status, 1, value FROM stats_items WHERE item_id = {0}
+            ON CONFLICT (status) DO UPDATE SET
+                item_count = item_count + 1,
+                total_value = total_value + excluded.total_value;
+        DELETE FROM stats_summary WHERE item_count <= 0;
+'''
+
+# Novo valor do item após mudança nos preços (status e quantidade não mudam)
+_REFRESH_ITEM_VALUE = '''
+        UPDATE stats_summary SET total_value = total_value + (
+            SELECT quantity * COALESCE((SELECT MIN(price) FROM item_supplier_prices WHERE item_id = {0}), 0) - value
+            FROM stats_items WHERE item_id = {0})
+        WHERE status = (SELECT status FROM stats_items WHERE item_id = {0});
+        UPDATE stats_items SET
+            value = quantity * COALESCE((SELECT MIN(price) FROM item_supplier_prices WHERE item_id = {0}), 0)
+        WHERE item_id = {0};
+'''
+
+# Contribuição de um preço ao resumo do fornecedor (sinal 1 ao incluir, -1 ao remover)
+_SUPPLIER_STATS_DELTA = '''
+        INSERT INTO stats_supplier_summary (supplier_id, item_count, total_value)
+            SELECT {supplier}, {sign}, {sign} * COALESCE(
+                (SELECT quantity FROM stats_items WHERE item_id = {item}), 0) * {price}
+            WHERE true
+            ON CONFLICT (supplier_id) DO UPDATE SET
+                item_count = item_count + excluded.item_count,
+                total_value = total_value + excluded.total_value;
+        DELETE FROM stats_supplier_summary WHERE item_count <= 0;
+'''
+
+# Sincronização dos preços refeita com upsert: a exclusão implícita do
+# INSERT OR REPLACE não dispara triggers de DELETE e deixaria o resumo errado
+# (ex.: JSON com chaves repetidas após renomear um fornecedor para um nome existente)
+_SYNC_ITEM_PRICES = f'''
+        INSERT INTO item_supplier_prices (item_id, supplier_id, price)
+            SELECT NEW.id, (SELECT MIN(s.id) FROM suppliers s WHERE s.name = j.key), j.value
+            FROM json_each({_PRICES_JSON.format('NEW.suppliers_prices')}) j
+            WHERE EXISTS (SELECT 1 FROM suppliers s WHERE s.name = j.key)
+            ON CONFLICT (item_id, supplier_id) DO UPDATE SET price = excluded.price;
+'''
+
+STATS_SCHEMA = f'''
+    CREATE TABLE IF NOT EXISTS stats_items (
+        item_id INTEGER PRIMARY KEY,
+        status TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        value REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS stats_summary (
+        status TEXT PRIMARY KEY,
+        item_count INTEGER NOT NULL,
+        total_value REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS stats_supplier_summary (
+        supplier_id INTEGER PRIMARY KEY,
+        item_count INTEGER NOT NULL,
+        total_value REAL NOT NULL
+    );
+
+    DROP TRIGGER IF EXISTS trg_items_prices_insert;
+    CREATE TRIGGER trg_items_prices_insert AFTER INSERT ON items
+    BEGIN {_SYNC_ITEM_PRICES} END;
+
+    DROP TRIGGER IF EXISTS trg_items_prices_update;
+    CREATE TRIGGER trg_items_prices_update AFTER UPDATE OF suppliers_prices ON items
+    WHEN NEW.suppliers_prices IS NOT OLD.suppliers_prices
+    BEGIN
+        DELETE FROM item_supplier_prices WHERE item_id = NEW.id;
+        {_SYNC_ITEM_PRICES}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_stats_items_insert AFTER INSERT ON items
+    BEGIN {_REFRESH_ITEM_STATS.format('NEW.id')} END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_stats_items_update AFTER UPDATE OF status, quantity ON items
+    WHEN NEW.status IS NOT OLD.status OR NEW.quantity IS NOT OLD.quantity
+    BEGIN {_REFRESH_ITEM_STATS.format('NEW.id')} END;
+
+    -- Os preços saem antes do item (sem depender de ON DELETE CASCADE), ainda
+    -- com a quantidade gravada para o resumo dos fornecedores
+    CREATE TRIGGER IF NOT EXISTS trg_stats_items_before_delete BEFORE DELETE ON items
+    BEGIN
+        DELETE FROM item_supplier_prices WHERE item_id = OLD.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_stats_items_delete AFTER DELETE ON items
+    BEGIN
+        UPDATE stats_summary SET
+            item_count = item_count - 1,
+            total_value = total_value - (SELECT value FROM stats_items WHERE item_id = OLD.id)
+        WHERE status = (SELECT status FROM stats_items WHERE item_id = OLD.id);
+        DELETE FROM stats_items WHERE item_id = OLD.id;
+        DELETE FROM stats_summary WHERE item_count <= 0;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_stats_prices_insert AFTER INSERT ON item_supplier_prices
+    BEGIN
+        {_SUPPLIER_STATS_DELTA.format(supplier='NEW.supplier_id', item='NEW.item_id', price='NEW.price', sign=1)}
+        {_REFRESH_ITEM_VALUE.format('NEW.item_id')}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_stats_prices_update AFTER UPDATE ON item_supplier_prices
+    BEGIN
+        {_SUPPLIER_STATS_DELTA.format(supplier='OLD.supplier_id', item='OLD.item_id', price='OLD.price', sign=-1)}
+        {_SUPPLIER_STATS_DELTA.format(supplier='NEW.supplier_id', item='NEW.item_id', price='NEW.price', sign=1)}
+        {_REFRESH_ITEM_VALUE.format('OLD.item_id')}
+        {_REFRESH_ITEM_VALUE.format('NEW.item_id')}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_stats_prices_delete AFTER DELETE ON item_supplier_prices
+    BEGIN
+        {_SUPPLIER_STATS_DELTA.format(supplier='OLD.supplier_id', item='OLD.item_id', price='OLD.price', sign=-1)}
+        {_REFRESH_ITEM_VALUE.format('OLD.item_id')}
+    END;
+'''
+
+# Recalcula o resumo do zero a partir de items e item_supplier_prices
+REBUILD_STATS = '''
+    DELETE FROM stats_items;
+    DELETE FROM stats_summary;
+    DELETE FROM stats_supplier_summary;
+    INSERT INTO stats_items (item_id, status, quantity, value)
+        SELECT i.id, i.status, i.quantity,
+               i.quantity * COALESCE((SELECT MIN(p.price) FROM item_supplier_prices p WHERE p.item_id = i.id), 0)
+        FROM items i;
+    INSERT INTO stats_summary (status, item_count, total_value)
+        SELECT status, COUNT(*), SUM(value) FROM stats_items GROUP BY status;
+    INSERT INTO stats_supplier_summary (supplier_id, item_count, total_value)
+        SELECT p.supplier_id, COUNT(*), SUM(s.quantity * p.price)
+        FROM item_supplier_prices p JOIN stats_items s ON s.item_id = p.item_id
+        GROUP BY p.supplier_id;
+'''
+
+# Busca textual de itens: índice FTS5 de conteúdo externo (o texto fica só em
+# items) com índices de prefixo para a busca enquanto se digita
+ITEMS_FTS_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        description, code, brand,
+        content='items', content_rowid='id',
+        tokenize='unicode61', prefix='1 2 3'
+    )
+'''
+
+ITEMS_FTS_TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_fts_insert AFTER INSERT ON items
+    BEGIN
+        INSERT INTO items_fts (rowid, description, code, brand)
+            VALUES (NEW.id, NEW.description, NEW.code, NEW.brand);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_fts_delete AFTER DELETE ON items
+    BEGIN
+        INSERT INTO items_fts (items_fts, rowid, description, code, brand)
+            VALUES ('delete', OLD.id, OLD.description, OLD.code, OLD.brand);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_fts_update AFTER UPDATE OF description, code, brand ON items
+    WHEN NEW.description IS NOT OLD.description OR NEW.code IS NOT OLD.code OR NEW.brand IS NOT OLD.brand
+    BEGIN
+        INSERT INTO items_fts (items_fts, rowid, description, code, brand)
+            VALUES ('delete', OLD.id, OLD.description, OLD.code, OLD.brand);
+        INSERT INTO items_fts (rowid, description, code, brand)
+            VALUES (NEW.id, NEW.description, NEW.code, NEW.brand);
+    END
+    ''',
+]
+
+
+def items_full_text_search(conn: sqlite3.Connection):
+    """Índice de busca textual dos itens, se o SQLite tiver FTS5
+    
+    Sem FTS5 a migração não cria nada e ItemRepository.search usa LIKE.
+    """
+    try:
+        conn.execute(ITEMS_FTS_TABLE)
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 indisponível, a busca de itens usará LIKE: {e}")
+        return
+    for trigger in ITEMS_FTS_TRIGGERS:
+        conn.execute(trigger)
+    conn.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+
+# Índice de marca para o filtro de itens (ItemFilter.brand)
+ITEM_BRAND_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_items_brand ON items (brand);
+'''
+
+# Preços já gravados no JSON dos itens para o nome de NEW (só o primeiro
+# fornecedor com esse nome, como nos triggers dos itens)
+_LINK_SUPPLIER_PRICES = f'''
+        INSERT INTO item_supplier_prices (item_id, supplier_id, price)
+            SELECT i.id, NEW.id, j.value
+            FROM items i, json_each({_PRICES_JSON.format('i.suppliers_prices')}) j
+            WHERE j.key = NEW.name
+              AND NOT EXISTS (SELECT 1 FROM suppliers s WHERE s.name = NEW.name AND s.id < NEW.id)
+            ON CONFLICT (item_id, supplier_id) DO UPDATE SET price = excluded.price;
+'''
+
+# Os preços só apontam para fornecedores cadastrados: nomes desconhecidos no
+# JSON (ex.: erros de digitação) ficam apenas no item, sem criar fornecedores
+# fora do feed de alterações. Cadastrar o fornecedor depois vincula esses preços.
+REGISTERED_SUPPLIER_PRICES = f'''
+    DROP TRIGGER IF EXISTS trg_items_prices_insert;
+    CREATE TRIGGER trg_items_prices_insert AFTER INSERT ON items
+    BEGIN {_SYNC_ITEM_PRICES} END;
+
+    DROP TRIGGER IF EXISTS trg_items_prices_update;
+    CREATE TRIGGER trg_items_prices_update AFTER UPDATE OF suppliers_prices ON items
+    WHEN NEW.suppliers_prices IS NOT OLD.suppliers_prices
+    BEGIN
+        DELETE FROM item_supplier_prices WHERE item_id = NEW.id;
+        {_SYNC_ITEM_PRICES}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_suppliers_link_prices AFTER INSERT ON suppliers
+    BEGIN {_LINK_SUPPLIER_PRICES} END;
+
+    -- O JSON é renomeado chave a chave: preços de fornecedores não cadastrados continuam nele
+    DROP TRIGGER IF EXISTS trg_suppliers_rename_prices;
+    CREATE TRIGGER trg_suppliers_rename_prices AFTER UPDATE OF name ON suppliers
+    WHEN NEW.name IS NOT OLD.name
+    BEGIN
+        UPDATE items SET suppliers_prices = (
+            SELECT json_group_object(CASE WHEN j.key = OLD.name THEN NEW.name ELSE j.key END, j.value)
+            FROM json_each({_PRICES_JSON.format('items.suppliers_prices')}) j
+        )
+        WHERE id IN (SELECT item_id FROM item_supplier_prices WHERE supplier_id = NEW.id);
+        {_LINK_SUPPLIER_PRICES}
+    END;
+'''
+
+# Excluir um fornecedor não mexe mais no JSON dos itens: é recusado enquanto
+# algum item tiver preço dele
+RESTRICT_SUPPLIER_DELETE = '''
+    DROP TRIGGER IF EXISTS trg_suppliers_delete_prices;
+    CREATE TRIGGER IF NOT EXISTS trg_suppliers_delete_restrict BEFORE DELETE ON suppliers
+    WHEN EXISTS (SELECT 1 FROM item_supplier_prices WHERE supplier_id = OLD.id)
+    BEGIN
+        SELECT RAISE(ABORT, 'Fornecedor com preços em itens não pode ser excluído');
+    END;
+'''
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+# Migrações em ordem; nunca altere uma migração já publicada, acrescente outra
+MIGRATIONS: List[Tuple[int, str, Step]] = [
+    (1, "Tabelas iniciais", BASE_SCHEMA),
+    (2, "Preços por fornecedor normalizados", ITEM_SUPPLIER_PRICES_SCHEMA + BACKFILL_ITEM_SUPPLIER_PRICES),
+    (3, "Índices de itens", ITEM_INDEXES),
+    (4, "CNPJ único de fornecedores", unique_supplier_cnpj),
+    (5, "Chave natural única de itens", unique_item_natural_key),
+    (6, "Pedidos e linhas de pedido", ORDERS_SCHEMA),
+    (7, "Resumo de estatísticas", STATS_SCHEMA + REBUILD_STATS),
+    (8, "Busca textual de itens", items_full_text_search),
+    (9, "Índice de marca dos itens", ITEM_BRAND_INDEX),
+    (10, "Preços apenas de fornecedores cadastrados", REGISTERED_SUPPLIER_PRICES),
+    (11, "Exclusão de fornecedores com preços recusada", RESTRICT_SUPPLIER_DELETE),
+]
+
+CURRENT_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    """Versão do esquema gravada no banco"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Aplica as migrações pendentes e retorna a versão final do esquema
+    
+    Um banco já na versão atual custa uma única leitura de PRAGMA user_version.
+    Se uma migração falhar ela é desfeita, o erro é propagado e as seguintes
+    não são aplicadas.
+    """
+    version = get_version(conn)
+    if version >= CURRENT_VERSION:
+        return version
+    
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        try:
+            if callable(step):
+                conn.execute("BEGIN IMMEDIATE")
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+            else:
+                conn.executescript(f"BEGIN IMMEDIATE; {step} PRAGMA user_version = {number}; COMMIT;")
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            print(f"Falha na migração {number} ({description})")
+            raise
+        print(f"Migração {number} aplicada: {description}")
+        version = number
+    
+    return version
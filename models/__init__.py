@@ -1,13 +1,19 @@
 """
 Módulo de modelos do Sistema de Compras
 """
-from .item import Item, ItemRepository
+from .item import Item, ItemFilter, ItemRow, ItemRepository
 from .company import Company, CompanyRepository
 from .supplier import Supplier, SupplierRepository
+from .order import Order, OrderRepository
+from .changes import ChangeEvent, ChangeFeed, change_feed
+from .cache import ReadCache, read_cache
 
 __all__ = [
-    'Item', 'ItemRepository',
+    'Item', 'ItemFilter', 'ItemRow', 'ItemRepository',
     'Company', 'CompanyRepository', 
-    'Supplier', 'SupplierRepository'
+    'Supplier', 'SupplierRepository',
+    'Order', 'OrderRepository',
+    'ChangeEvent', 'ChangeFeed', 'change_feed',
+    'ReadCache', 'read_cache'
 ]
 
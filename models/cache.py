@@ -0,0 +1,265 @@
+"""
+Cache de leitura dos repositórios do Sistema de Compras
+
+Guarda, por entidade, as linhas lidas por ID (mapa de identidade) e os
+resultados de consultas, em um LRU limitado pelo total de linhas. As
+gravações dos repositórios chegam pelo feed de alterações e invalidam
+exatamente os IDs gravados e as consultas que podem ter mudado; gravações de
+outros processos (ou de código que não publica no feed, como as funções
+legadas de database.py) são percebidas pelo PRAGMA data_version e esvaziam o
+cache.
+
+O cache guarda as tuplas lidas do banco, não os objetos: os modelos são
+mutáveis (as telas editam e salvam o objeto recebido), então cada leitura
+monta um objeto novo a partir da linha guardada.
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+import database
+from .changes import change_feed, ChangeEvent, ITEMS, COMPANIES, SUPPLIERS
+
+# Consultas afetadas por uma gravação em cada entidade: os resumos por fornecedor
+# somam os itens e os filtros de itens usam o nome do fornecedor
+QUERY_DEPENDENCIES = {
+    ITEMS: (ITEMS, SUPPLIERS),
+    SUPPLIERS: (SUPPLIERS, ITEMS),
+    COMPANIES: (COMPANIES,),
+}
+
+# Linhas guardadas de outras entidades alteradas por uma gravação: renomear um
+# fornecedor reescreve os preços dos itens (trigger trg_suppliers_rename_prices)
+ROW_DEPENDENCIES = {
+    SUPPLIERS: (ITEMS,),
+}
+
+_MISSING = object()
+
+
+def fetch_one(sql: str, params=()) -> Optional[tuple]:
+    """Primeira linha da consulta (para carregar entradas do cache)"""
+    with database.connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def fetch_all(sql: str, params=()) -> list:
+    """Todas as linhas da consulta (para carregar entradas do cache)"""
+    with database.connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+class ReadCache:
+    """
+    LRU de linhas e consultas com invalidação pelas gravações
+
+    Cada entrada pesa o número de linhas que guarda; ao passar de max_rows as
+    menos usadas saem, e resultados maiores que max_rows / 10 não são guardados.
+
+    Args:
+        max_rows: Limite de linhas guardadas (0 desativa o cache)
+    """
+
+    def __init__(self, max_rows: int = 50000):
+        self.max_rows = max_rows
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # chave -> (valor, peso)
+        self._queries: Dict[str, Set[tuple]] = {}  # entidade -> chaves das consultas guardadas
+        self._rows = 0
+        # Contador por entidade, incrementado a cada invalidação: uma leitura que
+        # começou antes de uma gravação não guarda o resultado (poderia estar velho)
+        self._generations: Dict[str, int] = {}
+        self._pool = None
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._data_version = None
+        # data_version da conexão de cada thread no gancho de escrita; ele não
+        # muda com os commits da própria conexão, só com os de outras
+        self._write_versions: Dict[int, Optional[int]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._external_clears = 0
+
+    def row(self, entity: str, record_id: int, load: Callable[[], Optional[tuple]]) -> Optional[tuple]:
+        """Linha do registro (ou None se não existe), lida por load() apenas na falta"""
+        return self._get(entity, (entity, 'id', record_id), load, seed_rows=False)
+
+    def query(self, entity: str, key: Hashable, load: Callable[[], Any], rows: bool = False) -> Any:
+        """
+        Resultado da consulta identificada por key, executada por load() apenas na falta
+
+        Args:
+            rows: O resultado é uma lista de linhas completas da entidade (ID na
+                primeira coluna); elas também passam a responder às buscas por ID
+        """
+        return self._get(entity, (entity, 'query', key), load, seed_rows=rows)
+
+    def invalidate(self, entity: str, ids=()):
+        """Descarta as linhas dos IDs e as consultas afetadas por uma gravação na entidade"""
+        with self._lock:
+            self._invalidations += 1
+            for dependent in QUERY_DEPENDENCIES.get(entity, (entity,)):
+                self._generations[dependent] = self._generations.get(dependent, 0) + 1
+                for key in list(self._queries.get(dependent, ())):
+                    self._discard(key)
+            for record_id in ids:
+                self._discard((entity, 'id', record_id))
+            for dependent in ROW_DEPENDENCIES.get(entity, ()):
+                for key in [key for key in self._entries if key[0] == dependent and key[1] == 'id']:
+                    self._discard(key)
+
+    def clear(self):
+        """Esvazia o cache"""
+        with self._lock:
+            self._entries.clear()
+            self._queries.clear()
+            self._rows = 0
+            for entity in list(self._generations) + list(QUERY_DEPENDENCIES):
+                self._generations[entity] = self._generations.get(entity, 0) + 1
+
+    def close(self):
+        """Esvazia o cache e fecha a conexão usada para ler o data_version"""
+        with self._lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+            self._version_conn = None
+            self._pool = None
+            self.clear()
+
+    def stats(self) -> dict:
+        """Acertos, faltas, invalidações e ocupação do cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'invalidations': self._invalidations,
+                'external_clears': self._external_clears,
+                'entries': len(self._entries),
+                'rows': self._rows,
+                'max_rows': self.max_rows,
+            }
+
+    def on_write(self, event: ChangeEvent):
+        """Gancho de escrita do feed: chamado antes do commit, com a trava de escrita do banco"""
+        with self._lock:
+            # Gravações de terceiros confirmadas antes desta ainda não percebidas
+            self._check_database()
+            self._write_versions[threading.get_ident()] = self._connection_version()
+            self.invalidate(event.entity, event.ids)
+
+    def on_commit(self, event: ChangeEvent):
+        """Assinante do feed: chamado após o commit da gravação"""
+        with self._lock:
+            # Leituras feitas entre a publicação e o commit viram o dado antigo
+            self.invalidate(event.entity, event.ids)
+            if self._sync_pool():
+                return
+            # O commit desta gravação muda o data_version sem ser alteração externa,
+            # mas outra conexão pode ter gravado desde o gancho de escrita: a
+            # conexão que gravou só vê mudar o seu data_version nesse caso. A
+            # referência é lida antes da conferência para não perder um commit no meio
+            version = self._read_data_version()
+            written = self._write_versions.get(threading.get_ident())
+            if version is None or written is None or written != self._connection_version():
+                if self._entries:
+                    self._external_clears += 1
+                self.clear()
+            self._data_version = version
+
+    def _get(self, entity: str, key: tuple, load: Callable[[], Any], seed_rows: bool) -> Any:
+        if self.max_rows <= 0 or database.in_transaction():
+            # Dentro de uma transação com gravações a leitura vê dados ainda não
+            # confirmados, que um rollback desfaria sem passar pelo feed
+            return load()
+        with self._lock:
+            self._check_database()
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+            generation = self._generations.get(entity, 0)
+
+        # A consulta roda fora da trava; só é guardada se nada foi gravado nesse meio-tempo
+        value = load()
+        with self._lock:
+            weight = len(value) if isinstance(value, list) else 1
+            if self._generations.get(entity, 0) == generation and weight <= self.max_rows // 10:
+                self._store(key, value, weight)
+                if seed_rows:
+                    for row in value:
+                        self._store((entity, 'id', row[0]), row, 1)
+        return value
+
+    def _store(self, key: tuple, value: Any, weight: int):
+        self._discard(key)
+        self._entries[key] = (value, weight)
+        if key[1] == 'query':
+            self._queries.setdefault(key[0], set()).add(key)
+        self._rows += weight
+        while self._rows > self.max_rows:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._rows -= entry[1]
+            if key[1] == 'query':
+                self._queries[key[0]].discard(key)
+
+    def _sync_pool(self) -> bool:
+        """Recomeça vazio se o pool foi recriado (outro banco); retorna True nesse caso"""
+        pool = database.get_pool()
+        if pool is self._pool:
+            return False
+        if self._version_conn is not None:
+            self._version_conn.close()
+        self._pool = pool
+        # Conexão própria, fora do pool: o data_version muda a cada commit de outra conexão
+        self._version_conn = sqlite3.connect(pool.db_path, timeout=0, check_same_thread=False)
+        self.clear()
+        self._data_version = self._read_data_version()
+        return True
+
+    def _check_database(self):
+        """Esvazia o cache se o banco mudou de arquivo ou foi alterado por outra conexão"""
+        if self._sync_pool():
+            return
+        version = self._read_data_version()
+        if version is None or version != self._data_version:
+            if self._entries:
+                self._external_clears += 1
+            self.clear()
+            self._data_version = version
+
+    def _connection_version(self) -> Optional[int]:
+        """data_version da conexão do pool em uso pela thread atual (a que grava)"""
+        conn = database.get_pool().acquire()
+        try:
+            return conn.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
+
+    def _read_data_version(self) -> Optional[int]:
+        # None (banco travado para escrita) conta como alteração
+        try:
+            return self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+
+try:
+    from config import DATABASE_CONFIG
+except ImportError:
+    DATABASE_CONFIG = {}
+
+read_cache = ReadCache(DATABASE_CONFIG.get('read_cache_rows', 50000))
+change_feed.add_write_hook(read_cache.on_write)
+for _entity in QUERY_DEPENDENCIES:
+    change_feed.subscribe(_entity, read_cache.on_commit)
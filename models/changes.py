@@ -0,0 +1,80 @@
+"""
+Feed de alterações do Sistema de Compras
+
+Os repositórios publicam aqui o que gravaram (entidade, ação e IDs) e as views
+assinam para atualizar apenas as linhas afetadas, sem recarregar as listas.
+A entrega acontece depois do commit da transação: gravações desfeitas não
+chegam aos assinantes. Ganchos de escrita (ex.: o cache de leitura) são
+chamados já na publicação, ainda dentro da transação.
+"""
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from database import after_commit
+
+# Entidades
+ITEMS = 'items'
+COMPANIES = 'company'
+SUPPLIERS = 'suppliers'
+
+# Ações; em UPDATE os IDs podem incluir registros novos (ex.: bulk_upsert)
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+
+
+class ChangeEvent(NamedTuple):
+    """Alteração confirmada em uma entidade"""
+    entity: str
+    action: str
+    ids: Tuple[int, ...]
+
+
+ChangeCallback = Callable[[ChangeEvent], None]
+
+
+class ChangeFeed:
+    """Distribui as alterações gravadas pelos repositórios aos assinantes"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[ChangeCallback]] = {}
+        self._write_hooks: List[ChangeCallback] = []
+
+    def subscribe(self, entity: str, callback: ChangeCallback) -> ChangeCallback:
+        """Passa a receber as alterações da entidade; retorna o próprio callback"""
+        self._subscribers.setdefault(entity, []).append(callback)
+        return callback
+
+    def unsubscribe(self, entity: str, callback: ChangeCallback):
+        """Deixa de receber as alterações da entidade"""
+        callbacks = self._subscribers.get(entity, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def add_write_hook(self, callback: ChangeCallback):
+        """Passa a receber toda alteração no momento da publicação, antes do commit"""
+        self._write_hooks.append(callback)
+
+    def publish(self, entity: str, action: str, ids: Iterable[int]):
+        """
+        Entrega a alteração aos assinantes quando a transação atual for confirmada
+
+        Deve ser chamado antes do commit, com a transação (e a trava de escrita)
+        ainda aberta: os ganchos de escrita são chamados aqui mesmo.
+        """
+        ids = tuple(ids)
+        if ids:
+            event = ChangeEvent(entity, action, ids)
+            for hook in self._write_hooks:
+                hook(event)
+            after_commit(lambda: self._dispatch(event))
+
+    def _dispatch(self, event: ChangeEvent):
+        # Cópia da lista: um assinante pode se descadastrar durante a entrega
+        for callback in list(self._subscribers.get(event.entity, [])):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Erro ao notificar alteração em {event.entity}: {e}")
+
+
+change_feed = ChangeFeed()
@@ -3,11 +3,15 @@ Modelo de Empresa para o Sistema de Compras
 """
 from typing import Optional, List, Tuple
 from database import create_connection
+from .cache import read_cache, fetch_one, fetch_all
+from .changes import change_feed, COMPANIES, INSERT, UPDATE, DELETE
 
 
 class Company:
     """Classe que representa uma empresa"""
     
+    __slots__ = ('id', 'name', 'cnpj', 'buyer_name')
+    
     def __init__(self, id: int = None, name: str = "", cnpj: str = "", buyer_name: str = ""):
         self.id = id
         self.name = name
@@ -71,6 +75,7 @@ class CompanyRepository:
                 INSERT INTO company (name, cnpj, buyer_name)
                 VALUES (?, ?, ?)
             ''', (company.name, company.cnpj, company.buyer_name))
+            change_feed.publish(COMPANIES, INSERT, [cursor.lastrowid])
             conn.commit()
             return cursor.lastrowid
         except Exception as e:
@@ -82,56 +87,33 @@ class CompanyRepository:
     @staticmethod
     def get_by_id(company_id: int) -> Optional[Company]:
         """Busca uma empresa por ID"""
-        conn = create_connection()
-        if not conn:
-            return None
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM company WHERE id = ?', (company_id,))
-            result = cursor.fetchone()
+            result = read_cache.row(COMPANIES, company_id,
+                                    lambda: fetch_one('SELECT * FROM company WHERE id = ?', (company_id,)))
             return Company.from_tuple(result) if result else None
         except Exception as e:
             print(f"Erro ao buscar empresa {company_id}: {e}")
             return None
-        finally:
-            conn.close()
     
     @staticmethod
     def get_all() -> List[Company]:
         """Busca todas as empresas"""
-        conn = create_connection()
-        if not conn:
-            return []
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM company ORDER BY id DESC')
-            results = cursor.fetchall()
+            results = read_cache.query(COMPANIES, 'all', lambda: fetch_all('SELECT * FROM company ORDER BY id DESC'), rows=True)
             return [Company.from_tuple(result) for result in results]
         except Exception as e:
             print(f"Erro ao buscar todas as empresas: {e}")
             return []
-        finally:
-            conn.close()
     
     @staticmethod
     def get_default() -> Optional[Company]:
         """Busca a empresa padrão (primeira cadastrada)"""
-        conn = create_connection()
-        if not conn:
-            return None
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM company LIMIT 1')
-            result = cursor.fetchone()
+            result = read_cache.query(COMPANIES, 'default', lambda: fetch_one('SELECT * FROM company LIMIT 1'))
             return Company.from_tuple(result) if result else None
         except Exception as e:
             print(f"Erro ao buscar empresa padrão: {e}")
             return None
-        finally:
-            conn.close()
     
     @staticmethod
     def update(company: Company) -> bool:
@@ -147,6 +129,8 @@ class CompanyRepository:
                 SET name = ?, cnpj = ?, buyer_name = ?
                 WHERE id = ?
             ''', (company.name, company.cnpj, company.buyer_name, company.id))
+            if cursor.rowcount > 0:
+                change_feed.publish(COMPANIES, UPDATE, [company.id])
             conn.commit()
             return cursor.rowcount > 0
         except Exception as e:
@@ -165,6 +149,8 @@ class CompanyRepository:
         try:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM company WHERE id = ?', (company_id,))
+            if cursor.rowcount > 0:
+                change_feed.publish(COMPANIES, DELETE, [company_id])
             conn.commit()
             return cursor.rowcount > 0
         except Exception as e:
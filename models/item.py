@@ -2,12 +2,23 @@
 Modelo de Item para o Sistema de Compras
 """
 import json
-from typing import Dict, List, Optional, Tuple
-from database import create_connection
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from database import create_connection, connection
+from .cache import read_cache, fetch_one, fetch_all
+from .changes import change_feed, ITEMS, INSERT, UPDATE, DELETE
 
 
 class Item:
-    """Classe que representa um item do sistema de compras"""
+    """Classe que representa um item do sistema de compras
+    
+    Sem __dict__ por instância (__slots__); os preços lidos do banco ficam
+    no JSON original e só são decodificados no primeiro acesso a
+    suppliers_prices, já que as listas mostram apenas os demais campos.
+    """
+    
+    __slots__ = ('id', 'description', 'code', 'brand', 'status', 'quantity',
+                 '_suppliers_prices', '_prices_json')
     
     def __init__(self, id: int = None, description: str = "", code: str = "", 
                  brand: str = "", status: str = "A Comprar", quantity: float = 0.0, 
@@ -18,7 +29,26 @@ class Item:
         self.brand = brand or "N/A"
         self.status = status
         self.quantity = float(quantity) if quantity else 0.0
-        self.suppliers_prices = suppliers_prices or {}
+        self.suppliers_prices = suppliers_prices
+    
+    @property
+    def suppliers_prices(self) -> Dict[str, float]:
+        """Preço por fornecedor"""
+        if self._suppliers_prices is None:
+            self._suppliers_prices = json.loads(self._prices_json) if self._prices_json else {}
+            self._prices_json = None
+        return self._suppliers_prices
+    
+    @suppliers_prices.setter
+    def suppliers_prices(self, suppliers_prices: Optional[Dict[str, float]]):
+        self._suppliers_prices = suppliers_prices or {}
+        self._prices_json = None
+    
+    def prices_json(self) -> str:
+        """Preços em JSON, como gravados no banco (sem decodificar os que ainda não foram lidos)"""
+        if self._suppliers_prices is None:
+            return self._prices_json or '{}'
+        return json.dumps(self._suppliers_prices)
     
     def to_dict(self) -> Dict:
         """Converte o item para dicionário"""
@@ -35,16 +65,13 @@ class Item:
     @classmethod
     def from_tuple(cls, data: Tuple) -> 'Item':
         """Cria um Item a partir de uma tupla do banco de dados"""
-        suppliers_prices = json.loads(data[6]) if data[6] else {}
-        return cls(
-            id=data[0],
-            description=data[1],
-            code=data[2],
-            brand=data[3],
-            status=data[4],
-            quantity=data[5],
-            suppliers_prices=suppliers_prices
-        )
+        item = cls.__new__(cls)
+        item.id, item.description, item.code, item.status = data[0], data[1], data[2], data[4]
+        item.brand = data[3] or "N/A"
+        item.quantity = float(data[5]) if data[5] else 0.0
+        item._suppliers_prices = None
+        item._prices_json = data[6]
+        return item
     
     def validate(self) -> List[str]:
         """Valida os dados do item e retorna lista de erros"""
@@ -93,6 +120,193 @@ class Item:
         return self.__str__()
 
 
+class ItemRow(NamedTuple):
+    """Campos de um item exibidos nas listas, lidos sem a coluna de preços"""
+    id: int
+    description: str
+    code: str
+    brand: str
+    status: str
+    quantity: float
+    
+    @classmethod
+    def from_tuple(cls, data: Tuple) -> 'ItemRow':
+        """Cria a linha a partir das colunas de ItemRow._fields, com os mesmos ajustes de Item"""
+        return cls(data[0], data[1], data[2], data[3] or "N/A", data[4], float(data[5]) if data[5] else 0.0)
+
+
+def select_columns(columns: Optional[Tuple[str, ...]]) -> str:
+    """Lista de colunas do SELECT de itens (None para todas)"""
+    return ', '.join(f'items.{column}' for column in columns) if columns else 'items.*'
+
+
+# Ordenações da paginação: colunas da chave (únicas em conjunto) e direção.
+# Cada uma é coberta por um índice (o rowid faz parte de todo índice), então
+# uma página custa uma busca no índice seguida de LIMIT linhas.
+PAGE_ORDERS = {
+    'id': (('id',), 'DESC'),
+    'description': (('description', 'code', 'brand'), 'ASC'),
+    'code': (('code', 'id'), 'ASC'),
+    'status': (('status', 'id'), 'ASC'),
+}
+
+
+# Termos da busca: sequências de letras e dígitos, como no tokenizador unicode61
+SEARCH_TOKEN = re.compile(r'[^\W_]+')
+
+# Pesos do bm25 por coluna do índice (descrição, código, marca): acertos no código pesam mais
+SEARCH_WEIGHTS = (1.0, 4.0, 0.5)
+
+# Candidatos ordenados por relevância: os mais recentes que casam com a busca.
+# Limitar o conjunto evita calcular o bm25 de centenas de milhares de linhas
+# quando o termo é muito comum (ex.: uma marca presente em boa parte dos itens).
+SEARCH_CANDIDATES = 1000
+
+# O bm25 conta em quantos itens cada termo aparece, percorrendo o índice todo:
+# termos de 1 ou 2 letras casam com quase tudo e pouco dizem sobre relevância,
+# então a ordenação por relevância só é usada quando todos os termos têm este tamanho
+SEARCH_RANK_MIN_LENGTH = 3
+
+
+def build_search_query(text: str) -> str:
+    """Consulta FTS5 em que cada termo digitado é um prefixo: 'paraf 10' -> '"paraf"* "10"*'"""
+    return ' '.join(f'"{token}"*' for token in SEARCH_TOKEN.findall(text.lower()))
+
+
+def _has_search_index(conn) -> bool:
+    """Se o banco tem o índice FTS5 de itens (ver migração 8)"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_fts'"
+    ).fetchone() is not None
+
+
+def _like_conditions(tokens: List[str]) -> Tuple[List[str], list]:
+    """Busca sem o índice FTS5: cada termo precisa aparecer em descrição, código ou marca"""
+    conditions = ['(items.description LIKE ? OR items.code LIKE ? OR items.brand LIKE ?)'] * len(tokens)
+    return conditions, [f'%{token}%' for token in tokens for _ in range(3)]
+
+
+class ItemFilter(NamedTuple):
+    """
+    Filtro de itens combinável, compilado em uma única consulta parametrizada
+    
+    Campos vazios (None ou '') não filtram. É imutável: um filtro derivado sai
+    de _replace (ex.: item_filter._replace(status='Comprado')). Status, marca,
+    fornecedor e texto usam índices; as faixas filtram as linhas encontradas.
+    
+    Campos:
+        status: Status do item
+        supplier: Nome de um fornecedor com preço cadastrado para o item
+        brand: Marca do item
+        min_price, max_price: Faixa de um preço cotado (do fornecedor filtrado, se houver)
+        min_quantity, max_quantity: Faixa de quantidade
+        text: Termos buscados por prefixo em descrição, código e marca
+        order_by: Uma das chaves de PAGE_ORDERS
+    """
+    status: Optional[str] = None
+    supplier: Optional[str] = None
+    brand: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_quantity: Optional[float] = None
+    max_quantity: Optional[float] = None
+    text: Optional[str] = None
+    order_by: str = 'id'
+    
+    def where(self, conn) -> Tuple[List[str], list]:
+        """Condições do filtro (colunas qualificadas por items.) e seus parâmetros"""
+        conditions: List[str] = []
+        params: list = []
+        if self.status:
+            conditions.append('items.status = ?')
+            params.append(self.status)
+        if self.brand:
+            conditions.append('items.brand = ?')
+            params.append(self.brand)
+        if self.min_quantity is not None:
+            conditions.append('items.quantity >= ?')
+            params.append(self.min_quantity)
+        if self.max_quantity is not None:
+            conditions.append('items.quantity <= ?')
+            params.append(self.max_quantity)
+        
+        # Fornecedor e preço saem da tabela normalizada, a partir do índice de suppliers.name
+        prices: List[str] = []
+        if self.supplier:
+            prices.append('s.name = ?')
+            params.append(self.supplier)
+        if self.min_price is not None:
+            prices.append('p.price >= ?')
+            params.append(self.min_price)
+        if self.max_price is not None:
+            prices.append('p.price <= ?')
+            params.append(self.max_price)
+        if prices:
+            join = ' JOIN suppliers s ON s.id = p.supplier_id' if self.supplier else ''
+            conditions.append(
+                f"items.id IN (SELECT p.item_id FROM item_supplier_prices p{join} WHERE {' AND '.join(prices)})"
+            )
+        
+        tokens = SEARCH_TOKEN.findall((self.text or '').lower())
+        if tokens:
+            if _has_search_index(conn):
+                conditions.append('items.id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)')
+                params.append(build_search_query(self.text))
+            else:
+                like, like_params = _like_conditions(tokens)
+                conditions.extend(like)
+                params.extend(like_params)
+        return conditions, params
+    
+    def compile(self, conn, limit: Optional[int] = None, after_key: Optional[tuple] = None,
+                columns: Optional[Tuple[str, ...]] = None) -> Tuple[str, list]:
+        """
+        Monta a consulta do filtro
+        
+        Args:
+            conn: Conexão (define se o texto usa o índice FTS5 ou LIKE)
+            limit: Máximo de itens (None para todos)
+            after_key: Chave de ordenação do último item já recebido (paginação keyset)
+            columns: Colunas de items retornadas (None para todas)
+        
+        Returns:
+            SQL e parâmetros
+        """
+        if self.order_by not in PAGE_ORDERS:
+            raise ValueError(f"Ordenação inválida: {self.order_by}")
+        keys, direction = PAGE_ORDERS[self.order_by]
+        if columns and not set(keys) <= set(columns):
+            raise ValueError(f"As colunas retornadas precisam incluir a ordenação {keys}")
+        order = ', '.join(f'{column} {direction}' for column in keys)
+        conditions, params = self.where(conn)
+        limit = -1 if limit is None else limit
+        select = select_columns(columns)
+        
+        if after_key is None:
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+            return f'SELECT {select} FROM items{where} ORDER BY {order} LIMIT ?', params + [limit]
+        
+        # (a, b) > (x, y) só usa o índice na primeira coluna; cada ramo fixa as
+        # colunas anteriores por igualdade e busca a seguinte por intervalo
+        operator = '<' if direction == 'DESC' else '>'
+        branches = []
+        branch_params: list = []
+        for size in range(len(keys), 0, -1):
+            keyset = [f'items.{column} = ?' for column in keys[:size - 1]]
+            keyset.append(f'items.{keys[size - 1]} {operator} ?')
+            branches.append(
+                f"SELECT * FROM (SELECT {select} FROM items WHERE {' AND '.join(conditions + keyset)} "
+                f"ORDER BY {order} LIMIT ?)"
+            )
+            branch_params.extend(params)
+            branch_params.extend(after_key[:size])
+            branch_params.append(limit)
+        return (
+            f"SELECT * FROM ({' UNION ALL '.join(branches)}) ORDER BY {order} LIMIT ?",
+            branch_params + [limit]
+        )
+
+
 class ItemRepository:
     """Repositório para operações de Item no banco de dados"""
     
@@ -114,10 +328,11 @@ class ItemRepository:
                 item.brand, 
                 item.status, 
                 item.quantity, 
-                json.dumps(item.suppliers_prices)
+                item.prices_json()
             ))
-            conn.commit()
             item_id = cursor.lastrowid
+            change_feed.publish(ITEMS, INSERT, [item_id])
+            conn.commit()
             return item_id
         except Exception as e:
             print(f"Erro ao criar item: {e}")
@@ -128,79 +343,282 @@ class ItemRepository:
     @staticmethod
     def get_by_id(item_id: int) -> Optional[Item]:
         """Busca um item por ID"""
-        conn = create_connection()
-        if not conn:
-            return None
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM items WHERE id = ?', (item_id,))
-            result = cursor.fetchone()
+            result = read_cache.row(ITEMS, item_id, lambda: fetch_one('SELECT * FROM items WHERE id = ?', (item_id,)))
             return Item.from_tuple(result) if result else None
         except Exception as e:
             print(f"Erro ao buscar item {item_id}: {e}")
             return None
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def get_row(item_id: int) -> Optional[ItemRow]:
+        """Campos de lista de um item (sem ler os preços)"""
+        try:
+            result = read_cache.query(ITEMS, ('row', item_id), lambda: fetch_one(
+                f'SELECT {select_columns(ItemRow._fields)} FROM items WHERE id = ?', (item_id,)
+            ))
+            return ItemRow.from_tuple(result) if result else None
+        except Exception as e:
+            print(f"Erro ao buscar item {item_id}: {e}")
+            return None
     
     @staticmethod
     def get_all() -> List[Item]:
         """Busca todos os itens"""
-        conn = create_connection()
-        if not conn:
-            return []
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM items ORDER BY id DESC')
-            results = cursor.fetchall()
+            results = read_cache.query(ITEMS, 'all', lambda: fetch_all('SELECT * FROM items ORDER BY id DESC'), rows=True)
             return [Item.from_tuple(result) for result in results]
         except Exception as e:
             print(f"Erro ao buscar todos os itens: {e}")
             return []
-        finally:
-            conn.close()
     
     @staticmethod
     def get_by_status(status: str) -> List[Item]:
         """Busca itens por status"""
-        conn = create_connection()
-        if not conn:
+        return ItemRepository.find(ItemFilter(status=status))
+    
+    @staticmethod
+    def get_by_supplier(supplier: str) -> List[Item]:
+        """Busca itens por fornecedor"""
+        return ItemRepository.find(ItemFilter(supplier=supplier))
+    
+    @staticmethod
+    def get_unregistered_suppliers(item_ids: Optional[Iterable[int]] = None,
+                                   supplier: Optional[str] = None) -> List[str]:
+        """
+        Nomes com preço no JSON dos itens que não têm fornecedor cadastrado
+        
+        Esses preços ficam apenas no item: não entram em exportações, pedidos
+        nem nos resumos por fornecedor até o fornecedor ser cadastrado.
+        
+        Args:
+            item_ids: Restringe aos itens informados (None para todos)
+            supplier: Restringe a este nome (None para todos)
+        """
+        conditions = ['NOT EXISTS (SELECT 1 FROM suppliers s WHERE s.name = j.key)']
+        params: list = []
+        if supplier:
+            conditions.append('j.key = ?')
+            params.append(supplier)
+        if item_ids is not None:
+            item_ids = list(item_ids)
+            conditions.append(f"i.id IN ({','.join('?' * len(item_ids))})")
+            params.extend(item_ids)
+        try:
+            with connection() as conn:
+                cursor = conn.execute(f'''
+                    SELECT DISTINCT j.key FROM items i, json_each(
+                        CASE WHEN json_valid(i.suppliers_prices) THEN i.suppliers_prices ELSE '{{}}' END
+                    ) j
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY j.key
+                ''', params)
+                return [name for name, in cursor]
+        except Exception as e:
+            print(f"Erro ao buscar fornecedores não cadastrados: {e}")
             return []
+    
+    @staticmethod
+    def find(item_filter: Optional[ItemFilter] = None, limit: Optional[int] = None,
+             after_id: Optional[int] = None) -> List[Item]:
+        """
+        Busca os itens que atendem ao filtro, na ordenação do filtro
+        
+        Com after_id a busca continua depois daquele item (paginação keyset):
+        em vez de OFFSET, a página seguinte começa depois da chave de ordenação
+        do último item recebido, então o custo não depende da posição na lista.
         
+        Args:
+            item_filter: Filtro (None para todos os itens, mais recentes primeiro)
+            limit: Máximo de itens (None para todos)
+            after_id: ID do último item da página anterior (None para a primeira página)
+        """
+        item_filter = ItemRepository._checked_filter(item_filter)
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM items WHERE status = ? ORDER BY id DESC', (status,))
-            results = cursor.fetchall()
-            return [Item.from_tuple(result) for result in results]
+            return [Item.from_tuple(result) for result in ItemRepository._find(item_filter, limit, after_id)]
         except Exception as e:
-            print(f"Erro ao buscar itens por status: {e}")
+            print(f"Erro ao filtrar itens: {e}")
             return []
-        finally:
-            conn.close()
     
     @staticmethod
-    def get_by_supplier(supplier: str) -> List[Item]:
-        """Busca itens por fornecedor"""
-        conn = create_connection()
-        if not conn:
+    def find_rows(item_filter: Optional[ItemFilter] = None, limit: Optional[int] = None,
+                  after_id: Optional[int] = None) -> List[ItemRow]:
+        """Como find, mas retorna apenas os campos exibidos nas listas (sem ler os preços)"""
+        item_filter = ItemRepository._checked_filter(item_filter)
+        try:
+            return [ItemRow.from_tuple(result)
+                    for result in ItemRepository._find(item_filter, limit, after_id, ItemRow._fields)]
+        except Exception as e:
+            print(f"Erro ao filtrar itens: {e}")
             return []
+    
+    @staticmethod
+    def iter_items(item_filter: Optional[ItemFilter] = None, batch_size: int = 1000) -> Iterator[Item]:
+        """
+        Percorre os itens do filtro, na ordenação do filtro, lendo o cursor em lotes (fetchmany)
+        
+        A memória usada não depende do número de itens e o primeiro item chega
+        antes de a consulta terminar. A conexão (e a trava de leitura do banco)
+        fica presa até o fim da iteração: consuma o gerador até o fim ou feche-o.
+        """
+        for rows in ItemRepository._iter(ItemRepository._checked_filter(item_filter), batch_size):
+            for row in rows:
+                yield Item.from_tuple(row)
+    
+    @staticmethod
+    def iter_rows(item_filter: Optional[ItemFilter] = None, batch_size: int = 1000) -> Iterator[ItemRow]:
+        """Como iter_items, mas apenas com os campos exibidos nas listas (sem ler os preços)"""
+        for rows in ItemRepository._iter(ItemRepository._checked_filter(item_filter), batch_size, ItemRow._fields):
+            for row in rows:
+                yield ItemRow.from_tuple(row)
+    
+    @staticmethod
+    def _iter(item_filter: ItemFilter, batch_size: int,
+              columns: Optional[Tuple[str, ...]] = None) -> Iterator[List[tuple]]:
+        # Sem o cache de leitura: o resultado pode ser a tabela inteira
+        with connection() as conn:
+            sql, params = item_filter.compile(conn, columns=columns)
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+    
+    @staticmethod
+    def _checked_filter(item_filter: Optional[ItemFilter]) -> ItemFilter:
+        if item_filter is None:
+            item_filter = ItemFilter()
+        if item_filter.order_by not in PAGE_ORDERS:
+            raise ValueError(f"Ordenação inválida: {item_filter.order_by}")
+        return item_filter
+    
+    @staticmethod
+    def _find(item_filter: ItemFilter, limit: Optional[int], after_id: Optional[int],
+              columns: Optional[Tuple[str, ...]] = None) -> list:
+        def load():
+            with connection() as conn:
+                after_key = None
+                if after_id is not None:
+                    keys = PAGE_ORDERS[item_filter.order_by][0]
+                    after_key = conn.execute(
+                        f"SELECT {', '.join(keys)} FROM items WHERE id = ?", (after_id,)
+                    ).fetchone()
+                    if after_key is None:
+                        return []
+                sql, params = item_filter.compile(conn, limit, after_key, columns)
+                return conn.execute(sql, params).fetchall()
+        
+        return read_cache.query(ITEMS, ('find', columns, item_filter, limit, after_id), load, rows=columns is None)
+    
+    @staticmethod
+    def get_page(after_id: Optional[int] = None, limit: int = 100, order_by: str = 'id') -> List[Item]:
+        """
+        Busca uma página de itens por paginação keyset (ver find)
         
+        Args:
+            after_id: ID do último item da página anterior (None para a primeira página)
+            limit: Itens por página
+            order_by: Uma das chaves de PAGE_ORDERS ('id' lista os mais recentes primeiro)
+        """
+        return ItemRepository.find(ItemFilter(order_by=order_by), limit, after_id)
+    
+    @staticmethod
+    def search(query: str, limit: int = 50, item_filter: Optional[ItemFilter] = None) -> List[Item]:
+        """
+        Busca itens por descrição, código e marca enquanto o usuário digita
+        
+        Cada termo casa como prefixo de uma palavra e todos precisam aparecer.
+        Com o índice FTS5 (items_fts) os resultados vêm por relevância (bm25)
+        entre os SEARCH_CANDIDATES itens mais recentes que casam (havendo
+        termo curto, os mais recentes primeiro); sem o índice, a busca usa
+        LIKE e também traz os itens mais recentes primeiro.
+        
+        Args:
+            query: Texto digitado
+            limit: Máximo de itens
+            item_filter: Restringe a busca aos itens do filtro (texto e ordenação do filtro são ignorados)
+        """
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM items')
-            results = cursor.fetchall()
-            items = []
-            for result in results:
-                item = Item.from_tuple(result)
-                if supplier in item.suppliers_prices:
-                    items.append(item)
-            return items
+            return [Item.from_tuple(result) for result in ItemRepository._search(query, limit, item_filter)]
         except Exception as e:
-            print(f"Erro ao buscar itens por fornecedor: {e}")
+            print(f"Erro ao buscar itens: {e}")
             return []
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def search_rows(query: str, limit: int = 50, item_filter: Optional[ItemFilter] = None) -> List[ItemRow]:
+        """Como search, mas retorna apenas os campos exibidos nas listas (sem ler os preços)"""
+        try:
+            return [ItemRow.from_tuple(result)
+                    for result in ItemRepository._search(query, limit, item_filter, ItemRow._fields)]
+        except Exception as e:
+            print(f"Erro ao buscar itens: {e}")
+            return []
+    
+    @staticmethod
+    def _search(query: str, limit: int, item_filter: Optional[ItemFilter],
+                columns: Optional[Tuple[str, ...]] = None) -> list:
+        tokens = SEARCH_TOKEN.findall(query.lower())
+        if not tokens:
+            return []
+        if item_filter is not None:
+            item_filter = item_filter._replace(text=None, order_by='id')
+        select = select_columns(columns)
+        
+        def load():
+            with connection() as conn:
+                return ItemRepository._run_search(conn, query, tokens, limit, item_filter, select).fetchall()
+        
+        return read_cache.query(ITEMS, ('search', columns, tuple(tokens), limit, item_filter), load,
+                                rows=columns is None)
+    
+    @staticmethod
+    def _run_search(conn, query: str, tokens: List[str], limit: int, item_filter: Optional[ItemFilter], select: str):
+        conditions, params = item_filter.where(conn) if item_filter else ([], [])
+        if _has_search_index(conn):
+            if all(len(token) >= SEARCH_RANK_MIN_LENGTH for token in tokens):
+                score = f"bm25(items_fts, {', '.join(str(weight) for weight in SEARCH_WEIGHTS)})"
+            else:
+                score = '0'
+            # Em ordem de rowid o FTS5 para ao atingir o LIMIT dos candidatos; o
+            # CROSS JOIN mantém o índice de busca como tabela externa da junção
+            where = ''.join(f' AND {condition}' for condition in conditions)
+            cursor = conn.execute(f'''
+                SELECT {select} FROM (
+                    SELECT items_fts.rowid AS id, {score} AS score
+                    FROM items_fts CROSS JOIN items ON items.id = items_fts.rowid
+                    WHERE items_fts MATCH ?{where}
+                    ORDER BY items_fts.rowid DESC LIMIT ?
+                ) AS found
+                JOIN items ON items.id = found.id
+                ORDER BY found.score, found.id DESC
+                LIMIT ?
+            ''', [build_search_query(query)] + params + [max(limit, SEARCH_CANDIDATES), limit])
+        else:
+            like, like_params = _like_conditions(tokens)
+            cursor = conn.execute(
+                f"SELECT {select} FROM items WHERE {' AND '.join(conditions + like)} ORDER BY items.id DESC LIMIT ?",
+                params + like_params + [limit]
+            )
+        return cursor
+    
+    @staticmethod
+    def count(item_filter: Optional[ItemFilter] = None) -> int:
+        """Número de itens cadastrados (ou que atendem ao filtro)"""
+        if item_filter is not None:
+            item_filter = item_filter._replace(order_by='id')
+        
+        def load():
+            with connection() as conn:
+                conditions, params = item_filter.where(conn) if item_filter else ([], [])
+                where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+                return conn.execute(f'SELECT COUNT(*) FROM items{where}', params).fetchone()[0]
+        
+        try:
+            return read_cache.query(ITEMS, ('count', item_filter), load)
+        except Exception as e:
+            print(f"Erro ao contar itens: {e}")
+            return 0
     
     @staticmethod
     def update(item: Item) -> bool:
@@ -221,9 +639,11 @@ class ItemRepository:
                 item.brand, 
                 item.status, 
                 item.quantity, 
-                json.dumps(item.suppliers_prices),
+                item.prices_json(),
                 item.id
             ))
+            if cursor.rowcount > 0:
+                change_feed.publish(ITEMS, UPDATE, [item.id])
             conn.commit()
             return cursor.rowcount > 0
         except Exception as e:
@@ -242,6 +662,8 @@ class ItemRepository:
         try:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM items WHERE id = ?', (item_id,))
+            if cursor.rowcount > 0:
+                change_feed.publish(ITEMS, DELETE, [item_id])
             conn.commit()
             return cursor.rowcount > 0
         except Exception as e:
@@ -250,25 +672,139 @@ class ItemRepository:
         finally:
             conn.close()
     
+    @staticmethod
+    def bulk_create(items: Iterable[Item]) -> List[int]:
+        """
+        Cria vários itens em uma única transação
+        
+        Cada linha é gravada com RETURNING id, como em bulk_upsert, em vez de
+        supor IDs consecutivos.
+        
+        Returns:
+            IDs gerados, na ordem dos itens (também atribuídos a item.id)
+        
+        Raises:
+            sqlite3.Error: Se a gravação falhar; nenhum item é gravado
+        """
+        items = list(items)
+        if not items:
+            return []
+        
+        with connection() as conn:
+            ids = [
+                conn.execute('''
+                    INSERT INTO items (description, code, brand, status, quantity, suppliers_prices)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    RETURNING id
+                ''', (item.description, item.code, item.brand, item.status,
+                      item.quantity, item.prices_json())).fetchone()[0]
+                for item in items
+            ]
+            change_feed.publish(ITEMS, INSERT, ids)
+        for item, item_id in zip(items, ids):
+            item.id = item_id
+        return ids
+    
+    @staticmethod
+    def bulk_update(items: Iterable[Item]) -> int:
+        """
+        Atualiza vários itens em uma única transação
+        
+        Returns:
+            Número de itens atualizados (itens sem registro no banco não contam)
+        
+        Raises:
+            sqlite3.Error: Se a gravação falhar; nenhum item é atualizado
+        """
+        rows = [
+            (item.description, item.code, item.brand, item.status,
+             item.quantity, item.prices_json(), item.id)
+            for item in items
+        ]
+        if not rows:
+            return 0
+        
+        with connection() as conn:
+            cursor = conn.executemany('''
+                UPDATE items
+                SET description = ?, code = ?, brand = ?, status = ?, quantity = ?, suppliers_prices = ?
+                WHERE id = ?
+            ''', rows)
+            change_feed.publish(ITEMS, UPDATE, [row[-1] for row in rows])
+            return cursor.rowcount
+    
+    @staticmethod
+    def bulk_upsert(items: Iterable[Item]) -> List[int]:
+        """
+        Insere ou atualiza itens pela chave natural (descrição, código, marca)
+        
+        Itens já existentes recebem a nova quantidade e têm os preços por
+        fornecedor mesclados aos atuais; o status é preservado. Cada linha é
+        gravada com RETURNING id (o executemany não devolve linhas), tudo em
+        uma única transação.
+        
+        Returns:
+            IDs dos itens, na ordem recebida (também atribuídos a item.id)
+        
+        Raises:
+            sqlite3.Error: Se a gravação falhar; nenhum item é gravado
+        """
+        items = list(items)
+        if not items:
+            return []
+        
+        with connection() as conn:
+            ids = []
+            for item in items:
+                item.id = conn.execute('''
+                    INSERT INTO items (description, code, brand, status, quantity, suppliers_prices)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (description, code, brand) DO UPDATE SET
+                        quantity = excluded.quantity,
+                        suppliers_prices = json_patch(
+                            CASE WHEN json_valid(items.suppliers_prices) THEN items.suppliers_prices ELSE '{}' END,
+                            excluded.suppliers_prices
+                        )
+                    RETURNING id
+                ''', (item.description, item.code, item.brand, item.status,
+                      item.quantity, item.prices_json())).fetchone()[0]
+                ids.append(item.id)
+            change_feed.publish(ITEMS, UPDATE, ids)
+        return ids
+    
     @staticmethod
     def get_statistics() -> Dict:
-        """Retorna estatísticas dos itens"""
-        items = ItemRepository.get_all()
+        """
+        Retorna estatísticas dos itens
         
-        total_items = len(items)
-        status_counts = {}
-        total_value = 0.0
+        Lê o resumo por status mantido pelos triggers (stats_summary): poucas
+        linhas, independente do número de itens. O valor total é quantidade ×
+        menor preço de cada item.
+        """
+        stats = {
+            'total_items': 0,
+            'status_counts': {},
+            'total_value': 0.0,
+        }
         
-        for item in items:
-            status_counts[item.status] = status_counts.get(item.status, 0) + 1
-            total_value += item.get_total_value()
+        conn = create_connection()
+        if conn:
+            try:
+                cursor = conn.execute('SELECT status, item_count, total_value FROM stats_summary')
+                for status, count, value in cursor:
+                    stats['status_counts'][status] = count
+                    stats['total_items'] += count
+                    stats['total_value'] += value
+            except Exception as e:
+                print(f"Erro ao calcular estatísticas dos itens: {e}")
+            finally:
+                conn.close()
         
-        return {
-            'total_items': total_items,
-            'status_counts': status_counts,
-            'total_value': total_value,
+        status_counts = stats['status_counts']
+        stats.update({
             'items_to_buy': status_counts.get('A Comprar', 0),
             'items_purchased': status_counts.get('Comprado', 0),
             'items_partial': status_counts.get('Parcialmente Comprado', 0)
-        }
+        })
+        return stats
 
@@ -0,0 +1,247 @@
+"""
+Modelo de Pedido para o Sistema de Compras
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from database import create_connection, connection
+from .item import ItemRepository
+
+
+class Order:
+    """Classe que representa um pedido de compra gravado"""
+
+    def __init__(self, id: int = None, created_at: str = "", company_name: str = "",
+                 company_cnpj: str = "", buyer_name: str = "", supplier: Optional[str] = None,
+                 line_count: int = 0, total: float = 0.0, unknown_suppliers: Optional[List[str]] = None):
+        self.id = id
+        self.created_at = created_at
+        self.company_name = company_name
+        self.company_cnpj = company_cnpj
+        self.buyer_name = buyer_name
+        self.supplier = supplier
+        self.line_count = line_count
+        self.total = total
+        # Fornecedores não cadastrados cujos preços ficaram fora do pedido (não é gravado)
+        self.unknown_suppliers = unknown_suppliers or []
+
+    @property
+    def number(self) -> int:
+        """Número do pedido (o próprio ID, nunca reutilizado)"""
+        return self.id
+
+    def to_dict(self) -> Dict:
+        """Converte o pedido para dicionário"""
+        return {
+            'id': self.id,
+            'created_at': self.created_at,
+            'company_name': self.company_name,
+            'company_cnpj': self.company_cnpj,
+            'buyer_name': self.buyer_name,
+            'supplier': self.supplier,
+            'line_count': self.line_count,
+            'total': self.total
+        }
+
+    @classmethod
+    def from_tuple(cls, data: Tuple) -> 'Order':
+        """Cria um Order a partir de uma tupla do banco de dados"""
+        return cls(
+            id=data[0],
+            created_at=data[1],
+            company_name=data[2],
+            company_cnpj=data[3],
+            buyer_name=data[4],
+            supplier=data[5],
+            line_count=data[6],
+            total=data[7]
+        )
+
+    def header_lines(self) -> List[str]:
+        """Linhas de identificação impressas no pedido"""
+        lines = [
+            f"Empresa: {self.company_name} - CNPJ: {self.company_cnpj}",
+            f"Comprador: {self.buyer_name}",
+        ]
+        if self.supplier:
+            lines.append(f"Fornecedor: {self.supplier}")
+        lines.append(f"Data: {self.created_at}")
+        return lines
+
+    def __str__(self) -> str:
+        return f"Order({self.id}): {self.supplier or 'Todos'} - {self.line_count} linhas"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# Linhas do pedido a partir dos preços normalizados, na ordem da listagem de itens
+_INSERT_LINES_FROM_ITEMS = '''
+    INSERT INTO order_lines (order_id, line_no, item_id, description, code, brand, supplier, price, quantity)
+    SELECT ?, ROW_NUMBER() OVER (ORDER BY i.id DESC, p.supplier_id),
+           i.id, i.description, i.code, COALESCE(NULLIF(i.brand, ''), 'N/A'), s.name, p.price, i.quantity
+    FROM items i
+    JOIN item_supplier_prices p ON p.item_id = i.id
+    JOIN suppliers s ON s.id = p.supplier_id
+'''
+
+
+class OrderRepository:
+    """Repositório para operações de Order no banco de dados"""
+
+    @staticmethod
+    def create_from_items(company, supplier: Optional[str] = None,
+                          item_ids: Optional[Iterable[int]] = None) -> Optional[Order]:
+        """
+        Grava um pedido com os itens atuais e seus preços
+
+        As linhas são copiadas com INSERT ... SELECT, sem passar pelo Python.
+        Preços de fornecedores não cadastrados ficam de fora e são informados
+        em Order.unknown_suppliers.
+
+        Args:
+            company: Empresa compradora (Company)
+            supplier: Apenas os preços deste fornecedor (None para todos)
+            item_ids: Restringe aos itens informados (None para todos)
+        """
+        conditions = []
+        params: list = []
+        if supplier:
+            conditions.append('s.name = ?')
+            params.append(supplier)
+        if item_ids is not None:
+            item_ids = list(item_ids)
+            conditions.append(f"i.id IN ({','.join('?' * len(item_ids))})")
+            params.extend(item_ids)
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+
+        try:
+            with connection() as conn:
+                order_id = OrderRepository._insert_order(conn, company, supplier)
+                conn.execute(_INSERT_LINES_FROM_ITEMS + where, [order_id] + params)
+                order = OrderRepository._finish(conn, order_id)
+                order.unknown_suppliers = ItemRepository.get_unregistered_suppliers(item_ids, supplier)
+                return order
+        except Exception as e:
+            print(f"Erro ao criar pedido: {e}")
+            return None
+
+    @staticmethod
+    def create_from_lines(company, lines: Iterable[tuple], supplier: Optional[str] = None) -> Optional[Order]:
+        """
+        Grava um pedido com linhas já montadas
+
+        Args:
+            lines: (item_id, descrição, código, marca, fornecedor, preço, quantidade)
+        """
+        try:
+            with connection() as conn:
+                order_id = OrderRepository._insert_order(conn, company, supplier)
+                conn.executemany('''
+                    INSERT INTO order_lines
+                        (order_id, line_no, item_id, description, code, brand, supplier, price, quantity)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', ((order_id, line_no) + tuple(line) for line_no, line in enumerate(lines, start=1)))
+                return OrderRepository._finish(conn, order_id)
+        except Exception as e:
+            print(f"Erro ao criar pedido: {e}")
+            return None
+
+    @staticmethod
+    def _insert_order(conn, company, supplier: Optional[str]) -> int:
+        cursor = conn.execute('''
+            INSERT INTO orders (company_name, company_cnpj, buyer_name, supplier)
+            VALUES (?, ?, ?, ?)
+        ''', (company.name, company.cnpj, company.buyer_name, supplier))
+        return cursor.lastrowid
+
+    @staticmethod
+    def _finish(conn, order_id: int) -> Order:
+        """Grava os totais do pedido a partir das linhas"""
+        conn.execute('''
+            UPDATE orders SET
+                line_count = (SELECT COUNT(*) FROM order_lines WHERE order_id = :id),
+                total = (SELECT COALESCE(SUM(price * quantity), 0) FROM order_lines WHERE order_id = :id)
+            WHERE id = :id
+        ''', {'id': order_id})
+        return Order.from_tuple(conn.execute('SELECT * FROM orders WHERE id = ?', (order_id,)).fetchone())
+
+    @staticmethod
+    def get_by_id(order_id: int) -> Optional[Order]:
+        """Busca um pedido por ID"""
+        conn = create_connection()
+        if not conn:
+            return None
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM orders WHERE id = ?', (order_id,))
+            result = cursor.fetchone()
+            return Order.from_tuple(result) if result else None
+        except Exception as e:
+            print(f"Erro ao buscar pedido {order_id}: {e}")
+            return None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_recent(limit: int = 50) -> List[Order]:
+        """Busca os pedidos mais recentes"""
+        conn = create_connection()
+        if not conn:
+            return []
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM orders ORDER BY id DESC LIMIT ?', (limit,))
+            return [Order.from_tuple(result) for result in cursor.fetchall()]
+        except Exception as e:
+            print(f"Erro ao buscar pedidos: {e}")
+            return []
+        finally:
+            conn.close()
+
+    @staticmethod
+    def iter_lines(order_id: int, batch_size: int = 1000) -> Iterator[List[tuple]]:
+        """
+        Lê as linhas de um pedido em lotes, pela chave primária (order_id, line_no)
+
+        Cada linha: (descrição, código, marca, fornecedor, preço, quantidade),
+        o formato aceito por OrderPdfWriter.
+        """
+        with connection() as conn:
+            cursor = conn.execute('''
+                SELECT description, code, brand, supplier, price, quantity
+                FROM order_lines WHERE order_id = ? ORDER BY line_no
+            ''', (order_id,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    @staticmethod
+    def next_number() -> int:
+        """Número que o próximo pedido deve receber (apenas sugestão, ex.: nome do arquivo)"""
+        conn = create_connection()
+        if not conn:
+            return 1
+
+        try:
+            result = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'orders'").fetchone()
+            return (result[0] if result else 0) + 1
+        except Exception as e:
+            print(f"Erro ao consultar número do pedido: {e}")
+            return 1
+        finally:
+            conn.close()
+
+    @staticmethod
+    def delete(order_id: int) -> bool:
+        """Exclui um pedido e suas linhas"""
+        try:
+            with connection() as conn:
+                # As linhas são removidas explicitamente: ON DELETE CASCADE depende de foreign_keys
+                conn.execute('DELETE FROM order_lines WHERE order_id = ?', (order_id,))
+                return conn.execute('DELETE FROM orders WHERE id = ?', (order_id,)).rowcount > 0
+        except Exception as e:
+            print(f"Erro ao excluir pedido {order_id}: {e}")
+            return False
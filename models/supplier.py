@@ -1,13 +1,17 @@
 """
 Modelo de Fornecedor para o Sistema de Compras
 """
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 from database import create_connection
+from .cache import read_cache, fetch_one, fetch_all
+from .changes import change_feed, SUPPLIERS, INSERT, UPDATE, DELETE
 
 
 class Supplier:
     """Classe que representa um fornecedor"""
     
+    __slots__ = ('id', 'name', 'cnpj', 'seller_name')
+    
     def __init__(self, id: int = None, name: str = "", cnpj: str = "", seller_name: str = ""):
         self.id = id
         self.name = name
@@ -71,6 +75,7 @@ class SupplierRepository:
                 INSERT INTO suppliers (name, cnpj, seller_name)
                 VALUES (?, ?, ?)
             ''', (supplier.name, supplier.cnpj, supplier.seller_name))
+            change_feed.publish(SUPPLIERS, INSERT, [cursor.lastrowid])
             conn.commit()
             return cursor.lastrowid
         except Exception as e:
@@ -82,38 +87,23 @@ class SupplierRepository:
     @staticmethod
     def get_by_id(supplier_id: int) -> Optional[Supplier]:
         """Busca um fornecedor por ID"""
-        conn = create_connection()
-        if not conn:
-            return None
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM suppliers WHERE id = ?', (supplier_id,))
-            result = cursor.fetchone()
+            result = read_cache.row(SUPPLIERS, supplier_id,
+                                    lambda: fetch_one('SELECT * FROM suppliers WHERE id = ?', (supplier_id,)))
             return Supplier.from_tuple(result) if result else None
         except Exception as e:
             print(f"Erro ao buscar fornecedor {supplier_id}: {e}")
             return None
-        finally:
-            conn.close()
     
     @staticmethod
     def get_all() -> List[Supplier]:
         """Busca todos os fornecedores"""
-        conn = create_connection()
-        if not conn:
-            return []
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM suppliers ORDER BY name')
-            results = cursor.fetchall()
+            results = read_cache.query(SUPPLIERS, 'all', lambda: fetch_all('SELECT * FROM suppliers ORDER BY name'), rows=True)
             return [Supplier.from_tuple(result) for result in results]
         except Exception as e:
             print(f"Erro ao buscar todos os fornecedores: {e}")
             return []
-        finally:
-            conn.close()
     
     @staticmethod
     def get_names() -> List[str]:
@@ -135,6 +125,8 @@ class SupplierRepository:
                 SET name = ?, cnpj = ?, seller_name = ?
                 WHERE id = ?
             ''', (supplier.name, supplier.cnpj, supplier.seller_name, supplier.id))
+            if cursor.rowcount > 0:
+                change_feed.publish(SUPPLIERS, UPDATE, [supplier.id])
             conn.commit()
             return cursor.rowcount > 0
         except Exception as e:
@@ -143,16 +135,37 @@ class SupplierRepository:
         finally:
             conn.close()
     
+    @staticmethod
+    def get_item_count(supplier_id: int) -> int:
+        """Quantos itens têm preço do fornecedor"""
+        try:
+            return fetch_one('SELECT COUNT(*) FROM item_supplier_prices WHERE supplier_id = ?', (supplier_id,))[0]
+        except Exception as e:
+            print(f"Erro ao contar itens do fornecedor {supplier_id}: {e}")
+            return 0
+    
     @staticmethod
     def delete(supplier_id: int) -> bool:
-        """Exclui um fornecedor"""
+        """
+        Exclui um fornecedor
+        
+        Recusa (retorna False) se algum item tiver preço do fornecedor: os
+        preços precisam ser removidos dos itens antes.
+        """
         conn = create_connection()
         if not conn:
             return False
         
         try:
             cursor = conn.cursor()
+            item_count = cursor.execute('SELECT COUNT(*) FROM item_supplier_prices WHERE supplier_id = ?',
+                                        (supplier_id,)).fetchone()[0]
+            if item_count:
+                print(f"Fornecedor {supplier_id} tem preços em {item_count} itens e não pode ser excluído")
+                return False
             cursor.execute('DELETE FROM suppliers WHERE id = ?', (supplier_id,))
+            if cursor.rowcount > 0:
+                change_feed.publish(SUPPLIERS, DELETE, [supplier_id])
             conn.commit()
             return cursor.rowcount > 0
         except Exception as e:
@@ -170,4 +183,31 @@ class SupplierRepository:
             'total_suppliers': len(suppliers),
             'suppliers': [supplier.to_dict() for supplier in suppliers]
         }
-
+    
+    @staticmethod
+    def get_spend_summary() -> List[Dict]:
+        """
+        Itens cotados e valor (quantidade × preço) por fornecedor, do maior para o menor
+        
+        Lê o resumo mantido pelos triggers (stats_supplier_summary).
+        """
+        conn = create_connection()
+        if not conn:
+            return []
+        
+        try:
+            cursor = conn.execute('''
+                SELECT s.name, st.item_count, st.total_value
+                FROM stats_supplier_summary st
+                JOIN suppliers s ON s.id = st.supplier_id
+                ORDER BY st.total_value DESC
+            ''')
+            return [
+                {'name': name, 'item_count': item_count, 'total_value': total_value}
+                for name, item_count, total_value in cursor
+            ]
+        except Exception as e:
+            print(f"Erro ao buscar resumo dos fornecedores: {e}")
+            return []
+        finally:
+            conn.close()
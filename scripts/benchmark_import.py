@@ -0,0 +1,106 @@
+"""
+Compara a importação de um mesmo conjunto de dados em .csv e .xlsx
+
+Uso: python scripts/benchmark_import.py [linhas] [processos]
+
+A importação roda em uma thread, como na interface; a maior pausa da thread
+principal indica quanto a interface ficaria sem responder.
+"""
+import csv
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database
+from services.import_service import ImportService
+
+SUPPLIERS = ['Fornecedor A', 'Fornecedor B', 'Fornecedor C', 'Fornecedor D']
+HEADER = ['Descrição', 'Código', 'Marca', 'Fornecedor', 'Preço', 'Quantidade']
+
+
+def generate_rows(count: int):
+    """Linhas sintéticas; cada item aparece com dois fornecedores"""
+    for i in range(count):
+        item = i // 2
+        price = 1000 + (i * 37) % 5000 / 100
+        yield (f'ITEM {item}', f'C{item:07d}', f'MARCA {item % 50}',
+               SUPPLIERS[i % len(SUPPLIERS)], price, (i % 20) + 1)
+
+
+def write_csv(path: Path, count: int):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(HEADER)
+        for description, code, brand, supplier, price, quantity in generate_rows(count):
+            # Formato brasileiro: "R$ 1.234,56"
+            brazilian = f"{price:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+            writer.writerow([description, code, brand, supplier, f'R$ {brazilian}', quantity])
+
+
+def write_xlsx(path: Path, count: int):
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(HEADER)
+    for row in generate_rows(count):
+        ws.append(row)
+    wb.save(path)
+
+
+def import_in_background(path: Path, workers: int):
+    """Importa em outra thread; devolve o resultado e a maior pausa da thread principal (s)"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(ImportService(workers=workers).import_file, str(path))
+        last, worst = time.perf_counter(), 0.0
+        while not future.done():
+            time.sleep(0.005)
+            now = time.perf_counter()
+            worst, last = max(worst, now - last), now
+        return future.result(), worst
+
+
+def run(path: Path, tmp: Path, workers: int):
+    """Importa o arquivo em um banco vazio e devolve o resultado"""
+    database.init_pool(tmp / f'benchmark_{path.suffix[1:]}.db')
+    try:
+        database.create_tables()
+        started = time.perf_counter()
+        result, pause = import_in_background(path, workers)
+        elapsed = time.perf_counter() - started
+    finally:
+        database.close_all_connections()
+        database.init_pool()
+
+    timings = ', '.join(f'{name}={value:.2f}s' for name, value in sorted(result.timings.items()))
+    print(f'{path.suffix:>6}: {elapsed:6.2f}s  {result.total_rows / elapsed:9.0f} linhas/s  '
+          f'pausa {pause * 1000:4.0f}ms  ({timings})')
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = [tmp / 'dados.csv']
+        write_csv(files[0], count)
+        try:
+            write_xlsx(tmp / 'dados.xlsx', count)
+            files.append(tmp / 'dados.xlsx')
+        except ImportError:
+            print('openpyxl não instalado; comparando apenas o CSV')
+
+        print(f'Importando {count} linhas com {workers} processo(s)...')
+        results = [run(path, tmp, workers) for path in files]
+        if len({(r.added, r.updated, len(r.rejected)) for r in results}) > 1:
+            print('ATENÇÃO: os formatos produziram resultados diferentes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Mede a memória ocupada pelos modelos ao carregar itens do banco
+
+Uso: python scripts/benchmark_models.py [itens]
+
+Grava os itens em um banco temporário, lê as linhas e mede (tracemalloc)
+quanto ocupam os objetos Item montados a partir delas, antes e depois de
+acessar os preços de todos os itens.
+"""
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database
+from models import Item, ItemRepository
+
+SUPPLIERS = ['Fornecedor A', 'Fornecedor B', 'Fornecedor C', 'Fornecedor D']
+
+
+def generate_items(count: int):
+    """Itens sintéticos com dois fornecedores cada"""
+    for i in range(count):
+        yield Item(description=f'ITEM DE TESTE {i}', code=f'C{i:07d}', brand=f'MARCA {i % 50}',
+                   quantity=(i % 20) + 1,
+                   suppliers_prices={SUPPLIERS[i % 4]: 10 + i % 500 / 100, SUPPLIERS[(i + 1) % 4]: 12.5})
+
+
+def measure(build):
+    """Executa build() e retorna o resultado, a memória retida (bytes) e o tempo gasto"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.init_pool(Path(tmp) / 'benchmark.db')
+        try:
+            database.create_tables()
+            ItemRepository.bulk_create(generate_items(count))
+            with database.connection() as conn:
+                rows = conn.execute('SELECT * FROM items').fetchall()
+        finally:
+            database.close_all_connections()
+
+    items, items_size, items_seconds = measure(lambda: [Item.from_tuple(row) for row in rows])
+    # Os preços já decodificados pesam sobre os itens existentes
+    _, prices_size, prices_seconds = measure(lambda: [item.suppliers_prices for item in items])
+
+    per_100k = 100000 / count
+    print(f"{count} itens")
+    print(f"Itens carregados:   {items_size * per_100k / 2**20:8.1f} MB por 100 mil ({items_seconds:.2f}s)")
+    print(f"Preços decodificados: {(items_size + prices_size) * per_100k / 2**20:6.1f} MB por 100 mil "
+          f"(+{prices_seconds:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,11 @@
 import os
 from pathlib import Path
 
-from models import ItemRepository, CompanyRepository, Item
+from models import ItemRepository, CompanyRepository, Item, OrderRepository, Supplier, SupplierRepository
 from models.company import Company
+from services.pdf_service import PdfService
 
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+DEMO_SUPPLIER = 'Fornecedor A'
 
 
 def ensure_demo_data():
@@ -14,12 +14,16 @@ def ensure_demo_data():
         CompanyRepository.create(Company(name='Empresa Demo', cnpj='11222333000181', buyer_name='Comprador Demo'))
         company = CompanyRepository.get_default()
 
+    # Os preços só entram nos pedidos para fornecedores cadastrados
+    if DEMO_SUPPLIER not in SupplierRepository.get_names():
+        SupplierRepository.create(Supplier(name=DEMO_SUPPLIER))
+
     items = ItemRepository.get_all()
     if not items:
         ItemRepository.create(
             Item(
                 description='Parafuso', code='P001', brand='ABC',
-                status='A Comprar', quantity=10, suppliers_prices={'Fornecedor A': 5.5}
+                status='A Comprar', quantity=10, suppliers_prices={DEMO_SUPPLIER: 5.5}
             )
         )
         items = ItemRepository.get_all()
@@ -28,23 +32,11 @@ def ensure_demo_data():
 
 
 def generate_pdf(output_path: Path):
-    company, items = ensure_demo_data()
-
-    c = canvas.Canvas(str(output_path), pagesize=letter)
-    c.drawString(100, 750, 'Pedido Demo')
-    c.drawString(100, 730, f'Empresa: {company.name} - CNPJ: {company.cnpj}')
-    c.drawString(100, 710, f'Comprador: {company.buyer_name}')
-
-    y = 690
-    for it in items:
-        prices = ', '.join([f"{s}: R${p:.2f}" for s, p in it.suppliers_prices.items()]) if it.suppliers_prices else 'Sem preços'
-        line = f'I: {it.description}  Cdg: {it.code}  M: {it.brand}  Qtd: {it.quantity}  Prç: {prices}'
-        c.drawString(100, y, line)
-        y -= 20
-        if y < 100:
-            c.showPage()
-            y = 750
-    c.save()
+    company, _ = ensure_demo_data()
+    order = OrderRepository.create_from_items(company)
+    if order is None:
+        raise RuntimeError('Falha ao gravar o pedido de demonstração')
+    return PdfService().generate_order(str(output_path), order)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,34 @@
+"""
+Confere e reconstrói o resumo de estatísticas usado pelo dashboard
+
+Uso: python scripts/rebuild_stats.py [--check]
+
+Sem argumentos recalcula o resumo do zero e em seguida confere o resultado;
+com --check apenas lista as divergências (código de saída 1 se houver alguma).
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database
+from services.stats_service import StatsService
+
+
+def main():
+    database.create_tables()
+    service = StatsService()
+
+    if '--check' not in sys.argv[1:]:
+        result = service.rebuild()
+        print(f"Resumo reconstruído: {result['items']} itens em {result['seconds']:.2f}s")
+
+    problems = service.check()
+    for problem in problems:
+        print(f"Divergência: {problem}")
+    print("Resumo consistente" if not problems else f"{len(problems)} divergência(s) encontrada(s)")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,11 @@
 Módulo de serviços do Sistema de Compras
 """
 from .backup_service import BackupService
+from .import_service import ImportService, ImportResult, unknown_suppliers_note
+from .export_service import ExportService
+from .pdf_service import PdfService
+from .stats_service import StatsService
 
-__all__ = ['BackupService']
+__all__ = ['BackupService', 'ImportService', 'ImportResult', 'unknown_suppliers_note',
+           'ExportService', 'PdfService', 'StatsService']
 
@@ -2,7 +2,6 @@
 Serviço de Backup do Sistema de Compras
 """
 import os
-import shutil
 import sqlite3
 from datetime import datetime
 from pathlib import Path
@@ -12,6 +11,8 @@ import threading
 import time
 
 from config import DATABASE_CONFIG, APP_CONFIG
+from database import close_all_connections
+from models.cache import read_cache
 
 
 class BackupService:
@@ -51,8 +52,8 @@ class BackupService:
             
             backup_path = self.backup_dir / backup_filename
             
-            # Copiar o arquivo do banco de dados
-            shutil.copy2(self.database_path, backup_path)
+            # Copiar o banco pelo SQLite: em WAL parte dos dados pode estar no arquivo -wal
+            self._copy_database(self.database_path, backup_path)
             
             # Verificar se o backup foi criado corretamente
             if backup_path.exists() and backup_path.stat().st_size > 0:
@@ -90,8 +91,14 @@ class BackupService:
                 print("Não foi possível criar backup do banco atual")
                 return False
             
-            # Restaurar o backup
-            shutil.copy2(backup_file, self.database_path)
+            # Fechar as conexões do pool para não manter páginas do banco antigo
+            close_all_connections()
+            
+            # Restaurar o backup pelo SQLite (copiar por cima do arquivo deixaria o
+            # -wal do banco atual ser reaplicado sobre ele); o cache de leitura
+            # é esvaziado na hora em vez de esperar pelo data_version
+            self._copy_database(backup_file, self.database_path)
+            read_cache.clear()
             
             # Verificar se a restauração foi bem-sucedida
             if self._verify_database():
@@ -100,7 +107,8 @@ class BackupService:
             else:
                 print("Falha na restauração - banco corrompido")
                 # Restaurar o backup anterior
-                shutil.copy2(current_backup, self.database_path)
+                self._copy_database(Path(current_backup), self.database_path)
+                read_cache.clear()
                 return False
                 
         except Exception as e:
@@ -179,6 +187,17 @@ class BackupService:
         except Exception as e:
             print(f"Erro ao limpar backups antigos: {e}")
     
+    @staticmethod
+    def _copy_database(source: Path, target: Path):
+        """Copia o banco source sobre target com a API de backup do SQLite"""
+        source_conn = sqlite3.connect(str(source))
+        target_conn = sqlite3.connect(str(target))
+        try:
+            source_conn.backup(target_conn)
+        finally:
+            target_conn.close()
+            source_conn.close()
+    
     def _verify_database(self) -> bool:
         """Verifica se o banco de dados está íntegro"""
         try:
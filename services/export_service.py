@@ -0,0 +1,216 @@
+"""
+Serviço de exportação de planilhas do Sistema de Compras
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional
+
+from database import connection
+from utils.spreadsheets import (
+    EXPORT_HEADER, MAX_SHEET_TITLE, append_item_rows, write_items_workbook,
+    safe_filename, safe_sheet_title, unique_name
+)
+from .import_readers import ProgressCallback, ProgressTracker
+
+# Uma linha por par item/fornecedor: (descrição, código, marca, fornecedor, preço, quantidade, status)
+EXPORT_COLUMNS = '''
+    SELECT i.description, i.code, COALESCE(NULLIF(i.brand, ''), 'N/A'), s.name, p.price, i.quantity, i.status
+'''
+
+# CROSS JOIN fixa a ordem das tabelas: items é percorrida de trás para frente pela
+# chave primária e os preços de cada item vêm da PK de item_supplier_prices,
+# então a ordem da listagem (mais recentes primeiro) sai sem ordenação temporária
+SELECT_EXPORT_ROWS = EXPORT_COLUMNS + '''
+    FROM items i
+    CROSS JOIN item_supplier_prices p ON p.item_id = i.id
+    JOIN suppliers s ON s.id = p.supplier_id
+    ORDER BY i.id DESC, p.supplier_id
+'''
+
+SELECT_EXPORT_ROWS_BY_SUPPLIER_NAME = EXPORT_COLUMNS + '''
+    FROM suppliers s
+    JOIN item_supplier_prices p ON p.supplier_id = s.id
+    JOIN items i ON i.id = p.item_id
+    WHERE s.name = ?
+    ORDER BY i.id DESC
+'''
+
+# Percorre o índice (supplier_id, item_id) de trás para frente: as linhas saem
+# agrupadas por fornecedor sem ordenação temporária
+SELECT_EXPORT_ROWS_GROUPED = EXPORT_COLUMNS + '''
+    FROM item_supplier_prices p
+    JOIN items i ON i.id = p.item_id
+    JOIN suppliers s ON s.id = p.supplier_id
+    ORDER BY p.supplier_id DESC, p.item_id DESC
+'''
+
+
+def count_export_rows(supplier: Optional[str] = None) -> int:
+    """Número de linhas que a exportação vai gerar"""
+    with connection() as conn:
+        if supplier:
+            cursor = conn.execute('''
+                SELECT COUNT(*) FROM item_supplier_prices p
+                JOIN suppliers s ON s.id = p.supplier_id
+                WHERE s.name = ?
+            ''', (supplier,))
+        else:
+            cursor = conn.execute('SELECT COUNT(*) FROM item_supplier_prices')
+        return cursor.fetchone()[0]
+
+
+def iter_export_rows(supplier: Optional[str] = None, batch_size: int = 1000) -> Iterator[List[tuple]]:
+    """
+    Lê as linhas da exportação direto do cursor, em lotes de batch_size
+
+    Args:
+        supplier: Restringe a um fornecedor (None para todos)
+        batch_size: Linhas buscadas por vez (fetchmany)
+    """
+    if supplier:
+        return _iter_query(SELECT_EXPORT_ROWS_BY_SUPPLIER_NAME, (supplier,), batch_size)
+    return _iter_query(SELECT_EXPORT_ROWS, (), batch_size)
+
+
+def iter_rows_by_supplier(batch_size: int = 1000) -> Iterator[tuple]:
+    """
+    Todas as linhas da exportação, agrupadas por fornecedor, em uma única leitura
+
+    Os fornecedores mais recentes vêm primeiro; dentro de cada um, os itens
+    mais recentes.
+    """
+    for rows in _iter_query(SELECT_EXPORT_ROWS_GROUPED, (), batch_size):
+        yield from rows
+
+
+def _iter_query(query: str, params: tuple, batch_size: int) -> Iterator[List[tuple]]:
+    with connection() as conn:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+
+class ExportService:
+    """Serviço responsável pela exportação de itens para planilhas
+
+    A planilha é gravada com o openpyxl em modo write_only e as linhas vêm do
+    cursor em lotes, então a memória usada não depende do número de itens.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    def export_items(self, file_path: str, supplier: Optional[str] = None,
+                     progress: ProgressCallback = None) -> int:
+        """
+        Exporta os itens (uma linha por fornecedor) para um arquivo .xlsx
+
+        Preço e quantidade são gravados como números; o preço com formato de moeda.
+
+        Args:
+            file_path: Caminho do arquivo de saída
+            supplier: Exporta apenas os preços deste fornecedor (None para todos)
+            progress: Callback opcional de andamento (ver ProgressTracker.snapshot)
+
+        Returns:
+            Número de linhas exportadas (sem o cabeçalho)
+        """
+        import openpyxl
+
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Itens")
+        ws.append(EXPORT_HEADER)
+
+        tracker = ProgressTracker(count_export_rows(supplier) if progress else None, progress)
+        for rows in iter_export_rows(supplier, self.batch_size):
+            append_item_rows(ws, rows)
+            tracker.update(len(rows))
+
+        wb.save(file_path)
+        return tracker.rows
+
+    def export_by_supplier(self, output: str, mode: str = 'files', workers: int = 1,
+                           progress: ProgressCallback = None) -> Dict[str, str]:
+        """
+        Exporta uma planilha por fornecedor lendo a tabela uma única vez
+
+        As linhas chegam agrupadas por fornecedor e são distribuídas enquanto
+        são lidas: só a planilha do fornecedor atual fica aberta.
+
+        Args:
+            output: Pasta de destino (mode='files') ou arquivo .xlsx (mode='sheets')
+            mode: 'files' para um arquivo por fornecedor, 'sheets' para uma aba por fornecedor
+            workers: Processos que gravam os arquivos em paralelo (apenas mode='files')
+            progress: Callback opcional de andamento, chamado a cada fornecedor concluído
+
+        Returns:
+            Fornecedor -> caminho do arquivo (ou título da aba) gerado
+        """
+        if mode not in ('files', 'sheets'):
+            raise ValueError(f"Modo de exportação inválido: {mode}")
+
+        tracker = ProgressTracker(count_export_rows() if progress else None, progress)
+        groups = groupby(iter_rows_by_supplier(self.batch_size), key=itemgetter(3))
+
+        if mode == 'sheets':
+            return self._write_sheets(output, groups, tracker)
+
+        os.makedirs(output, exist_ok=True)
+        used = set()
+        targets = (
+            (supplier, os.path.join(output, unique_name(safe_filename(supplier), used) + '.xlsx'), rows)
+            for supplier, rows in groups
+        )
+        if workers <= 1:
+            result = {}
+            for supplier, path, rows in targets:
+                tracker.update(write_items_workbook(path, rows))
+                result[supplier] = path
+            return result
+        return self._write_files_in_workers(targets, workers, tracker)
+
+    @staticmethod
+    def _write_sheets(file_path: str, groups, tracker: ProgressTracker) -> Dict[str, str]:
+        """Grava uma aba por fornecedor em um único arquivo"""
+        import openpyxl
+
+        wb = openpyxl.Workbook(write_only=True)
+        used = set()
+        result = {}
+        for supplier, rows in groups:
+            title = unique_name(safe_sheet_title(supplier), used, max_length=MAX_SHEET_TITLE)
+            ws = wb.create_sheet(title)
+            ws.append(EXPORT_HEADER)
+            tracker.update(append_item_rows(ws, rows))
+            result[supplier] = title
+        wb.save(file_path)
+        return result
+
+    @staticmethod
+    def _write_files_in_workers(targets, workers: int, tracker: ProgressTracker) -> Dict[str, str]:
+        """Envia as linhas de cada fornecedor para processos que gravam os arquivos"""
+        result = {}
+        # Janela limitada: no máximo 2 fornecedores por processo aguardando gravação
+        window = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for supplier, path, rows in targets:
+                # As linhas precisam ser materializadas para seguir ao outro processo
+                pending.append((supplier, path, executor.submit(write_items_workbook, path, list(rows))))
+                while len(pending) >= window:
+                    ExportService._collect(pending.popleft(), result, tracker)
+            while pending:
+                ExportService._collect(pending.popleft(), result, tracker)
+        return result
+
+    @staticmethod
+    def _collect(entry, result: Dict[str, str], tracker: ProgressTracker):
+        supplier, path, future = entry
+        tracker.update(future.result())
+        result[supplier] = path
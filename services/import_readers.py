@@ -0,0 +1,158 @@
+"""
+Leitores de planilhas para a importação do Sistema de Compras
+
+Os leitores entregam as linhas em lotes (listas de tuplas) por meio de
+geradores, para que arquivos grandes sejam processados com memória limitada.
+"""
+import csv
+import os
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+ProgressCallback = Callable[[dict], None]
+
+CSV_EXTENSIONS = ('.csv', '.tsv', '.txt')
+CSV_DELIMITERS = ';,\t|'
+CSV_ENCODINGS = ('utf-8-sig', 'cp1252')
+SNIFF_SIZE = 64 * 1024
+
+
+class ProgressTracker:
+    """Acompanha o andamento da leitura e notifica o callback a cada lote"""
+
+    def __init__(self, total_rows: Optional[int] = None, callback: ProgressCallback = None):
+        self.total_rows = total_rows
+        self.callback = callback
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    def update(self, rows: int):
+        """Registra mais linhas lidas"""
+        self.rows += rows
+        if self.callback:
+            self.callback(self.snapshot())
+
+    def snapshot(self) -> dict:
+        """Estado atual: linhas lidas, total estimado, percentual e velocidade"""
+        elapsed = time.perf_counter() - self.started
+        percent = None
+        if self.total_rows:
+            percent = min(100.0, self.rows * 100.0 / self.total_rows)
+        return {
+            'rows': self.rows,
+            'total': self.total_rows,
+            'percent': percent,
+            'rows_per_second': self.rows / elapsed if elapsed > 0 else 0.0,
+            'elapsed': elapsed,
+        }
+
+
+def batched(rows: Iterable[tuple], batch_size: int = 1000) -> Iterator[List[tuple]]:
+    """Agrupa um iterável de linhas em listas de até batch_size linhas"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_excel_batches(file_path: str, batch_size: int = 1000, progress: ProgressCallback = None,
+                       min_row: int = 2) -> Iterator[List[tuple]]:
+    """
+    Lê um arquivo .xlsx em modo somente leitura, sem carregar a planilha inteira
+
+    Args:
+        file_path: Caminho do arquivo
+        batch_size: Linhas por lote
+        progress: Callback chamado após cada lote com o dicionário de ProgressTracker.snapshot()
+        min_row: Primeira linha de dados (a linha 1 é o cabeçalho)
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        # Em modo somente leitura max_row vem da dimensão gravada no arquivo e pode faltar
+        total = ws.max_row - min_row + 1 if ws.max_row else None
+        tracker = ProgressTracker(total, progress)
+        for batch in batched(ws.iter_rows(min_row=min_row, values_only=True), batch_size):
+            yield batch
+            tracker.update(len(batch))
+    finally:
+        # O workbook somente leitura mantém o arquivo aberto até ser fechado
+        wb.close()
+
+
+def _detect_encoding(file_path: str) -> str:
+    """Retorna a primeira codificação capaz de decodificar o início do arquivo"""
+    with open(file_path, 'rb') as f:
+        sample = f.read(SNIFF_SIZE)
+    for encoding in CSV_ENCODINGS:
+        try:
+            sample.decode(encoding)
+            return encoding
+        except UnicodeDecodeError as e:
+            # O corte da amostra pode partir um caractere multibyte no final
+            if len(sample) == SNIFF_SIZE and e.start >= SNIFF_SIZE - 4:
+                return encoding
+    return CSV_ENCODINGS[-1]
+
+
+def _detect_delimiter(sample: str) -> str:
+    """Detecta o delimitador do CSV; planilhas brasileiras costumam usar ';'"""
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        # Sem padrão consistente na amostra: usa o delimitador mais frequente na primeira linha
+        first_line = sample.splitlines()[0] if sample else ""
+        delimiter = max(CSV_DELIMITERS, key=first_line.count)
+        return delimiter if first_line.count(delimiter) else ';'
+
+
+def iter_csv_batches(file_path: str, batch_size: int = 1000, progress: ProgressCallback = None,
+                     skip_header: bool = True) -> Iterator[List[tuple]]:
+    """
+    Lê um arquivo CSV/TSV em lotes, detectando codificação e delimitador
+
+    Os valores são entregues como texto; preços com "R$" e vírgula decimal são
+    normalizados pela importação (ver parse_row).
+
+    Args:
+        file_path: Caminho do arquivo
+        batch_size: Linhas por lote
+        progress: Callback chamado após cada lote com o dicionário de ProgressTracker.snapshot()
+        skip_header: Ignora a primeira linha (cabeçalho)
+    """
+    encoding = _detect_encoding(file_path)
+    size = os.path.getsize(file_path)
+
+    with open(file_path, newline='', encoding=encoding) as f:
+        sample = f.read(SNIFF_SIZE)
+        f.seek(0)
+        delimiter = _detect_delimiter(sample)
+
+        # Total estimado pelo tamanho médio das linhas da amostra
+        lines = sample.count('\n')
+        total = None
+        if lines:
+            total = max(1, round(size * lines / len(sample.encode(encoding, errors='replace'))) - skip_header)
+
+        reader = csv.reader(f, delimiter=delimiter)
+        if skip_header:
+            next(reader, None)
+
+        tracker = ProgressTracker(total, progress)
+        for batch in batched(map(tuple, reader), batch_size):
+            yield batch
+            tracker.update(len(batch))
+
+
+def iter_file_batches(file_path: str, batch_size: int = 1000,
+                      progress: ProgressCallback = None) -> Iterator[List[tuple]]:
+    """Escolhe o leitor pela extensão do arquivo (.csv/.tsv/.txt ou .xlsx)"""
+    if file_path.lower().endswith(CSV_EXTENSIONS):
+        return iter_csv_batches(file_path, batch_size, progress)
+    return iter_excel_batches(file_path, batch_size, progress)
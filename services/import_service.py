@@ -0,0 +1,245 @@
+"""
+Serviço de importação de planilhas do Sistema de Compras
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from database import connection
+from models import Item, ItemRepository
+from utils.parsers import ParsedRow, natural_key, normalize_decimal, parse_batch, parse_row
+from .import_readers import ProgressCallback, batched, iter_file_batches
+
+# Abaixo deste tamanho o custo de iniciar os processos supera o ganho
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+
+
+def unknown_suppliers_note(names: Iterable[str]) -> str:
+    """Aviso de preços de fornecedores não cadastrados (ver ItemRepository.get_unregistered_suppliers)"""
+    names = sorted(names)
+    text = f"{len(names)} fornecedores não cadastrados (cadastre-os para usar os preços): "
+    return text + ", ".join(names[:10]) + (" ..." if len(names) > 10 else "")
+
+
+class ImportResult:
+    """Resumo de uma importação"""
+
+    def __init__(self):
+        self.added = 0
+        self.updated = 0
+        self.skipped = 0
+        self.rejected: List[Tuple[int, List[str]]] = []  # (linha, erros)
+        # Fornecedores sem cadastro: o preço fica no item, mas só entra em
+        # filtros, exportações e pedidos depois que o fornecedor for cadastrado
+        self.unknown_suppliers: Set[str] = set()
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def total_rows(self) -> int:
+        return self.added + self.updated + self.skipped + len(self.rejected)
+
+    def to_dict(self) -> Dict:
+        """Converte o resumo para dicionário"""
+        return {
+            'added': self.added,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'rejected': self.rejected,
+            'unknown_suppliers': sorted(self.unknown_suppliers),
+            'timings': self.timings,
+        }
+
+    def summary(self) -> str:
+        """Texto curto para exibir ao usuário"""
+        text = f"{self.updated} itens atualizados e {self.added} itens adicionados!"
+        if self.rejected:
+            text += f"\n{len(self.rejected)} linhas rejeitadas:"
+            for row_number, errors in self.rejected[:10]:
+                text += f"\n  Linha {row_number}: {'; '.join(errors)}"
+            if len(self.rejected) > 10:
+                text += f"\n  ... e mais {len(self.rejected) - 10}"
+        if self.unknown_suppliers:
+            text += "\n" + unknown_suppliers_note(self.unknown_suppliers)
+        return text
+
+    def __str__(self) -> str:
+        return (f"ImportResult(added={self.added}, updated={self.updated}, "
+                f"skipped={self.skipped}, rejected={len(self.rejected)})")
+
+
+class ImportService:
+    """Serviço responsável pela importação de itens a partir de planilhas
+
+    O índice de itens existentes é montado uma única vez por importação. As
+    linhas chegam em lotes; as alterações de cada lote são gravadas com a API
+    em lote, e a importação inteira roda em uma única transação.
+
+    Com workers > 1 a normalização e validação dos lotes é distribuída entre
+    processos auxiliares; a gravação continua no processo atual, que é o único
+    a usar o banco.
+    """
+
+    def __init__(self, batch_size: int = 1000, workers: int = 1):
+        self.batch_size = batch_size
+        self.workers = max(1, workers or 1)
+
+    def import_file(self, file_path: str, progress: ProgressCallback = None) -> ImportResult:
+        """
+        Importa um arquivo .xlsx, .csv ou .tsv (primeira linha é o cabeçalho)
+
+        O arquivo é lido em modo streaming, então a memória usada não cresce
+        com o tamanho do arquivo.
+
+        Args:
+            file_path: Caminho do arquivo
+            progress: Callback opcional de andamento (ver ProgressTracker.snapshot)
+        """
+        batches = iter_file_batches(file_path, self.batch_size, progress)
+        workers = self.workers if os.path.getsize(file_path) >= PARALLEL_MIN_BYTES else 1
+        return self.import_batches(batches, first_row=2, workers=workers)
+
+    def import_rows(self, rows: Iterable[tuple], first_row: int = 1) -> ImportResult:
+        """
+        Importa linhas já lidas de uma planilha
+
+        Args:
+            rows: Linhas no formato (descrição, código, marca, fornecedor, preço, quantidade, ...)
+            first_row: Número da primeira linha, usado no relatório de rejeições
+        """
+        return self.import_batches(batched(rows, self.batch_size), first_row)
+
+    def import_batches(self, batches: Iterable[List[tuple]], first_row: int = 1,
+                       workers: int = None) -> ImportResult:
+        """Importa lotes de linhas em uma única transação"""
+        result = ImportResult()
+        result.timings.update({'index': 0.0, 'parse': 0.0, 'write': 0.0})
+        started = time.perf_counter()
+
+        with connection():
+            index = self._build_index()
+            suppliers = self._supplier_names()
+            result.timings['index'] = time.perf_counter() - started
+
+            row_number = first_row
+            # 'parse' inclui a leitura do arquivo, que alimenta a etapa de validação
+            parse_started = time.perf_counter()
+            for parsed_rows in self._parse(batches, workers or self.workers):
+                pending_updates, new_items = self._stage(parsed_rows, row_number, index, suppliers, result)
+                row_number += len(parsed_rows)
+
+                write_started = time.perf_counter()
+                result.timings['parse'] += write_started - parse_started
+                self._apply(pending_updates, list(new_items.values()))
+                # Itens recém-criados passam a ser atualizados pelos lotes seguintes
+                for key, item in new_items.items():
+                    index[key] = item.id
+                parse_started = time.perf_counter()
+                result.timings['write'] += parse_started - write_started
+
+        result.timings['total'] = time.perf_counter() - started
+        return result
+
+    @staticmethod
+    def _parse(batches: Iterable[List[tuple]], workers: int) -> Iterator[List[ParsedRow]]:
+        """Normaliza e valida os lotes, na ordem em que foram lidos"""
+        if workers <= 1:
+            for batch in batches:
+                yield parse_batch(batch)
+            return
+
+        # Janela limitada de lotes em andamento: mantém os processos ocupados
+        # sem acumular o arquivo inteiro em memória
+        window = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(parse_batch, batch))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    @staticmethod
+    def _stage(parsed_rows: List[ParsedRow], first_row: int, index: Dict[Tuple[str, str, str], int],
+               suppliers: Set[str], result: ImportResult) -> Tuple[Dict[int, Dict], Dict[Tuple[str, str, str], Item]]:
+        """Agrupa as alterações das linhas já validadas do lote por item"""
+        # Alterações pendentes: itens existentes (por ID) e itens novos (por chave)
+        pending_updates: Dict[int, Dict] = {}
+        new_items: Dict[Tuple[str, str, str], Item] = {}
+
+        for row_number, (parsed, errors) in enumerate(parsed_rows, start=first_row):
+            if errors:
+                result.rejected.append((row_number, errors))
+                continue
+            if parsed is None:
+                result.skipped += 1
+                continue
+
+            description, code, brand, supplier, price, quantity = parsed
+            key = natural_key(description, code, brand)
+            if supplier not in suppliers:
+                result.unknown_suppliers.add(supplier)
+
+            if key in new_items:
+                new_item = new_items[key]
+                new_item.suppliers_prices[supplier] = price
+                new_item.quantity = quantity
+                result.updated += 1
+            elif key in index:
+                change = pending_updates.setdefault(index[key], {'prices': {}, 'quantity': quantity})
+                change['prices'][supplier] = price
+                change['quantity'] = quantity
+                result.updated += 1
+            else:
+                new_items[key] = Item(
+                    description=description,
+                    code=code,
+                    brand=brand,
+                    status="A Comprar",
+                    quantity=quantity,
+                    suppliers_prices={supplier: price}
+                )
+                result.added += 1
+
+        return pending_updates, new_items
+
+    def _build_index(self) -> Dict[Tuple[str, str, str], int]:
+        """Mapeia a chave natural de cada item existente para seu ID"""
+        with connection() as conn:
+            cursor = conn.execute('SELECT id, description, code, brand FROM items')
+            return {natural_key(description, code, brand): item_id
+                    for item_id, description, code, brand in cursor}
+
+    @staticmethod
+    def _supplier_names() -> Set[str]:
+        """Nomes dos fornecedores cadastrados"""
+        with connection() as conn:
+            return {name for name, in conn.execute('SELECT name FROM suppliers')}
+
+    def _apply(self, pending_updates: Dict[int, Dict], new_items: List[Item]):
+        """Grava as alterações pendentes em uma única transação"""
+        with connection():
+            items = self._load_items(list(pending_updates))
+            for item in items:
+                change = pending_updates[item.id]
+                item.suppliers_prices.update(change['prices'])
+                item.quantity = change['quantity']
+
+            # Erros de gravação se propagam e desfazem a importação inteira
+            if len(items) != len(pending_updates) or ItemRepository.bulk_update(items) != len(items):
+                raise RuntimeError("Itens existentes removidos durante a importação; importação desfeita")
+            ItemRepository.bulk_create(new_items)
+
+    @staticmethod
+    def _load_items(item_ids: List[int], chunk_size: int = 500) -> List[Item]:
+        """Carrega os itens informados em consultas de até chunk_size IDs"""
+        items = []
+        with connection() as conn:
+            for start in range(0, len(item_ids), chunk_size):
+                chunk = item_ids[start:start + chunk_size]
+                placeholders = ','.join('?' * len(chunk))
+                cursor = conn.execute(f'SELECT * FROM items WHERE id IN ({placeholders})', chunk)
+                items.extend(Item.from_tuple(row) for row in cursor)
+        return items
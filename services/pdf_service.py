@@ -0,0 +1,150 @@
+"""
+Serviço de geração de pedidos em PDF do Sistema de Compras
+"""
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from database import connection
+from models.order import Order, OrderRepository
+from utils.pdf_orders import OrderPdfWriter, render_order
+from utils.spreadsheets import safe_filename, unique_name
+from .export_service import count_export_rows
+from .import_readers import ProgressCallback, ProgressTracker
+
+MANIFEST_NAME = "manifest.json"
+
+
+def supplier_names_with_prices() -> List[str]:
+    """Fornecedores que têm ao menos um preço cadastrado, por ordem de nome"""
+    with connection() as conn:
+        cursor = conn.execute('''
+            SELECT s.name FROM suppliers s
+            WHERE EXISTS (SELECT 1 FROM item_supplier_prices p WHERE p.supplier_id = s.id)
+            GROUP BY s.name ORDER BY s.name
+        ''')
+        return [name for (name,) in cursor]
+
+
+class PdfService:
+    """Serviço responsável pelos pedidos em PDF
+
+    Os PDFs são sempre gerados a partir de um pedido gravado (orders /
+    order_lines): as linhas são lidas em lotes e desenhadas conforme chegam,
+    e reimprimir um pedido lê apenas as linhas dele.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    def generate_order(self, file_path: str, order: Order) -> Dict:
+        """
+        Gera o PDF de um pedido gravado
+
+        Args:
+            file_path: Caminho do arquivo de saída
+            order: Pedido (ver OrderRepository.create_from_items)
+
+        Returns:
+            Resumo do pedido (ver OrderPdfWriter.summary)
+        """
+        with OrderPdfWriter(file_path, f"Pedido #{order.number}", order.header_lines()) as writer:
+            for rows in OrderRepository.iter_lines(order.id, self.batch_size):
+                writer.write_rows(rows)
+        return writer.summary()
+
+    def generate_supplier_orders(self, output_dir: str, company,
+                                 suppliers: Optional[Iterable[str]] = None, workers: int = 1,
+                                 progress: ProgressCallback = None,
+                                 cancel_check: Optional[Callable[[], None]] = None) -> Dict:
+        """
+        Grava um pedido por fornecedor e gera os PDFs em paralelo
+
+        Cada pedido é gravado no banco e suas linhas são enviadas para
+        processos auxiliares que desenham os PDFs; ao final é gravado um
+        manifest.json na pasta.
+
+        Args:
+            output_dir: Pasta de destino
+            company: Empresa compradora (Company)
+            suppliers: Restringe aos fornecedores informados (None para todos com preços)
+            workers: Processos usados para desenhar os PDFs
+            progress: Callback opcional de andamento, chamado a cada pedido desenhado
+            cancel_check: Chamado antes de gravar cada pedido; levanta exceção para
+                interromper (ex.: Task.check). Os pedidos já gravados são mantidos.
+
+        Returns:
+            Conteúdo do manifesto: pedidos gerados, com páginas, totais e tempos
+        """
+        started = time.perf_counter()
+        os.makedirs(output_dir, exist_ok=True)
+        tracker = ProgressTracker(count_export_rows() if progress and suppliers is None else None, progress)
+        suppliers = list(suppliers) if suppliers is not None else supplier_names_with_prices()
+        used = {MANIFEST_NAME.lower()}
+
+        def jobs():
+            for supplier in suppliers:
+                if cancel_check:
+                    cancel_check()
+                order = OrderRepository.create_from_items(company, supplier)
+                if order is None:
+                    raise RuntimeError(f"Falha ao gravar o pedido do fornecedor {supplier}")
+                file_name = unique_name(f"pedido_{order.number}_{safe_filename(supplier)}", used)
+                rows = (row for batch in OrderRepository.iter_lines(order.id, self.batch_size) for row in batch)
+                yield (order, os.path.join(output_dir, file_name + ".pdf"),
+                       f"Pedido #{order.number}", order.header_lines(), rows)
+
+        orders = []
+        if workers <= 1:
+            for order, path, title, header, rows in jobs():
+                orders.append(self._manifest_entry(order, render_order(path, title, header, rows), tracker))
+        else:
+            # Janela limitada: no máximo 2 pedidos por processo aguardando
+            window = workers * 2
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                try:
+                    for order, path, title, header, rows in jobs():
+                        # As linhas precisam ser materializadas para seguir ao outro processo
+                        pending.append((order, executor.submit(render_order, path, title, header, list(rows))))
+                        while len(pending) >= window:
+                            done, future = pending.popleft()
+                            orders.append(self._manifest_entry(done, future.result(), tracker))
+                    while pending:
+                        done, future = pending.popleft()
+                        orders.append(self._manifest_entry(done, future.result(), tracker))
+                except BaseException:
+                    # Interrompido (ex.: cancelado): os PDFs ainda na fila não são desenhados
+                    for _, future in pending:
+                        future.cancel()
+                    raise
+
+        manifest = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'company': company.name,
+            'workers': workers,
+            'orders': orders,
+            'total_rows': sum(order['rows'] for order in orders),
+            'total_value': sum(order['total'] for order in orders),
+            'seconds': time.perf_counter() - started,
+        }
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+
+    @staticmethod
+    def _manifest_entry(order: Order, summary: Dict, tracker: ProgressTracker) -> Dict:
+        tracker.update(summary['rows'])
+        return {
+            'order': order.number,
+            'supplier': order.supplier,
+            'file': os.path.basename(summary['file_path']),
+            'rows': summary['rows'],
+            'pages': summary['pages'],
+            'total': round(summary['total'], 2),
+            'seconds': round(summary['seconds'], 4),
+        }
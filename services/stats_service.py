@@ -0,0 +1,84 @@
+"""
+Serviço de manutenção do resumo de estatísticas do Sistema de Compras
+"""
+import time
+from typing import Dict, List
+
+from database import connection
+from migrations import REBUILD_STATS
+
+# Estatísticas calculadas direto das tabelas de origem, para conferir o resumo
+_EXPECTED_STATUS = '''
+    SELECT i.status, COUNT(*),
+           COALESCE(SUM(i.quantity * (SELECT MIN(p.price) FROM item_supplier_prices p
+                                      WHERE p.item_id = i.id)), 0)
+    FROM items i
+    GROUP BY i.status
+'''
+
+_EXPECTED_SUPPLIERS = '''
+    SELECT p.supplier_id, COUNT(*), SUM(i.quantity * p.price)
+    FROM item_supplier_prices p JOIN items i ON i.id = p.item_id
+    GROUP BY p.supplier_id
+'''
+
+
+class StatsService:
+    """Serviço que reconstrói e confere o resumo de estatísticas
+
+    O resumo (stats_summary e stats_supplier_summary) é mantido pelos triggers
+    a cada alteração em itens e preços; este serviço serve para recalculá-lo do
+    zero e para verificar se ele continua de acordo com as tabelas de origem.
+    """
+
+    def __init__(self, tolerance: float = 0.01):
+        # Somas incrementais de valores REAL acumulam pequenos erros de arredondamento
+        self.tolerance = tolerance
+
+    def rebuild(self) -> Dict:
+        """
+        Recalcula o resumo a partir de items e item_supplier_prices
+
+        Returns:
+            Número de itens considerados e tempo gasto
+        """
+        started = time.perf_counter()
+        with connection() as conn:
+            for statement in REBUILD_STATS.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            items = conn.execute('SELECT COUNT(*) FROM stats_items').fetchone()[0]
+        return {'items': items, 'seconds': time.perf_counter() - started}
+
+    def check(self) -> List[str]:
+        """
+        Compara o resumo com as estatísticas calculadas das tabelas de origem
+
+        Returns:
+            Descrição de cada divergência encontrada (lista vazia se o resumo está correto)
+        """
+        with connection() as conn:
+            problems = self._compare(
+                "status",
+                conn.execute('SELECT status, item_count, total_value FROM stats_summary'),
+                conn.execute(_EXPECTED_STATUS)
+            )
+            problems += self._compare(
+                "fornecedor",
+                conn.execute('SELECT supplier_id, item_count, total_value FROM stats_supplier_summary'),
+                conn.execute(_EXPECTED_SUPPLIERS)
+            )
+        return problems
+
+    def _compare(self, label: str, stored_rows, expected_rows) -> List[str]:
+        stored = {key: (count, value) for key, count, value in stored_rows}
+        expected = {key: (count, value) for key, count, value in expected_rows}
+        problems = []
+        for key in sorted(stored.keys() | expected.keys(), key=str):
+            count, value = stored.get(key, (0, 0.0))
+            expected_count, expected_value = expected.get(key, (0, 0.0))
+            if count != expected_count:
+                problems.append(f"{label} {key}: {count} itens no resumo, {expected_count} nas tabelas")
+            if abs(value - expected_value) > self.tolerance:
+                problems.append(f"{label} {key}: valor {value:.2f} no resumo, {expected_value:.2f} nas tabelas")
+        return problems
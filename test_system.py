@@ -9,6 +9,33 @@ from pathlib import Path
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from contextlib import contextmanager
+
+
+@contextmanager
+def temporary_database(suppliers=()):
+    """Aponta o pool de conexões para um banco temporário durante o teste
+    
+    Os fornecedores informados são cadastrados antes (os preços só são
+    vinculados a fornecedores cadastrados).
+    """
+    import tempfile
+    import database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database.init_pool(Path(tmp) / "teste.db")
+        try:
+            database.create_tables()
+            from models import Supplier, SupplierRepository
+            for name in suppliers:
+                SupplierRepository.create(Supplier(name=name))
+            yield database
+        finally:
+            from models import read_cache
+            read_cache.close()
+            database.close_all_connections()
+            database.init_pool()
+
 def test_imports():
     """Testa se todas as importações estão funcionando"""
     print("🧪 Testando importações...")
@@ -73,6 +100,1049 @@ def test_database():
         print(f"❌ Erro no banco de dados: {e}")
         return False
 
+def test_connection_pool():
+    """Testa o pool de conexões"""
+    print("\n🔌 Testando pool de conexões...")
+    
+    import tempfile
+    import database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = database.ConnectionPool(Path(tmp) / "pool.db", max_connections=2,
+                                       pragmas={"foreign_keys": "ON"})
+        
+        # A mesma thread recebe de volta a mesma conexão
+        conn = pool.acquire()
+        raw = conn.raw
+        conn.close()
+        conn = pool.acquire()
+        assert conn.raw is raw
+        conn.close()
+        print("✅ Conexão reutilizada pela mesma thread")
+        
+        # PRAGMAs aplicados na abertura
+        with pool.connection() as conn:
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            # Blocos aninhados compartilham a transação
+            with pool.connection() as inner:
+                inner.execute("INSERT INTO t VALUES (1)")
+                inner.commit()  # no-op dentro de transação gerenciada
+        
+        try:
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO t VALUES (2)")
+                raise RuntimeError("falha simulada")
+        except RuntimeError:
+            pass
+        
+        with pool.connection() as conn:
+            rows = conn.execute("SELECT x FROM t").fetchall()
+        assert rows == [(1,)], rows
+        print("✅ Context manager com commit/rollback funcionando")
+        
+        stats = pool.stats()
+        assert stats['misses'] == 1 and stats['hits'] >= 4 and stats['in_use'] == 0, stats
+        print(f"✅ Estatísticas do pool: {stats['hits']} acertos, {stats['misses']} conexões abertas")
+        
+        pool.close_all()
+
+def test_migrations():
+    """Testa o mecanismo de migrações versionadas"""
+    print("\n🧱 Testando migrações...")
+    
+    import logging
+    import sqlite3
+    import tempfile
+    import migrations
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # Banco no formato antigo: só as tabelas originais, versão 0
+        conn = sqlite3.connect(Path(tmp) / "antigo.db")
+        conn.executescript(migrations.BASE_SCHEMA)
+        conn.execute("INSERT INTO items (description, code, brand, status, quantity, suppliers_prices) "
+                     "VALUES ('Parafuso', 'P001', 'ABC', 'A Comprar', 1, '{\"Fornecedor A\": 2.5}')")
+        conn.execute("INSERT INTO items (description, code, brand, status, quantity, suppliers_prices) "
+                     "VALUES ('Parafuso', 'P001', 'ABC', 'Comprado', 3, '{\"Fornecedor B\": 2.0}')")
+        conn.execute("INSERT INTO suppliers (name, cnpj, seller_name) VALUES ('Fornecedor A', '', '')")
+        conn.execute("INSERT INTO suppliers (name, cnpj, seller_name) VALUES ('X', '11222333000181', 'V')")
+        conn.execute("INSERT INTO suppliers (name, cnpj, seller_name) VALUES ('Y', '11222333000181', 'V')")
+        conn.commit()
+        
+        # CNPJ duplicado interrompe a migração 4 sem desfazer as anteriores
+        try:
+            migrations.migrate(conn)
+            raise AssertionError("Migração com CNPJ duplicado não falhou")
+        except sqlite3.IntegrityError:
+            pass
+        assert migrations.get_version(conn) == 3
+        # Só o preço do fornecedor cadastrado é vinculado
+        prices = conn.execute("SELECT price FROM item_supplier_prices ORDER BY item_id").fetchall()
+        assert prices == [(2.5,)], prices
+        print("✅ Migração interrompida e desfeita em caso de erro")
+        
+        conn.execute("UPDATE suppliers SET cnpj = '11444777000161' WHERE name = 'Y'")
+        conn.commit()
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        migrations.logger.addHandler(handler)
+        try:
+            assert migrations.migrate(conn) == migrations.CURRENT_VERSION
+        finally:
+            migrations.logger.removeHandler(handler)
+        
+        # Duplicados fundidos no menor ID, com cópia prévia do banco e IDs no log
+        items = conn.execute("SELECT id, status, quantity, suppliers_prices FROM items").fetchall()
+        assert items == [(1, 'Comprado', 3, '{"Fornecedor A": 2.5, "Fornecedor B": 2.0}')], items
+        backups = list((Path(tmp) / "backups").glob("backup_antes_migracao_5_*.db"))
+        assert len(backups) == 1, backups
+        backup = sqlite3.connect(backups[0])
+        assert backup.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+        backup.close()
+        assert any("fundidos no item 1" in record.getMessage() for record in records)
+        print("✅ Itens duplicados fundidos com backup e registro no log")
+        
+        suppliers = [row[0] for row in conn.execute("SELECT name FROM suppliers ORDER BY id")]
+        assert suppliers == ['Fornecedor A', 'X', 'Y'], suppliers
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        expected = {'idx_items_status', 'idx_items_code', 'idx_items_natural_key', 'idx_suppliers_cnpj'}
+        assert expected <= indexes, expected - indexes
+        conn.close()
+        print(f"✅ Banco migrado até a versão {migrations.CURRENT_VERSION}")
+    
+    # ANALYZE só quando uma migração foi aplicada; abrir um banco atual não recalcula
+    with temporary_database() as database:
+        with database.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+            conn.execute("DELETE FROM sqlite_stat1")
+        database.create_tables()
+        with database.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] == 0
+        database.optimize_database()
+        print("✅ Estatísticas do planejador recalculadas apenas após migrações")
+
+def test_supplier_prices():
+    """Testa a tabela normalizada de preços por fornecedor"""
+    print("\n🏷️ Testando preços por fornecedor...")
+    
+    with temporary_database(suppliers=("Fornecedor A", "Fornecedor B")) as database:
+        from models import Item, ItemFilter, ItemRepository, Supplier, SupplierRepository
+        
+        item_id = ItemRepository.create(Item(
+            description="Parafuso", code="P001", brand="ABC", quantity=5,
+            suppliers_prices={"Fornecedor A": 2.5, "Fornecedor B": 3.0}
+        ))
+        database.insert_item("Porca", "P002", "ABC", "Comprado", 2, {"Fornecedor B": 1.0})
+        
+        items = ItemRepository.get_by_supplier("Fornecedor A")
+        assert [item.id for item in items] == [item_id], items
+        
+        rows = ItemRepository.find(ItemFilter(status="Comprado", supplier="Fornecedor B"))
+        assert [row.description for row in rows] == ["Porca"], rows
+        print("✅ Filtros por fornecedor usando a tabela normalizada")
+        
+        # Atualizar o JSON mantém a tabela sincronizada
+        item = ItemRepository.get_by_id(item_id)
+        del item.suppliers_prices["Fornecedor A"]
+        ItemRepository.update(item)
+        assert ItemRepository.get_by_supplier("Fornecedor A") == []
+        print("✅ Sincronização de preços funcionando")
+        
+        # Nomes não cadastrados ficam só no JSON até o fornecedor ser cadastrado
+        item.suppliers_prices["Fornecedr C"] = 4.0
+        ItemRepository.update(item)
+        assert "Fornecedr C" not in SupplierRepository.get_names()
+        assert ItemRepository.get_by_supplier("Fornecedr C") == []
+        SupplierRepository.create(Supplier(name="Fornecedr C"))
+        assert [i.id for i in ItemRepository.get_by_supplier("Fornecedr C")] == [item_id]
+        print("✅ Apenas fornecedores cadastrados recebem preços")
+
+def test_bulk_operations():
+    """Testa as operações em lote do repositório de itens"""
+    print("\n📚 Testando operações em lote...")
+    
+    with temporary_database(suppliers=("Fornecedor A", "Fornecedor B")):
+        import sqlite3
+        from models import Item, ItemRepository
+        
+        items = [
+            Item(description=f"Item {i}", code=f"C{i}", brand="ABC", quantity=1,
+                 suppliers_prices={"Fornecedor A": 1.0 + i})
+            for i in range(100)
+        ]
+        ids = ItemRepository.bulk_create(items)
+        assert len(ids) == 100 and [item.id for item in items] == ids, ids[:5]
+        assert ItemRepository.get_by_id(ids[42]).description == "Item 42"
+        
+        # Falha no meio do lote levanta o erro e não grava nenhum item
+        try:
+            ItemRepository.bulk_create([Item(description="Item 100", code="C100", quantity=1),
+                                        Item(description="Item 0", code="C0", brand="ABC", quantity=1)])
+            raise AssertionError("bulk_create com item duplicado não levantou erro")
+        except sqlite3.IntegrityError:
+            pass
+        assert ItemRepository.count() == 100
+        print("✅ bulk_create funcionando")
+        
+        for item in items[:10]:
+            item.status = "Comprado"
+        assert ItemRepository.bulk_update(items[:10]) == 10
+        try:
+            ItemRepository.bulk_update([Item(id=ids[0], description="Item 0", code="C0", brand="ABC",
+                                             status="A Comprar", quantity=1),
+                                        Item(id=ids[1], description="Item 2", code="C2", brand="ABC", quantity=1)])
+            raise AssertionError("bulk_update com chave duplicada não levantou erro")
+        except sqlite3.IntegrityError:
+            pass
+        assert ItemRepository.get_by_id(ids[0]).status == "Comprado"
+        print("✅ bulk_update funcionando")
+        
+        upserted = ItemRepository.bulk_upsert([
+            Item(description="Item 5", code="C5", brand="ABC", quantity=7,
+                 suppliers_prices={"Fornecedor B": 3.0}),
+            Item(description="Item novo", code="N1", brand="ABC", quantity=2,
+                 suppliers_prices={"Fornecedor B": 4.0}),
+        ])
+        merged = ItemRepository.get_by_id(upserted[0])
+        assert upserted[0] == ids[5]
+        assert (merged.quantity, merged.status) == (7, "Comprado")
+        assert merged.suppliers_prices == {"Fornecedor A": 6.0, "Fornecedor B": 3.0}
+        assert len(ItemRepository.get_by_supplier("Fornecedor B")) == 2
+        
+        # Falha no meio do lote levanta o erro e não grava nenhum item
+        try:
+            ItemRepository.bulk_upsert([Item(description="Item 6", code="C6", brand="ABC", quantity=3),
+                                        Item(description=None, code="X", quantity=1)])
+            raise AssertionError("bulk_upsert com item inválido não levantou erro")
+        except sqlite3.IntegrityError:
+            pass
+        assert ItemRepository.get_by_id(ids[6]).quantity == 1
+        print("✅ bulk_upsert funcionando")
+
+def test_item_statistics():
+    """Testa o resumo de estatísticas mantido pelos triggers"""
+    print("\n📊 Testando estatísticas dos itens...")
+    
+    with temporary_database(suppliers=("Fornecedor A", "Fornecedor B")) as database:
+        from models import Item, ItemRepository, SupplierRepository
+        from services import StatsService
+        
+        ids = ItemRepository.bulk_create([
+            Item(description="Caneta", code="C1", quantity=10,
+                 suppliers_prices={"Fornecedor A": 2.0, "Fornecedor B": 1.5}),
+            Item(description="Papel", code="P1", quantity=3, status="Comprado",
+                 suppliers_prices={"Fornecedor A": 20.0}),
+            Item(description="Grampo", code="G1", quantity=4, status="Parcialmente Comprado"),
+        ])
+        stats = ItemRepository.get_statistics()
+        assert (stats['total_items'], stats['items_to_buy'], stats['items_purchased'],
+                stats['items_partial'], stats['total_value']) == (3, 1, 1, 1, 75.0), stats
+        print("✅ Contagens e valor total (menor preço) corretos")
+        
+        pen = ItemRepository.get_by_id(ids[0])
+        pen.status = "Comprado"
+        pen.quantity = 2
+        pen.suppliers_prices = {"Fornecedor A": 1.0}
+        ItemRepository.update(pen)
+        ItemRepository.delete(ids[1])
+        SupplierRepository.delete(next(s.id for s in SupplierRepository.get_all() if s.name == "Fornecedor B"))
+        stats = ItemRepository.get_statistics()
+        assert stats['status_counts'] == {'Comprado': 1, 'Parcialmente Comprado': 1}, stats
+        assert stats['total_value'] == 2.0, stats
+        spend = SupplierRepository.get_spend_summary()
+        assert spend == [{'name': "Fornecedor A", 'item_count': 1, 'total_value': 2.0}], spend
+        print("✅ Resumo atualizado pelos triggers")
+        
+        service = StatsService()
+        assert not service.check(), service.check()
+        with database.connection() as conn:
+            conn.execute("UPDATE stats_summary SET item_count = item_count + 5")
+        assert service.check()
+        assert service.rebuild()['items'] == 2
+        assert not service.check(), service.check()
+        print("✅ Verificação e reconstrução do resumo funcionando")
+
+def test_item_pagination():
+    """Testa a paginação keyset dos itens"""
+    print("\n📄 Testando paginação de itens...")
+    
+    with temporary_database() as database:
+        from models import Item, ItemRepository
+        from models.item import PAGE_ORDERS
+        
+        ItemRepository.bulk_create([
+            Item(description=f"Item {i % 7}", code=f"C{i % 5}", brand=f"Marca {i}",
+                 status="Comprado" if i % 3 else "A Comprar", quantity=1)
+            for i in range(60)
+        ])
+        for order_by, (columns, direction) in PAGE_ORDERS.items():
+            expected = [item.id for item in sorted(
+                ItemRepository.get_all(),
+                key=lambda item: tuple(getattr(item, column) for column in columns),
+                reverse=direction == 'DESC'
+            )]
+            ids, after_id = [], None
+            while True:
+                page = ItemRepository.get_page(after_id, 8, order_by)
+                if not page:
+                    break
+                ids.extend(item.id for item in page)
+                after_id = page[-1].id
+            assert ids == expected, f"Paginação por {order_by} fora de ordem ou incompleta"
+        print("✅ Páginas completas e na ordem para todas as ordenações")
+        
+        with database.connection() as conn:
+            plan = ' '.join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM items WHERE status = ? AND id > ? "
+                "ORDER BY status, id LIMIT 8", ("Comprado", 10)))
+        assert 'idx_items_status (status=? AND rowid>?)' in plan and 'TEMP B-TREE' not in plan, plan
+        print("✅ Páginas buscadas pelo índice")
+        
+        try:
+            ItemRepository.get_page(order_by="brand")
+            raise AssertionError("Ordenação sem índice deveria ser recusada")
+        except ValueError:
+            print("✅ Ordenação inválida recusada")
+
+def test_item_search():
+    """Testa a busca textual de itens"""
+    print("\n🔎 Testando busca de itens...")
+    
+    with temporary_database():
+        from models import Item, ItemRepository
+        
+        ItemRepository.bulk_create([
+            Item(description="Parafuso sextavado inox", code="PAR-10", brand="Vonder", quantity=1),
+            Item(description="Porca sextavada", code="POR-10", brand="Parafusos Brasil", quantity=1),
+            Item(description="Caneta esferográfica azul", code="CAN-01", brand="Bic", quantity=1),
+        ])
+        
+        # Prefixo, na ordem de relevância
+        found = [item.code for item in ItemRepository.search("paraf")]
+        assert found == ["PAR-10", "POR-10"], found
+        # Vários termos exigem todos
+        assert [item.code for item in ItemRepository.search("sext inox")] == ["PAR-10"]
+        assert ItemRepository.search("  ") == [] and ItemRepository.search("xyz") == []
+        assert [row.code for row in ItemRepository.search_rows("paraf")] == found
+        print("✅ Busca por prefixo com ordenação por relevância")
+        
+        caneta = ItemRepository.search("caneta")[0]
+        caneta.description = "Lápis grafite"
+        ItemRepository.update(caneta)
+        assert ItemRepository.search("caneta") == []
+        assert [item.id for item in ItemRepository.search("lapis")] == [caneta.id]
+        assert ItemRepository.get_row(caneta.id).description == "Lápis grafite"
+        ItemRepository.delete(caneta.id)
+        assert ItemRepository.search("grafite") == []
+        print("✅ Índice de busca acompanha alterações e exclusões")
+
+def test_item_filter():
+    """Testa o filtro combinável de itens"""
+    print("\n🧮 Testando filtro de itens...")
+    
+    with temporary_database(suppliers=("Fornecedor A", "Fornecedor B")) as database:
+        from models import Item, ItemFilter, ItemRow, ItemRepository
+        from models.item import PAGE_ORDERS
+        
+        ItemRepository.bulk_create([
+            Item(description=f"Parafuso {i}" if i % 2 else f"Porca {i}", code=f"C{i:02d}",
+                 brand="ABC" if i % 3 else "XYZ", status="Comprado" if i % 4 == 0 else "A Comprar",
+                 quantity=i + 1, suppliers_prices={"Fornecedor A": 1.0 + i} if i % 5 else {"Fornecedor B": 2.0})
+            for i in range(40)
+        ])
+        items = ItemRepository.get_all()
+        cases = [
+            (ItemFilter(status="Comprado"), lambda item: item.status == "Comprado"),
+            (ItemFilter(supplier="Fornecedor A", brand="ABC"),
+             lambda item: "Fornecedor A" in item.suppliers_prices and item.brand == "ABC"),
+            (ItemFilter(supplier="Fornecedor A", min_price=10, max_price=20),
+             lambda item: 10 <= item.suppliers_prices.get("Fornecedor A", 0) <= 20),
+            (ItemFilter(min_quantity=5, max_quantity=15, text="paraf"),
+             lambda item: 5 <= item.quantity <= 15 and item.description.startswith("Parafuso")),
+            (ItemFilter(status="A Comprar", text="porca xyz", order_by="code"),
+             lambda item: item.status == "A Comprar" and item.description.startswith("Porca") and item.brand == "XYZ"),
+        ]
+        for item_filter, matches in cases:
+            columns, direction = PAGE_ORDERS[item_filter.order_by]
+            expected = [item.id for item in sorted(
+                (item for item in items if matches(item)),
+                key=lambda item: tuple(getattr(item, column) for column in columns),
+                reverse=direction == 'DESC'
+            )]
+            assert expected, item_filter
+            assert [item.id for item in ItemRepository.find(item_filter)] == expected, item_filter
+            assert ItemRepository.count(item_filter) == len(expected), item_filter
+            ids, after_id = [], None
+            while True:
+                page = ItemRepository.find(item_filter, 3, after_id)
+                if not page:
+                    break
+                ids.extend(item.id for item in page)
+                after_id = page[-1].id
+            assert ids == expected, f"Paginação do filtro incorreta: {item_filter}"
+            rows = ItemRepository.find_rows(item_filter, 3, expected[2])
+            full = ItemRepository.find(item_filter, 3, expected[2])
+            assert rows == [(i.id, i.description, i.code, i.brand, i.status, i.quantity) for i in full], item_filter
+        print("✅ Filtros combinados e paginados corretamente")
+        
+        with database.connection() as conn:
+            for item_filter, index in [
+                (ItemFilter(status="Comprado"), 'idx_items_status'),
+                (ItemFilter(brand="ABC"), 'idx_items_brand'),
+                (ItemFilter(supplier="Fornecedor A", max_price=5), 'idx_suppliers_name'),
+                (ItemFilter(text="paraf"), 'items_fts'),
+            ]:
+                sql, params = item_filter.compile(conn, 50, columns=ItemRow._fields)
+                # A consulta de lista não lê a coluna de preços
+                assert 'suppliers_prices' not in sql and 'items.*' not in sql, sql
+                plan = ' '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+                assert index in plan and 'SCAN items' not in plan.replace('SCAN items_fts', ''), plan
+        print("✅ Consultas do filtro usam os índices")
+        
+        try:
+            ItemRepository.find(ItemFilter(order_by="quantity"))
+            raise AssertionError("Ordenação sem índice deveria ser recusada")
+        except ValueError:
+            print("✅ Ordenação inválida recusada")
+
+def test_item_iterators():
+    """Testa a leitura de itens em lotes (fetchmany)"""
+    print("\n🔁 Testando iteração de itens em lotes...")
+    
+    with temporary_database(suppliers=("Fornecedor A",)) as database:
+        from models import Item, ItemFilter, ItemRepository
+        
+        ItemRepository.bulk_create([
+            Item(description=f"Parafuso {i}" if i % 2 else f"Porca {i}", code=f"C{i:02d}",
+                 status="Comprado" if i % 4 == 0 else "A Comprar", quantity=i + 1,
+                 suppliers_prices={"Fornecedor A": 1.0 + i} if i % 5 else {})
+            for i in range(40)
+        ])
+        
+        legacy = list(database.iter_all_items(batch_size=7))
+        assert sorted(row[0] for row in legacy) == sorted(item.id for item in ItemRepository.get_all())
+        assert legacy == database.get_all_items()
+        
+        for item_filter in [None, ItemFilter(status="Comprado"), ItemFilter(supplier="Fornecedor A", text="paraf"),
+                            ItemFilter(status="A Comprar", order_by="code")]:
+            expected = [item.id for item in ItemRepository.find(item_filter)]
+            assert expected, item_filter
+            assert [item.id for item in ItemRepository.iter_items(item_filter, batch_size=4)] == expected, item_filter
+            assert [row.id for row in ItemRepository.iter_rows(item_filter, batch_size=4)] == expected, item_filter
+    print("✅ Iteração em lotes na mesma ordem das consultas")
+
+def test_change_feed():
+    """Testa o feed de alterações e a atualização incremental das listas"""
+    print("\n🔔 Testando feed de alterações...")
+    
+    class FakeTree:
+        """Treeview mínimo que registra as operações recebidas"""
+        def __init__(self):
+            self.rows, self.operations = [], []
+        def get_children(self):
+            return list(self.rows)
+        def delete(self, *iids):
+            self.operations.extend(('delete', iid) for iid in iids)
+            self.rows = [row for row in self.rows if row not in iids]
+        def insert(self, parent, index, iid, values):
+            self.operations.append(('insert', iid))
+            self.rows.insert(len(self.rows) if index == 'end' else index, iid)
+        def item(self, iid, values):
+            self.operations.append(('item', iid))
+    
+    with temporary_database() as database:
+        from models import Item, ItemRepository, change_feed
+        from utils.tree_sync import TreeSync
+        
+        events = []
+        change_feed.subscribe('items', events.append)
+        try:
+            ids = ItemRepository.bulk_create([
+                Item(description=f"Item {i}", code=f"C{i}", quantity=1) for i in range(5)
+            ])
+            try:
+                with database.connection():
+                    ItemRepository.delete(ids[0])
+                    raise RuntimeError("desfazer")
+            except RuntimeError:
+                pass
+            with database.connection():
+                item = ItemRepository.get_by_id(ids[1])
+                item.status = "Comprado"
+                ItemRepository.update(item)
+                # Nada é entregue antes do commit
+                assert len(events) == 1, events
+        finally:
+            change_feed.unsubscribe('items', events.append)
+        assert [(e.action, e.ids) for e in events] == [('insert', tuple(ids)), ('update', (ids[1],))], events
+        print("✅ Alterações entregues após o commit e descartadas no rollback")
+        
+        tree = FakeTree()
+        rows = TreeSync(tree, lambda i: (i.id, i.description, i.status), lambda row: -row[0])
+        rows.append(ItemRepository.get_all())
+        tree.operations.clear()
+        
+        rows.upsert(ItemRepository.get_by_id(ids[2]))  # sem mudanças
+        item = ItemRepository.get_by_id(ids[3])
+        item.status = "Comprado"
+        rows.upsert(item)
+        assert tree.operations == [('item', str(ids[3]))], tree.operations
+        print("✅ Mudança de status toca apenas uma linha")
+        
+        new_id = ItemRepository.create(Item(description="Novo", code="N1", quantity=1))
+        rows.upsert(ItemRepository.get_by_id(new_id))
+        rows.remove(ids[0])
+        assert tree.rows[0] == str(new_id) and str(ids[0]) not in tree.rows, tree.rows
+        assert len(rows) == 5
+        print("✅ Inserções na posição da ordenação e remoções pontuais")
+
+def test_read_cache():
+    """Testa o cache de leitura dos repositórios"""
+    print("\n🗃️ Testando cache de leitura...")
+    
+    with temporary_database(suppliers=("Fornecedor A",)) as database:
+        import sqlite3
+        from models import Item, ItemFilter, ItemRepository, Company, CompanyRepository, read_cache
+        
+        ItemRepository.bulk_create([
+            Item(description=f"Item {i}", code=f"C{i:02d}", quantity=1,
+                 suppliers_prices={"Fornecedor A": 1.0 + i}) for i in range(20)
+        ])
+        company_id = CompanyRepository.create(Company(name="Empresa", cnpj="11.222.333/0001-81", buyer_name="Ana"))
+        
+        first = ItemRepository.find(ItemFilter(supplier="Fornecedor A"), 10)
+        before = read_cache.stats()
+        again = ItemRepository.find(ItemFilter(supplier="Fornecedor A"), 10)
+        item = ItemRepository.get_by_id(first[0].id)  # linha semeada pela consulta
+        after = read_cache.stats()
+        assert [i.id for i in again] == [i.id for i in first] and item.code == first[0].code
+        assert after['hits'] - before['hits'] == 2 and after['misses'] == before['misses'], after
+        print(f"✅ Consultas repetidas servidas pelo cache ({after['hits']} acertos, {after['misses']} faltas)")
+        
+        item.quantity = 99
+        ItemRepository.update(item)
+        assert ItemRepository.get_by_id(item.id).quantity == 99
+        assert ItemRepository.count(ItemFilter(min_quantity=99)) == 1
+        assert CompanyRepository.get_by_id(company_id).name == "Empresa"
+        print("✅ Gravações dos repositórios invalidam as entradas afetadas")
+        
+        # Gravação por outra conexão (outro processo) só é vista pelo data_version
+        external = sqlite3.connect(database.get_pool().db_path)
+        external.execute("UPDATE company SET name = 'Renomeada' WHERE id = ?", (company_id,))
+        external.execute("UPDATE items SET quantity = 7 WHERE id = ?", (item.id,))
+        external.commit()
+        external.close()
+        assert CompanyRepository.get_by_id(company_id).name == "Renomeada"
+        assert ItemRepository.get_by_id(item.id).quantity == 7
+        # Funções legadas de database.py gravam sem publicar no feed
+        database.update_item(item.id, item.description, item.code, item.brand, item.status, 8, item.suppliers_prices)
+        assert ItemRepository.get_by_id(item.id).quantity == 8
+        print("✅ Alterações externas detectadas pelo PRAGMA data_version")
+        
+        read_cache.max_rows = 10
+        try:
+            for i in range(1, 21):
+                ItemRepository.get_by_id(i)
+            assert read_cache.stats()['rows'] <= 10, read_cache.stats()
+            assert len(ItemRepository.get_all()) == 20
+            assert read_cache.stats()['rows'] <= 10, read_cache.stats()
+        finally:
+            read_cache.max_rows = 50000
+        print("✅ Cache respeita o limite de linhas (LRU)")
+
+def test_read_cache_supplier_writes():
+    """Testa o cache de itens após renomear e excluir fornecedores"""
+    print("\n🗃️ Testando cache de itens após gravações em fornecedores...")
+    
+    with temporary_database(suppliers=("Acme", "Beta")) as database:
+        import json
+        from models import Item, ItemRepository, SupplierRepository
+        
+        def stored_prices(item_id):
+            with database.connection() as conn:
+                row = conn.execute("SELECT suppliers_prices FROM items WHERE id = ?", (item_id,)).fetchone()
+            return json.loads(row[0])
+        
+        item_id = ItemRepository.create(Item(description="Parafuso", code="P001", quantity=1,
+                                             suppliers_prices={"Acme": 10.0, "Beta": 5.0}))
+        acme, beta = sorted(SupplierRepository.get_all(), key=lambda supplier: supplier.name)
+        assert ItemRepository.get_by_id(item_id).suppliers_prices == {"Acme": 10.0, "Beta": 5.0}
+        
+        acme.name = "AcmeNovo"
+        assert SupplierRepository.update(acme)
+        item = ItemRepository.get_by_id(item_id)
+        assert item.suppliers_prices == {"AcmeNovo": 10.0, "Beta": 5.0}, item.suppliers_prices
+        
+        # Salvar o item lido do cache não traz o nome antigo de volta
+        ItemRepository.update(item)
+        assert "Acme" not in SupplierRepository.get_names()
+        
+        # Excluir um fornecedor com preços é recusado e não mexe no JSON do item
+        ItemRepository.get_by_id(item_id)
+        assert not SupplierRepository.delete(beta.id)
+        assert stored_prices(item_id) == {"AcmeNovo": 10.0, "Beta": 5.0}
+        assert ItemRepository.get_by_id(item_id).suppliers_prices == stored_prices(item_id)
+        
+        item = ItemRepository.get_by_id(item_id)
+        del item.suppliers_prices["Beta"]
+        ItemRepository.update(item)
+        assert SupplierRepository.get_item_count(beta.id) == 0
+        assert SupplierRepository.delete(beta.id)
+        assert ItemRepository.get_by_id(item_id).suppliers_prices == stored_prices(item_id) == {"AcmeNovo": 10.0}
+    print("✅ Itens guardados acompanham as gravações em fornecedores")
+
+def test_read_cache_external_commit():
+    """Testa o cache quando outra conexão grava logo após um commit do repositório"""
+    print("\n🗃️ Testando cache com gravação externa durante um commit...")
+    
+    with temporary_database() as database:
+        import sqlite3
+        from models import Item, ItemRepository, Company, CompanyRepository
+        
+        company_id = CompanyRepository.create(Company(name="Empresa", cnpj="11.222.333/0001-81", buyer_name="Ana"))
+        item_id = ItemRepository.create(Item(description="Parafuso", code="P001", quantity=1))
+        assert CompanyRepository.get_by_id(company_id).name == "Empresa"
+        item = ItemRepository.get_by_id(item_id)
+        
+        def external_write():
+            external = sqlite3.connect(database.get_pool().db_path)
+            external.execute("UPDATE company SET name = 'Renomeada' WHERE id = ?", (company_id,))
+            external.commit()
+            external.close()
+        
+        # Registrado antes da publicação: roda entre o commit e a entrega ao cache
+        with database.connection():
+            database.after_commit(external_write)
+            item.quantity = 5
+            ItemRepository.update(item)
+        
+        assert ItemRepository.get_by_id(item_id).quantity == 5
+        assert CompanyRepository.get_by_id(company_id).name == "Renomeada"
+    print("✅ Gravação externa entre o commit e a entrega não fica escondida")
+
+def test_import_service():
+    """Testa o motor de importação de planilhas"""
+    print("\n📥 Testando importação...")
+    
+    with temporary_database(suppliers=("Fornecedor A",)):
+        from models import Item, ItemRepository
+        from services.import_service import ImportService
+        
+        ItemRepository.create(Item(description="Parafuso", code="P001", brand="Abc",
+                                   quantity=1, suppliers_prices={"Fornecedor A": 2.0}))
+        
+        rows = [
+            ("parafuso", "P001", "abc", "Fornecedor B", "R$ 2,50", 10),   # atualiza existente
+            ("Porca", "P002", None, "Fornecedor A", 1.2, 5),              # novo item
+            ("porca", "P002", "", "Fornecedor B", "1,10", 6),             # mesma chave da linha anterior
+            ("Arruela", "P003", "ABC", "", 1.0, 1),                       # sem fornecedor
+            ("Arruela", "P003", "ABC", "Fornecedor A", "abc", 1),         # preço inválido
+            (None, None, None, None, None, None),                          # linha vazia
+        ]
+        result = ImportService().import_rows(rows, first_row=2)
+        
+        assert (result.added, result.updated, result.skipped) == (1, 2, 1), result
+        assert [row for row, _ in result.rejected] == [5, 6], result.rejected
+        assert result.unknown_suppliers == {"Fornecedor B"}, result.unknown_suppliers
+        
+        items = {item.code: item for item in ItemRepository.get_all()}
+        assert items["P001"].suppliers_prices == {"Fornecedor A": 2.0, "Fornecedor B": 2.5}, items["P001"].to_dict()
+        assert items["P001"].quantity == 10
+        assert items["P002"].suppliers_prices == {"Fornecedor A": 1.2, "Fornecedor B": 1.1}, items["P002"].to_dict()
+        assert items["P002"].brand == "N/A"
+        print(f"✅ Importação: {result.added} adicionado, {result.updated} atualizados, {len(result.rejected)} rejeitadas")
+
+def test_csv_import():
+    """Testa a importação de CSV com formato brasileiro"""
+    print("\n🧾 Testando importação de CSV...")
+    
+    import tempfile
+    
+    with temporary_database(), tempfile.TemporaryDirectory() as tmp:
+        from models import ItemRepository
+        from services.import_service import ImportService, normalize_decimal
+        
+        samples = {"R$ 1.234,56": "1234.56", "1,5": "1.5", "1,234.50": "1234.50", "2.5": "2.5", 3: "3"}
+        for value, expected in samples.items():
+            assert normalize_decimal(value) == expected, (value, normalize_decimal(value))
+        
+        csv_path = Path(tmp) / "precos.csv"
+        csv_path.write_text(
+            "Descrição;Código;Marca;Fornecedor;Preço;Quantidade\n"
+            "Parafuso;P001;ABC;Fornecedor A;R$ 1.234,56;10\n"
+            "Porca;P002;;\"Fornecedor; B\";0,75;4,5\n",
+            encoding="cp1252"
+        )
+        result = ImportService().import_file(str(csv_path))
+        
+        items = {item.code: item for item in ItemRepository.get_all()}
+        assert result.added == 2 and not result.rejected, (result, result.rejected)
+        assert items["P001"].suppliers_prices == {"Fornecedor A": 1234.56}, items["P001"].to_dict()
+        assert items["P002"].suppliers_prices == {"Fornecedor; B": 0.75}, items["P002"].to_dict()
+        assert items["P002"].quantity == 4.5
+        print("✅ CSV importado com delimitador e vírgula decimal detectados")
+
+def test_parallel_import():
+    """Testa a validação da importação em processos auxiliares"""
+    print("\n⚙️ Testando importação em paralelo...")
+    
+    with temporary_database():
+        from models import ItemRepository
+        from services.import_service import ImportService
+        
+        rows = []
+        for i in range(200):
+            price = "abc" if i % 7 == 0 else f"{i + 1},50"
+            rows.append((f"Item {i // 2}", f"C{i // 2:03d}", "ABC", f"Fornecedor {i % 2}", price, 1))
+        
+        result = ImportService(batch_size=16, workers=2).import_rows(rows, first_row=2)
+        expected_rejected = [i + 2 for i in range(200) if i % 7 == 0]
+        
+        # Linhas rejeitadas na ordem do arquivo, mesmo validadas em processos diferentes
+        assert [row for row, _ in result.rejected] == expected_rejected, result.rejected[:5]
+        assert result.added + result.updated == 200 - len(expected_rejected), result
+        assert len(ItemRepository.get_all()) == result.added
+        print(f"✅ Importação em paralelo: {result.added} adicionados, {len(result.rejected)} rejeitadas em ordem")
+
+def test_export_service():
+    """Testa a exportação de planilhas"""
+    print("\n📤 Testando exportação...")
+    
+    import tempfile
+    from itertools import groupby
+    
+    with temporary_database(suppliers=("Fornecedor A", "Fornecedor B")), tempfile.TemporaryDirectory() as tmp:
+        from models import Item, ItemRepository
+        from services.export_service import (
+            ExportService, count_export_rows, iter_export_rows, iter_rows_by_supplier
+        )
+        from utils.spreadsheets import safe_filename, safe_sheet_title, unique_name
+        
+        ItemRepository.bulk_create([
+            Item(description="Parafuso", code="P001", brand="", quantity=10,
+                 suppliers_prices={"Fornecedor A": 1234.5, "Fornecedor B": 1200.0}),
+            Item(description="Porca", code="P002", brand="ABC", quantity=2.5,
+                 suppliers_prices={"Fornecedor A": 0.75}),
+        ])
+        
+        rows = [row for batch in iter_export_rows(batch_size=2) for row in batch]
+        assert rows == [
+            ("Porca", "P002", "ABC", "Fornecedor A", 0.75, 2.5, "A Comprar"),
+            ("Parafuso", "P001", "N/A", "Fornecedor A", 1234.5, 10.0, "A Comprar"),
+            ("Parafuso", "P001", "N/A", "Fornecedor B", 1200.0, 10.0, "A Comprar"),
+        ], rows
+        assert count_export_rows() == 3
+        assert count_export_rows("Fornecedor B") == 1
+        print("✅ Linhas da exportação lidas do cursor em lotes")
+        
+        grouped = {name: [row[0] for row in rows]
+                   for name, rows in groupby(iter_rows_by_supplier(batch_size=2), key=lambda row: row[3])}
+        assert grouped == {"Fornecedor A": ["Porca", "Parafuso"], "Fornecedor B": ["Parafuso"]}, grouped
+        
+        used = set()
+        names = [unique_name(safe_sheet_title(name), used, max_length=31)
+                 for name in ["Forn: A/B", "forn_ A_B", "X" * 40]]
+        assert names == ["Forn_ A_B", "forn_ A_B (2)", "X" * 31], names
+        assert safe_filename('A<B>?') == "A_B_"
+        print("✅ Linhas agrupadas por fornecedor em uma leitura")
+        
+        try:
+            import openpyxl
+        except ImportError:
+            print("⚠️ openpyxl não instalado; gravação da planilha não testada")
+            return
+        
+        path = Path(tmp) / "itens.xlsx"
+        assert ExportService(batch_size=2).export_items(str(path)) == 3
+        ws = openpyxl.load_workbook(path).active
+        price_cell = ws.cell(row=3, column=5)
+        assert price_cell.value == 1234.5 and "R$" in price_cell.number_format, (price_cell.value, price_cell.number_format)
+        print("✅ Planilha gravada com preços numéricos")
+        
+        files = ExportService().export_by_supplier(str(Path(tmp) / "fornecedores"))
+        assert sorted(files) == ["Fornecedor A", "Fornecedor B"], files
+        assert all(Path(f).exists() for f in files.values())
+        sheets = ExportService().export_by_supplier(str(Path(tmp) / "abas.xlsx"), mode='sheets')
+        assert openpyxl.load_workbook(Path(tmp) / "abas.xlsx").sheetnames == list(sheets.values()), sheets
+        print("✅ Exportação por fornecedor em arquivos e abas")
+
+def test_pdf_orders():
+    """Testa a geração de pedidos em PDF"""
+    print("\n🧾 Testando pedidos em PDF...")
+    
+    from utils.pdf_orders import format_currency, format_quantity
+    
+    assert format_currency(1234.5) == "R$ 1.234,50"
+    assert format_quantity(2.5) == "2,5" and format_quantity(10.0) == "10"
+    print("✅ Valores formatados no padrão brasileiro")
+    
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        print("⚠️ reportlab não instalado; geração do PDF não testada")
+        return
+    
+    import json
+    import tempfile
+    from utils.pdf_orders import OrderPdfWriter
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = ((f"Item {i}", f"C{i}", "ABC", "Fornecedor A" if i % 2 else "Fornecedor B", 1.5, 2)
+                for i in range(500))
+        path = Path(tmp) / "pedido.pdf"
+        with OrderPdfWriter(str(path), "Pedido #1", ["Empresa: Teste"]) as writer:
+            writer.write_rows(rows)
+        summary = writer.summary()
+        
+        assert summary['rows'] == 500 and summary['pages'] >= 10, summary
+        assert abs(summary['total'] - 1500.0) < 1e-6, summary
+        assert path.read_bytes().startswith(b"%PDF")
+        print(f"✅ Pedido com {summary['rows']} linhas paginado em {summary['pages']} páginas")
+    
+    suppliers = ("Fornecedor 0", "Fornecedor 1", "Fornecedor 2", "Fornecedor/X")
+    with temporary_database(suppliers=suppliers), tempfile.TemporaryDirectory() as tmp:
+        from models import Item, ItemRepository
+        from models.company import Company
+        from services.pdf_service import PdfService
+        
+        ItemRepository.bulk_create([
+            Item(description=f"Item {i}", code=f"C{i}", quantity=2,
+                 suppliers_prices={f"Fornecedor {i % 3}": 10.0, "Fornecedor/X": 1.0})
+            for i in range(30)
+        ])
+        company = Company(name="Empresa Teste", cnpj="11222333000181", buyer_name="Comprador")
+        reported = []
+        manifest = PdfService().generate_supplier_orders(tmp, company, workers=2, progress=reported.append)
+        
+        orders = {order['supplier']: order for order in manifest['orders']}
+        assert sorted(orders) == list(suppliers), sorted(orders)
+        assert orders["Fornecedor/X"]['rows'] == 30 and orders["Fornecedor 0"]['total'] == 200.0, orders
+        assert all((Path(tmp) / order['file']).exists() for order in manifest['orders'])
+        assert json.loads((Path(tmp) / "manifest.json").read_text(encoding="utf-8")) == manifest
+        assert len(reported) == 4, reported
+        assert (reported[-1]['rows'], reported[-1]['percent']) == (60, 100.0), reported[-1]
+        print(f"✅ {len(orders)} pedidos por fornecedor gerados em paralelo com manifesto")
+        
+        # Cancelado após o primeiro fornecedor, os seguintes não são gravados
+        checks = []
+        
+        def cancel_after_first():
+            checks.append(1)
+            if len(checks) > 1:
+                raise InterruptedError("cancelado")
+        
+        cancelled_dir = Path(tmp) / "cancelado"
+        try:
+            PdfService().generate_supplier_orders(str(cancelled_dir), company, cancel_check=cancel_after_first)
+            raise AssertionError("Cancelamento dos pedidos por fornecedor ignorado")
+        except InterruptedError:
+            pass
+        assert len(list(cancelled_dir.glob("*.pdf"))) == 1, list(cancelled_dir.iterdir())
+        print("✅ Pedidos por fornecedor interrompidos pelo cancelamento")
+
+def test_orders():
+    """Testa os pedidos persistidos"""
+    print("\n🧾 Testando pedidos...")
+    
+    with temporary_database(suppliers=("Fornecedor A", "Fornecedor B")) as database:
+        from models import Item, ItemRepository, Company, OrderRepository
+        
+        ids = ItemRepository.bulk_create([
+            Item(description="Parafuso", code="P001", quantity=10,
+                 suppliers_prices={"Fornecedor A": 2.0, "Fornecedor B": 1.5}),
+            Item(description="Porca", code="P002", quantity=4,
+                 suppliers_prices={"Fornecedor A": 0.5, "Fornecedor C": 0.4}),
+        ])
+        company = Company(name="Empresa Teste", cnpj="11222333000181", buyer_name="Comprador")
+        
+        first = OrderRepository.create_from_items(company, "Fornecedor A")
+        assert first is not None and (first.line_count, first.total) == (2, 22.0), first and first.to_dict()
+        lines = [row for batch in OrderRepository.iter_lines(first.id) for row in batch]
+        assert lines == [("Porca", "P002", "N/A", "Fornecedor A", 0.5, 4.0),
+                         ("Parafuso", "P001", "N/A", "Fornecedor A", 2.0, 10.0)], lines
+        print("✅ Pedido gravado com linhas e totais")
+        
+        # Números nunca são reutilizados, mesmo após excluir o último pedido
+        OrderRepository.delete(first.id)
+        second = OrderRepository.create_from_items(company)
+        assert second.number == first.number + 1, (first.number, second.number)
+        assert OrderRepository.next_number() == second.number + 1
+        assert OrderRepository.get_by_id(first.id) is None
+        assert second.line_count == 3
+        print("✅ Numeração sequencial sem reutilização")
+        
+        # O preço do fornecedor não cadastrado fica fora do pedido, mas é informado
+        assert first.unknown_suppliers == []
+        assert second.unknown_suppliers == ["Fornecedor C"], second.unknown_suppliers
+        assert ItemRepository.get_unregistered_suppliers([ids[0]]) == []
+        print("✅ Preços de fornecedores não cadastrados informados no pedido")
+        
+        # Excluir o item não altera o pedido já gravado
+        ItemRepository.delete(ids[0])
+        lines = [row for batch in OrderRepository.iter_lines(second.id) for row in batch]
+        assert len(lines) == 3, lines
+        
+        with database.connection() as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM order_lines WHERE order_id = ? ORDER BY line_no", (1,)))
+        assert "PRIMARY KEY" in plan and "TEMP B-TREE" not in plan, plan
+        print("✅ Reimpressão lê apenas as linhas do pedido")
+
+def test_task_executor():
+    """Testa a execução de tarefas em segundo plano com entrega na thread da interface"""
+    print("\n🧵 Testando tarefas em segundo plano...")
+    
+    class FakeWidget:
+        """Widget mínimo: after() agenda e pump() executa, como o laço do Tk"""
+        def __init__(self):
+            self.jobs, self.next_job = {}, 0
+        def after(self, ms, callback):
+            self.next_job += 1
+            self.jobs[self.next_job] = callback
+            return self.next_job
+        def after_cancel(self, job):
+            self.jobs.pop(job, None)
+        def pump(self):
+            jobs, self.jobs = self.jobs, {}
+            for callback in jobs.values():
+                callback()
+    
+    import tempfile
+    import threading
+    import time
+    from utils.task_executor import TaskExecutor
+    
+    widget = FakeWidget()
+    executor = TaskExecutor(widget, workers=2)
+    main_thread = threading.get_ident()
+    
+    def wait(condition, timeout=30.0):
+        """Roda o "laço da interface" até a condição"""
+        deadline = time.perf_counter() + timeout
+        while not condition() and time.perf_counter() < deadline:
+            widget.pump()
+            time.sleep(0.005)
+    
+    try:
+        events = []
+        
+        def count(task):
+            for i in range(1, 201):
+                task.progress(i)
+            return 'fim'
+        
+        executor.submit(count, "Contando",
+                        on_done=lambda result: events.append(('done', result, threading.get_ident())),
+                        on_progress=lambda value: events.append(('progress', value, threading.get_ident())))
+        wait(lambda: not executor.active)
+        progress = [value for kind, value, _ in events if kind == 'progress']
+        assert events[-1][:2] == ('done', 'fim'), events[-3:]
+        assert all(thread == main_thread for _, _, thread in events)
+        # Relatos acumulados enquanto a interface não rodou são substituídos pelo mais recente
+        assert progress and len(progress) <= 200 and progress == sorted(progress), progress
+        print(f"✅ Resultado e andamento entregues na thread da interface ({len(progress)} de 200 relatos)")
+        
+        outcome = []
+        
+        def endless(task):
+            while True:
+                task.progress(None)
+                time.sleep(0.001)
+        
+        task = executor.submit(endless, on_cancel=lambda: outcome.append('cancelled'))
+        executor.submit(lambda task: 1 / 0, on_error=lambda error: outcome.append(type(error).__name__))
+        task.cancel()
+        wait(lambda: not executor.active)
+        assert sorted(outcome) == ['ZeroDivisionError', 'cancelled'], outcome
+        print("✅ Cancelamento e erros entregues aos callbacks")
+        
+        received = []
+        listener = executor.on_main_thread(lambda value: received.append((value, threading.get_ident())))
+        worker = threading.Thread(target=listener, args=('feed',))
+        worker.start()
+        worker.join()
+        widget.pump()
+        listener.close()
+        worker = threading.Thread(target=listener, args=('depois',))
+        worker.start()
+        worker.join()
+        widget.pump()
+        assert received == [('feed', main_thread)], received
+        print("✅ Notificações de outras threads entregues na thread da interface")
+        
+        with temporary_database(), tempfile.TemporaryDirectory() as tmp:
+            from models import ItemRepository
+            from services import ImportService
+            
+            csv_path = Path(tmp) / "itens.csv"
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("Descrição;Código;Marca;Fornecedor;Preço;Quantidade\n")
+                for i in range(300):
+                    f.write(f"Item {i};C{i:06d};Marca {i % 7};Fornecedor {i % 3};{10 + i % 50},50;{1 + i % 9}\n")
+            
+            results = []
+            
+            def cancel_on_first_batch(task):
+                def progress(value):
+                    task.cancel()
+                    task.progress(value)
+                return ImportService().import_file(str(csv_path), progress=progress)
+            
+            # Importação cancelada é desfeita
+            executor.submit(cancel_on_first_batch, on_cancel=lambda: results.append('cancelled'))
+            wait(lambda: not executor.active)
+            assert results == ['cancelled'], results
+            assert ItemRepository.count() == 0
+            
+            # Lotes pequenos para haver vários relatos de andamento
+            reported = []
+            executor.submit(lambda task: ImportService(batch_size=50).import_file(str(csv_path), progress=task.progress),
+                            on_done=results.append,
+                            on_progress=lambda value: reported.append(threading.get_ident()))
+            wait(lambda: not executor.active)
+            assert len(results) == 2 and results[1].added == 300, results
+            assert ItemRepository.count() == 300
+            assert reported and set(reported) == {main_thread}, len(reported)
+            print(f"✅ Importação cancelável em segundo plano ({len(reported)} relatos de andamento)")
+    finally:
+        executor.shutdown()
+
+def test_write_during_background_read():
+    """Testa uma gravação da interface enquanto uma tarefa percorre os itens"""
+    print("\n🔀 Testando gravação durante leitura em segundo plano...")
+    
+    with temporary_database():
+        import threading
+        import time
+        from models import Item, ItemRepository
+        
+        ids = ItemRepository.bulk_create([Item(description=f"Item {i}", code=f"C{i}", quantity=1) for i in range(50)])
+        reading, release = threading.Event(), threading.Event()
+        seen = []
+        
+        def background_read():
+            for item in ItemRepository.iter_items(batch_size=10):
+                seen.append(item.id)
+                reading.set()
+                release.wait(10)
+        
+        worker = threading.Thread(target=background_read)
+        worker.start()
+        try:
+            assert reading.wait(5)
+            item = ItemRepository.get_by_id(ids[0])
+            item.quantity = 9
+            started = time.perf_counter()
+            assert ItemRepository.update(item)
+            assert time.perf_counter() - started < 1.0
+        finally:
+            release.set()
+            worker.join(10)
+        assert ItemRepository.get_by_id(ids[0]).quantity == 9
+        assert len(seen) == 50
+    print("✅ Gravação não espera pela leitura aberta em outra thread (WAL)")
+
 def test_models():
     """Testa os modelos"""
     print("\n📦 Testando modelos...")
@@ -124,6 +1194,21 @@ def test_models():
         else:
             print("✅ Modelo Supplier funcionando")
         
+        # Preços lidos do banco só são decodificados no primeiro acesso
+        row = (1, "Item", "C1", None, "A Comprar", 2, '{"Fornecedor A": 3.5}')
+        loaded = Item.from_tuple(row)
+        if loaded._suppliers_prices is not None or loaded.prices_json() != row[6] or loaded.brand != "N/A":
+            print("❌ Item decodificou os preços antes do acesso")
+            return False
+        loaded.suppliers_prices["Fornecedor B"] = 3.0
+        if loaded.get_total_value() != 6.0 or '"Fornecedor B": 3.0' not in loaded.prices_json():
+            print("❌ Preços decodificados sob demanda incorretos")
+            return False
+        if any(hasattr(model, '__dict__') for model in (item, company, supplier)):
+            print("❌ Modelos deveriam usar __slots__")
+            return False
+        print("✅ Modelos compactos com preços decodificados sob demanda")
+        
         return True
         
     except Exception as e:
@@ -175,6 +1260,34 @@ def test_validators():
         print(f"❌ Erro nos validadores: {e}")
         return False
 
+def test_batch_validation():
+    """Testa a validação em lote"""
+    print("\n🧮 Testando validação em lote...")
+    
+    from utils import CNPJValidator, ItemValidator, ExcelValidator, ValidationIssue, group_messages
+    
+    issues = CNPJValidator.validate_cnpjs(["11222333000181", "", "123", "11.222.333/0001-82"], first_row=1)
+    assert [(i.row, i.code) for i in issues] == [(2, 'required'), (3, 'cnpj_length'), (4, 'cnpj_invalid')], issues
+    print("✅ Coluna de CNPJs validada")
+    
+    rows = [
+        ("Item de teste", "T1", "", "Fornecedor", "25,50", "10"),
+        ("It", "T2", "", "", "abc", "0"),
+    ]
+    issues = ItemValidator.validate_items(rows)
+    expected = [ValidationIssue(1, 'description', 'too_short'), ValidationIssue(1, 'supplier', 'required'),
+                ValidationIssue(1, 'price', 'not_number'), ValidationIssue(1, 'quantity', 'too_small')]
+    assert issues == expected, issues
+    
+    # Validação por colunas igual à validação por linhas
+    columns = list(zip(*rows))
+    assert ItemValidator.validate_item_columns(columns[0], columns[1], columns[3], columns[4], columns[5]) == expected
+    
+    # As mensagens montadas sob demanda são as mesmas da validação individual
+    assert group_messages(issues)[1] == ItemValidator.validate_item_data(*rows[1]), group_messages(issues)
+    assert ExcelValidator.validate_excel_rows([("a",)]) == [ValidationIssue(0, 'row', 'columns')]
+    print("✅ Validação de itens em lote funcionando")
+
 def test_backup_service():
     """Testa o serviço de backup"""
     print("\n💾 Testando serviço de backup...")
@@ -216,8 +1329,30 @@ def main():
     tests = [
         test_imports,
         test_database,
+        test_connection_pool,
+        test_migrations,
+        test_supplier_prices,
+        test_bulk_operations,
+        test_item_statistics,
+        test_item_pagination,
+        test_item_search,
+        test_item_filter,
+        test_item_iterators,
+        test_change_feed,
+        test_read_cache,
+        test_read_cache_supplier_writes,
+        test_read_cache_external_commit,
+        test_import_service,
+        test_csv_import,
+        test_parallel_import,
+        test_export_service,
+        test_pdf_orders,
+        test_orders,
+        test_task_executor,
+        test_write_during_background_read,
         test_models,
         test_validators,
+        test_batch_validation,
         test_backup_service
     ]
     
@@ -225,7 +1360,13 @@ def main():
     total = len(tests)
     
     for test in tests:
-        if test():
+        # Testes com assert retornam None e falham levantando AssertionError
+        try:
+            result = test()
+        except Exception as e:
+            print(f"❌ Falha em {test.__name__}: {e!r}")
+            result = False
+        if result is not False:
             passed += 1
         print()
     
@@ -3,12 +3,16 @@ Módulo de utilitários do Sistema de Compras
 """
 from .validators import (
     Validator, CNPJValidator, ItemValidator, 
-    CompanyValidator, SupplierValidator, ExcelValidator
+    CompanyValidator, SupplierValidator, ExcelValidator,
+    ValidationIssue, group_messages
 )
+from .parsers import natural_key, normalize_decimal, parse_row, parse_batch
 
 __all__ = [
     'Validator', 'CNPJValidator', 'ItemValidator',
-    'CompanyValidator', 'SupplierValidator', 'ExcelValidator'
+    'CompanyValidator', 'SupplierValidator', 'ExcelValidator',
+    'ValidationIssue', 'group_messages',
+    'natural_key', 'normalize_decimal', 'parse_row', 'parse_batch'
 ]
 
 
@@ -0,0 +1,84 @@
+"""
+Normalização das linhas de planilhas importadas no Sistema de Compras
+
+Funções puras (sem acesso ao banco), para que possam rodar em processos
+auxiliares durante a importação.
+"""
+from typing import List, Optional, Tuple
+from .validators import ItemValidator
+
+# (descrição, código, marca, fornecedor, preço, quantidade) ou None, e os erros da linha
+ParsedRow = Tuple[Optional[tuple], List[str]]
+
+
+def natural_key(description: str, code: str, brand: str) -> Tuple[str, str, str]:
+    """Chave de comparação (descrição, código, marca) usada pela importação"""
+    return (description or "").upper(), code or "", (brand or "N/A").upper()
+
+
+def normalize_decimal(value) -> str:
+    """
+    Converte um número vindo da planilha para o formato aceito por float()
+
+    Aceita "R$", separador de milhar e vírgula decimal: "R$ 1.234,56" -> "1234.56".
+    O último separador presente ('.' ou ',') é tratado como decimal quando os
+    dois aparecem; vírgula sozinha é sempre decimal.
+    """
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        return str(value)
+
+    text = value.replace('R$', '').replace('\xa0', '').replace(' ', '').strip()
+    if ',' in text and '.' in text:
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        text = text.replace(',', '.') if text.count(',') == 1 else text.replace(',', '')
+    elif text.count('.') > 1:
+        text = text.replace('.', '')
+    return text
+
+
+def parse_row(row: tuple) -> ParsedRow:
+    """
+    Normaliza e valida uma linha da planilha
+
+    Colunas: descrição, código, marca, fornecedor, preço, quantidade.
+
+    Returns:
+        ((descrição, código, marca, fornecedor, preço, quantidade), []) se válida,
+        (None, erros) se inválida ou (None, []) se a linha estiver vazia
+    """
+    if not row or all(value is None or str(value).strip() == "" for value in row):
+        return None, []
+    if len(row) < 6:
+        return None, ["Linha deve ter pelo menos 6 colunas"]
+
+    description, code, brand, supplier, price, quantity = row[:6]
+
+    # Normalizar dados
+    description = str(description).strip().upper() if description else ""
+    code = str(code).strip() if code else ""
+    brand = str(brand).strip().upper() if brand else "N/A"
+    supplier = str(supplier).strip() if supplier else ""
+
+    if not description or not code or not supplier:
+        return None, ["Descrição, código e fornecedor são obrigatórios"]
+
+    price = normalize_decimal(price)
+    quantity = normalize_decimal(quantity)
+
+    errors = ItemValidator.validate_item_data(description, code, brand, supplier, price, quantity)
+    if errors:
+        return None, errors
+
+    return (description, code, brand, supplier,
+            float(price), float(quantity)), []
+
+
+def parse_batch(batch: List[tuple]) -> List[ParsedRow]:
+    """Aplica parse_row a um lote, preservando a ordem das linhas"""
+    return [parse_row(row) for row in batch]
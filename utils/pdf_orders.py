@@ -0,0 +1,209 @@
+"""
+Geração de pedidos em PDF do Sistema de Compras
+
+Desenha o pedido direto no canvas do reportlab, linha a linha, com quebra de
+página, cabeçalho da tabela repetido e totais no final. As linhas podem vir de
+um gerador: só a página atual é montada por vez. Sem acesso ao banco, para
+que possa rodar em processos auxiliares.
+"""
+import time
+from typing import Dict, Iterable, List, Optional
+
+# (título, largura, alinhamento) - a soma das larguras ocupa a área útil da página carta
+ORDER_COLUMNS = [
+    ("Descrição", 170, 'left'),
+    ("Código", 60, 'left'),
+    ("Marca", 60, 'left'),
+    ("Fornecedor", 90, 'left'),
+    ("Qtd", 42, 'right'),
+    ("Preço", 55, 'right'),
+    ("Total", 55, 'right'),
+]
+
+MARGIN = 40
+ROW_HEIGHT = 14
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONT_SIZE = 8
+
+
+def format_currency(value: float) -> str:
+    """Formata um valor em reais: 1234.5 -> 'R$ 1.234,50'"""
+    text = f"{value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    return f"R$ {text}"
+
+
+def format_quantity(value: float) -> str:
+    """Quantidade sem casas decimais desnecessárias: 10.0 -> '10', 2.5 -> '2,5'"""
+    text = f"{value:,.2f}".rstrip('0').rstrip('.')
+    return text.replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+class OrderPdfWriter:
+    """
+    Grava um pedido em PDF de forma incremental
+
+    Uso:
+        with OrderPdfWriter(path, "Pedido #1", ["Empresa: ..."]) as writer:
+            writer.write_rows(rows)
+
+    Cada linha: (descrição, código, marca, fornecedor, preço, quantidade[, ...]),
+    o mesmo formato das linhas da exportação.
+    """
+
+    def __init__(self, file_path: str, title: str, header_lines: Optional[List[str]] = None):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from reportlab.pdfgen import canvas
+
+        self.file_path = file_path
+        self.title = title
+        self.header_lines = header_lines or []
+        self.width, self.height = letter
+        self._string_width = stringWidth
+        self._canvas = canvas.Canvas(file_path, pagesize=letter, pageCompression=1)
+        self._canvas.setTitle(title)
+
+        self.page = 0
+        self.rows = 0
+        self.total = 0.0
+        self.supplier_totals: Dict[str, float] = {}
+        self._y = 0.0
+        self._start_page()
+
+    def __enter__(self) -> 'OrderPdfWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_rows(self, rows: Iterable[tuple]):
+        """Acrescenta linhas à tabela, quebrando a página quando necessário"""
+        for row in rows:
+            self.write_row(row)
+
+    def write_row(self, row: tuple):
+        """Acrescenta uma linha à tabela"""
+        description, code, brand, supplier, price, quantity = row[:6]
+        price = price or 0.0
+        quantity = quantity or 0.0
+        line_total = price * quantity
+
+        if self._y < MARGIN + ROW_HEIGHT:
+            self._new_page()
+
+        self._draw_cells([
+            description, code, brand or "N/A", supplier,
+            format_quantity(quantity), format_currency(price), format_currency(line_total)
+        ], FONT)
+        self._y -= ROW_HEIGHT
+
+        self.rows += 1
+        self.total += line_total
+        self.supplier_totals[supplier] = self.supplier_totals.get(supplier, 0.0) + line_total
+
+    def close(self):
+        """Desenha os totais e grava o arquivo"""
+        if self._canvas is None:
+            return
+        self._draw_totals()
+        self._draw_footer()
+        self._canvas.save()
+        self._canvas = None
+
+    def summary(self) -> Dict:
+        """Resumo do pedido gravado"""
+        return {
+            'file_path': self.file_path,
+            'rows': self.rows,
+            'pages': self.page,
+            'total': self.total,
+            'supplier_totals': dict(self.supplier_totals),
+        }
+
+    def _start_page(self):
+        """Cabeçalho do documento (primeira página) ou de continuação, e cabeçalho da tabela"""
+        c = self._canvas
+        self.page += 1
+        y = self.height - MARGIN
+
+        if self.page == 1:
+            c.setFont(FONT_BOLD, 14)
+            c.drawString(MARGIN, y - 4, self.title)
+            y -= 24
+            c.setFont(FONT, 10)
+            for line in self.header_lines:
+                c.drawString(MARGIN, y, line)
+                y -= 14
+        else:
+            c.setFont(FONT_BOLD, 10)
+            c.drawString(MARGIN, y, f"{self.title} (continuação)")
+            y -= 14
+
+        self._y = y - 10
+        self._draw_cells([title for title, _, _ in ORDER_COLUMNS], FONT_BOLD)
+        c.line(MARGIN, self._y - 3, self.width - MARGIN, self._y - 3)
+        self._y -= ROW_HEIGHT + 2
+
+    def _new_page(self):
+        self._draw_footer()
+        self._canvas.showPage()
+        self._start_page()
+
+    def _draw_footer(self):
+        self._canvas.setFont(FONT, 8)
+        self._canvas.drawRightString(self.width - MARGIN, MARGIN / 2, f"Página {self.page}")
+
+    def _draw_cells(self, values: List, font: str):
+        c = self._canvas
+        c.setFont(font, FONT_SIZE)
+        x = MARGIN
+        for value, (_, width, align) in zip(values, ORDER_COLUMNS):
+            text = self._fit(str(value), font, width - 4)
+            if align == 'right':
+                c.drawRightString(x + width - 2, self._y, text)
+            else:
+                c.drawString(x + 2, self._y, text)
+            x += width
+
+    def _fit(self, text: str, font: str, width: float) -> str:
+        """Corta o texto para caber na coluna"""
+        if self._string_width(text, font, FONT_SIZE) <= width:
+            return text
+        while text and self._string_width(text + "...", font, FONT_SIZE) > width:
+            text = text[:-1]
+        return text + "..."
+
+    def _draw_totals(self):
+        """Totais por fornecedor (se houver mais de um) e total geral"""
+        lines = []
+        if len(self.supplier_totals) > 1:
+            lines = [(f"Total {supplier}", value) for supplier, value in sorted(self.supplier_totals.items())]
+        lines.append(("Total geral", self.total))
+
+        needed = (len(lines) + 2) * ROW_HEIGHT
+        if self._y - needed < MARGIN:
+            self._new_page()
+
+        c = self._canvas
+        # Rótulos alinhados antes das colunas Preço e Total, valores sob a coluna Total
+        label_x = self.width - MARGIN - sum(width for _, width, _ in ORDER_COLUMNS[-2:]) - 4
+        c.line(MARGIN, self._y + ROW_HEIGHT - 3, self.width - MARGIN, self._y + ROW_HEIGHT - 3)
+        c.setFont(FONT, 9)
+        c.drawString(MARGIN + 2, self._y - 2, f"{self.rows} linhas")
+        self._y -= ROW_HEIGHT
+        for label, value in lines:
+            c.setFont(FONT_BOLD if label == "Total geral" else FONT, 9)
+            c.drawRightString(label_x, self._y - 2, label)
+            c.drawRightString(self.width - MARGIN - 2, self._y - 2, format_currency(value))
+            self._y -= ROW_HEIGHT
+
+
+def render_order(file_path: str, title: str, header_lines: List[str], rows: Iterable[tuple]) -> Dict:
+    """Gera um pedido completo; retorna o resumo com o tempo gasto (usada pelos processos auxiliares)"""
+    started = time.perf_counter()
+    with OrderPdfWriter(file_path, title, header_lines) as writer:
+        writer.write_rows(rows)
+    summary = writer.summary()
+    summary['seconds'] = time.perf_counter() - started
+    return summary
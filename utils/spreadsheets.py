@@ -0,0 +1,74 @@
+"""
+Gravação de planilhas de itens do Sistema de Compras
+
+Funções sem acesso ao banco, para que possam rodar em processos auxiliares
+durante a exportação.
+"""
+import re
+from typing import Iterable, Set
+
+EXPORT_HEADER = ["Descrição", "Código", "Marca", "Fornecedor", "Preço", "Quantidade", "Status"]
+CURRENCY_FORMAT = '"R$" #,##0.00'
+QUANTITY_FORMAT = '#,##0.##'
+
+INVALID_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]+')
+INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]+')
+MAX_SHEET_TITLE = 31
+
+
+def append_item_rows(ws, rows: Iterable[tuple]) -> int:
+    """
+    Acrescenta linhas de exportação a uma planilha write_only
+
+    Cada linha: (descrição, código, marca, fornecedor, preço, quantidade, status).
+    Preço e quantidade viram células numéricas formatadas.
+
+    Returns:
+        Número de linhas gravadas
+    """
+    from openpyxl.cell import WriteOnlyCell
+
+    count = 0
+    for description, code, brand, supplier, price, quantity, status in rows:
+        price_cell = WriteOnlyCell(ws, value=price)
+        price_cell.number_format = CURRENCY_FORMAT
+        quantity_cell = WriteOnlyCell(ws, value=quantity)
+        quantity_cell.number_format = QUANTITY_FORMAT
+        ws.append([description, code, brand, supplier, price_cell, quantity_cell, status])
+        count += 1
+    return count
+
+
+def write_items_workbook(file_path: str, rows: Iterable[tuple], title: str = "Itens") -> int:
+    """Grava um arquivo .xlsx com o cabeçalho de exportação e as linhas; retorna quantas linhas"""
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(EXPORT_HEADER)
+    count = append_item_rows(ws, rows)
+    wb.save(file_path)
+    return count
+
+
+def unique_name(name: str, used: Set[str], max_length: int = None) -> str:
+    """Acrescenta um sufixo numérico até o nome não constar em used (sem diferenciar maiúsculas)"""
+    base = name[:max_length] if max_length else name
+    candidate = base
+    counter = 2
+    while candidate.lower() in used:
+        suffix = f" ({counter})"
+        candidate = (base[:max_length - len(suffix)] if max_length else base) + suffix
+        counter += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def safe_filename(name: str) -> str:
+    """Nome de arquivo válido no Windows a partir do nome do fornecedor"""
+    return INVALID_FILENAME_CHARS.sub('_', name).strip(' .') or "fornecedor"
+
+
+def safe_sheet_title(name: str) -> str:
+    """Título de aba válido no Excel (sem []:*?/\\, até 31 caracteres)"""
+    return INVALID_SHEET_CHARS.sub('_', name).strip("' ")[:MAX_SHEET_TITLE] or "Fornecedor"
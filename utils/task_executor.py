@@ -0,0 +1,218 @@
+"""
+Execução de tarefas longas fora da thread da interface do Sistema de Compras
+
+Não importa o Tk: recebe um widget já criado e usa apenas widget.after para
+consultar, na thread da interface, a fila preenchida pelas threads de trabalho.
+Nenhum widget deve ser tocado fora dessa thread; os callbacks das tarefas
+(andamento, resultado, erro e cancelamento) sempre rodam nela.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+
+class TaskCancelled(Exception):
+    """Tarefa cancelada pelo usuário"""
+
+
+class Task:
+    """
+    Tarefa enviada ao TaskExecutor
+
+    A função da tarefa recebe o próprio Task e relata o andamento por
+    progress(), que pode ser passado direto como callback de progresso dos
+    serviços (ex.: ImportService.import_file). O cancelamento é cooperativo:
+    cancel() faz o próximo progress() (ou check()) levantar TaskCancelled.
+    """
+
+    def __init__(self, executor: 'TaskExecutor', name: str,
+                 on_progress: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.on_progress = on_progress
+        self.done = False
+        self._executor = executor
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._progress = None
+        self._progress_pending = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Pede o cancelamento da tarefa"""
+        self._cancel.set()
+
+    def check(self):
+        """Levanta TaskCancelled se o cancelamento foi pedido"""
+        if self._cancel.is_set():
+            raise TaskCancelled(self.name)
+
+    def progress(self, value: Any):
+        """
+        Relata o andamento (chamado na thread de trabalho)
+
+        Só o valor mais recente chega à interface: relatos feitos enquanto o
+        anterior ainda não foi entregue apenas o substituem.
+        """
+        self.check()
+        with self._lock:
+            self._progress = value
+            if self._progress_pending:
+                return
+            self._progress_pending = True
+        self._executor.call_soon(self._deliver_progress)
+
+    def _deliver_progress(self):
+        with self._lock:
+            value, self._progress_pending = self._progress, False
+        if not self.done and self.on_progress:
+            self.on_progress(value)
+
+
+class MainThreadCallback:
+    """Callback que, chamado fora da thread da interface, é entregue nela (ver TaskExecutor.on_main_thread)"""
+
+    def __init__(self, executor: 'TaskExecutor', callback: Callable):
+        self.callback = callback
+        self.closed = False
+        self._executor = executor
+
+    def __call__(self, *args):
+        if threading.get_ident() == self._executor._main_thread:
+            self._deliver(*args)
+        else:
+            self._executor.call_soon(self._deliver, *args)
+
+    def close(self):
+        """Descarta as chamadas ainda não entregues (ex.: a view foi destruída)"""
+        self.closed = True
+
+    def _deliver(self, *args):
+        if not self.closed:
+            self.callback(*args)
+
+
+class TaskExecutor:
+    """
+    Pool de threads para tarefas longas, com entrega dos resultados na thread da interface
+
+    Deve ser criado na thread da interface. A fila de resultados é consultada
+    a cada poll_ms milissegundos por widget.after.
+
+    Args:
+        widget: Widget Tk usado para agendar a consulta da fila
+        workers: Threads de trabalho
+        poll_ms: Intervalo entre consultas da fila (ms)
+    """
+
+    def __init__(self, widget, workers: int = 2, poll_ms: int = 50):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.active: List[Task] = []
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tarefa')
+        self._queue = queue.SimpleQueue()
+        self._main_thread = threading.get_ident()
+        self._listeners: List[Callable[[List[Task]], None]] = []
+        self._poll_job = None
+        self._closed = False
+        self._schedule_poll()
+
+    def submit(self, fn: Callable[[Task], Any], name: str = "",
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None,
+               on_progress: Optional[Callable[[Any], None]] = None) -> Task:
+        """
+        Executa fn(task) em uma thread de trabalho
+
+        Args:
+            fn: Função da tarefa; não deve tocar em widgets
+            name: Descrição da tarefa (ex.: para a barra de status)
+            on_done: Recebe o retorno de fn
+            on_error: Recebe a exceção levantada por fn
+            on_cancel: Chamado se a tarefa foi cancelada
+            on_progress: Recebe os valores passados a task.progress()
+
+        Returns:
+            Task, que permite cancelar a tarefa
+        """
+        task = Task(self, name, on_progress)
+        self.active.append(task)
+        self._notify()
+        self._pool.submit(self._run, task, fn, on_done, on_error, on_cancel)
+        return task
+
+    def call_soon(self, fn: Callable, *args):
+        """Agenda fn(*args) na thread da interface (pode ser chamado de qualquer thread)"""
+        self._queue.put((fn, args))
+
+    def on_main_thread(self, callback: Callable) -> MainThreadCallback:
+        """
+        Versão de callback que, chamada fora da thread da interface, roda nela
+
+        Útil para assinantes do feed de alterações: gravações feitas por tarefas
+        notificam as views a partir da thread de trabalho.
+        """
+        return MainThreadCallback(self, callback)
+
+    def add_listener(self, callback: Callable[[List[Task]], None]):
+        """Passa a ser avisado (na thread da interface) quando a lista de tarefas ativas muda"""
+        self._listeners.append(callback)
+
+    def cancel_all(self):
+        """Pede o cancelamento de todas as tarefas ativas"""
+        for task in self.active:
+            task.cancel()
+
+    def poll(self):
+        """Executa o que as threads de trabalho enfileiraram para a thread da interface"""
+        while True:
+            try:
+                fn, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Erro ao processar resultado de tarefa: {e}")
+
+    def shutdown(self, wait: bool = True):
+        """Cancela as tarefas ativas e encerra as threads de trabalho"""
+        self._closed = True
+        if self._poll_job is not None:
+            self.widget.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.cancel_all()
+        self._pool.shutdown(wait=wait)
+
+    def _run(self, task: Task, fn, on_done, on_error, on_cancel):
+        try:
+            task.check()
+            result = fn(task)
+        except TaskCancelled:
+            self.call_soon(self._finish, task, on_cancel, ())
+        except Exception as e:
+            self.call_soon(self._finish, task, on_error, (e,))
+        else:
+            self.call_soon(self._finish, task, on_done, (result,))
+
+    def _finish(self, task: Task, callback, args: tuple):
+        task.done = True
+        self.active.remove(task)
+        try:
+            if callback:
+                callback(*args)
+        finally:
+            self._notify()
+
+    def _notify(self):
+        for listener in list(self._listeners):
+            listener(list(self.active))
+
+    def _schedule_poll(self):
+        self.poll()
+        if not self._closed:
+            self._poll_job = self.widget.after(self.poll_ms, self._schedule_poll)
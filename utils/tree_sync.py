@@ -0,0 +1,101 @@
+"""
+Atualização incremental de listas (Treeview) do Sistema de Compras
+
+Não importa o Tk: recebe o Treeview já criado pela view.
+"""
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class TreeSync:
+    """
+    Mantém um Treeview em dia aplicando apenas as diferenças
+
+    Cada linha usa o ID do registro como iid (str(id)) e fica registrada em um
+    mapa id -> valores exibidos, então inserir, alterar ou remover um registro
+    toca só a linha dele. As linhas são mantidas na ordem dada por sort_key.
+
+    Args:
+        tree: Treeview a ser mantido
+        values: Registro -> valores das colunas (o primeiro valor é o ID)
+        sort_key: Valores -> chave crescente na ordem em que a lista é exibida
+    """
+
+    def __init__(self, tree, values: Callable[[Any], tuple], sort_key: Callable[[tuple], Any]):
+        self.tree = tree
+        self.values = values
+        self.sort_key = sort_key
+        self.rows: Dict[int, tuple] = {}
+        self._keys: List[tuple] = []  # (sort_key, id) de cada linha, na ordem exibida
+        # False enquanto a lista tiver só o início dos registros (carga por páginas)
+        self.complete = True
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def last_id(self) -> Optional[int]:
+        """ID da última linha exibida (cursor para buscar a próxima página)"""
+        return self._keys[-1][1] if self._keys else None
+
+    def clear(self):
+        """Remove todas as linhas"""
+        self.tree.delete(*self.tree.get_children())
+        self.rows.clear()
+        self._keys.clear()
+        self.complete = True
+
+    def append(self, records: Iterable[Any]) -> int:
+        """Acrescenta ao fim registros que já vêm na ordem da lista; retorna quantos entraram"""
+        count = 0
+        for record in records:
+            values = self.values(record)
+            # Um registro recebido pelo feed pode reaparecer na página seguinte
+            if values[0] in self.rows:
+                continue
+            self._keys.append(self._key(values))
+            self.rows[values[0]] = values
+            self.tree.insert('', 'end', iid=str(values[0]), values=values)
+            count += 1
+        return count
+
+    def upsert(self, record: Any) -> bool:
+        """
+        Insere ou atualiza a linha do registro; retorna True se a lista mudou
+
+        Se a chave de ordenação mudou, a linha é movida. Com a lista incompleta,
+        registros que cairiam depois da última linha ficam para a próxima página.
+        """
+        values = self.values(record)
+        record_id = values[0]
+        old = self.rows.get(record_id)
+        if old == values:
+            return False
+
+        key = self._key(values)
+        if old is not None:
+            if self._key(old) == key:
+                self.rows[record_id] = values
+                self.tree.item(str(record_id), values=values)
+                return True
+            self.remove(record_id)
+
+        index = bisect_left(self._keys, key)
+        if index == len(self._keys) and not self.complete:
+            return old is not None
+        self._keys.insert(index, key)
+        self.rows[record_id] = values
+        self.tree.insert('', index, iid=str(record_id), values=values)
+        return True
+
+    def remove(self, record_id: int) -> bool:
+        """Remove a linha do registro, se estiver na lista"""
+        values = self.rows.pop(record_id, None)
+        if values is None:
+            return False
+        del self._keys[bisect_left(self._keys, self._key(values))]
+        self.tree.delete(str(record_id))
+        return True
+
+    def _key(self, values: tuple) -> tuple:
+        return self.sort_key(values), values[0]
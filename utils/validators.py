@@ -2,10 +2,64 @@
 Validadores para o Sistema de Compras
 """
 import re
-from typing import List, Optional
+from operator import mul
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
 from config import VALIDATION_CONFIG
 
 
+FIELD_LABELS = {
+    'description': "Descrição",
+    'code': "Código",
+    'supplier': "Fornecedor",
+    'price': "Preço",
+    'quantity': "Quantidade",
+    'cnpj': "CNPJ",
+    'row': "Linha",
+}
+
+# Limites por campo: (mínimo, máximo) de comprimento ou de valor
+FIELD_LIMITS = {
+    'description': (VALIDATION_CONFIG['min_description_length'], VALIDATION_CONFIG['max_description_length']),
+    'code': (VALIDATION_CONFIG['min_code_length'], VALIDATION_CONFIG['max_code_length']),
+    'price': (VALIDATION_CONFIG['min_price'], VALIDATION_CONFIG['max_price']),
+    'quantity': (VALIDATION_CONFIG['min_quantity'], VALIDATION_CONFIG['max_quantity']),
+}
+
+ISSUE_MESSAGES = {
+    'required': "{label} é obrigatório",
+    'too_short': "{label} deve ter pelo menos {min} caracteres",
+    'too_long': "{label} deve ter no máximo {max} caracteres",
+    'not_number': "{label} deve ser um número válido",
+    'too_small': "{label} deve ser maior ou igual a {min}",
+    'too_large': "{label} deve ser menor ou igual a {max}",
+    'cnpj_length': "CNPJ deve ter 14 dígitos",
+    'cnpj_invalid': "CNPJ inválido",
+    'columns': "Linha deve ter pelo menos 6 colunas",
+}
+
+
+class ValidationIssue(NamedTuple):
+    """Problema encontrado na validação em lote; a mensagem só é montada quando pedida"""
+    row: int
+    field: str
+    code: str
+
+    @property
+    def message(self) -> str:
+        minimum, maximum = FIELD_LIMITS.get(self.field, (None, None))
+        return ISSUE_MESSAGES[self.code].format(
+            label=FIELD_LABELS.get(self.field, self.field), min=minimum, max=maximum
+        )
+
+
+def group_messages(issues: Iterable[ValidationIssue]) -> Dict[int, List[str]]:
+    """Agrupa as mensagens dos problemas por linha, na ordem encontrada"""
+    messages: Dict[int, List[str]] = {}
+    for issue in issues:
+        messages.setdefault(issue.row, []).append(issue.message)
+    return messages
+
+
 class Validator:
     """Classe base para validadores"""
     
@@ -70,53 +124,105 @@ class Validator:
         return None
 
 
+NON_DIGITS = re.compile(r'[^0-9]')
+# Pesos oficiais dos dígitos verificadores
+CNPJ_WEIGHTS_1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+CNPJ_WEIGHTS_2 = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+# Os dígitos são somados como bytes ASCII; o deslocamento de ord('0') é descontado de uma vez
+CNPJ_OFFSET_1 = 48 * sum(CNPJ_WEIGHTS_1)
+CNPJ_OFFSET_2 = 48 * sum(CNPJ_WEIGHTS_2)
+
+
 class CNPJValidator:
     """Validador específico para CNPJ"""
     
     @staticmethod
-    def validate_cnpj(cnpj: str) -> Optional[str]:
-        """Valida CNPJ usando algoritmo oficial"""
+    def check_cnpj(cnpj: str) -> Optional[str]:
+        """Retorna o código do problema do CNPJ ('required', 'cnpj_length', 'cnpj_invalid') ou None"""
         if not cnpj:
-            return "CNPJ é obrigatório"
+            return 'required'
         
         # Remove caracteres não numéricos
-        cnpj = re.sub(r'[^0-9]', '', cnpj)
+        digits = cnpj if cnpj.isascii() and cnpj.isdigit() else NON_DIGITS.sub('', cnpj)
         
         # Verifica se tem 14 dígitos
-        if len(cnpj) != 14:
-            return "CNPJ deve ter 14 dígitos"
+        if len(digits) != 14:
+            return 'cnpj_length'
         
         # Verifica se todos os dígitos são iguais
-        if cnpj == cnpj[0] * 14:
-            return "CNPJ inválido"
-        
-        # Validação do primeiro dígito verificador
-        soma = 0
-        peso = 5
-        for i in range(12):
-            soma += int(cnpj[i]) * peso
-            peso = 9 if peso == 2 else peso - 1
+        if digits == digits[0] * 14:
+            return 'cnpj_invalid'
         
-        resto = soma % 11
-        dv1 = 0 if resto < 2 else 11 - resto
+        numbers = digits.encode('ascii')
         
-        if int(cnpj[12]) != dv1:
-            return "CNPJ inválido"
+        # Validação do primeiro dígito verificador
+        resto = (sum(map(mul, numbers, CNPJ_WEIGHTS_1)) - CNPJ_OFFSET_1) % 11
+        if numbers[12] - 48 != (0 if resto < 2 else 11 - resto):
+            return 'cnpj_invalid'
         
         # Validação do segundo dígito verificador
-        soma = 0
-        peso = 6
-        for i in range(13):
-            soma += int(cnpj[i]) * peso
-            peso = 9 if peso == 2 else peso - 1
-        
-        resto = soma % 11
-        dv2 = 0 if resto < 2 else 11 - resto
-        
-        if int(cnpj[13]) != dv2:
-            return "CNPJ inválido"
+        resto = (sum(map(mul, numbers, CNPJ_WEIGHTS_2)) - CNPJ_OFFSET_2) % 11
+        if numbers[13] - 48 != (0 if resto < 2 else 11 - resto):
+            return 'cnpj_invalid'
         
         return None
+    
+    @staticmethod
+    def validate_cnpj(cnpj: str) -> Optional[str]:
+        """Valida CNPJ usando algoritmo oficial"""
+        code = CNPJValidator.check_cnpj(cnpj)
+        return ValidationIssue(0, 'cnpj', code).message if code else None
+    
+    @staticmethod
+    def validate_cnpjs(cnpjs: Iterable[str], first_row: int = 0) -> List[ValidationIssue]:
+        """Valida uma coluna de CNPJs; retorna apenas os problemas encontrados"""
+        check = CNPJValidator.check_cnpj
+        issues = []
+        for row, cnpj in enumerate(cnpjs, start=first_row):
+            code = check(cnpj)
+            if code:
+                issues.append(ValidationIssue(row, 'cnpj', code))
+        return issues
+
+
+def _number_issue(value, field: str) -> Optional[str]:
+    """Código do problema de um campo numérico, ou None"""
+    if not value:
+        return 'required'
+    try:
+        number = float(value.replace(',', '.')) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return 'not_number'
+    minimum, maximum = FIELD_LIMITS[field]
+    if number < minimum:
+        return 'too_small'
+    if number > maximum:
+        return 'too_large'
+    return None
+
+
+def _append_item_issues(issues: List[ValidationIssue], row: int, description, code,
+                        supplier, price, quantity):
+    """Acrescenta a issues os problemas de um item (mesmas regras de validate_item_data)"""
+    # Descrição e código: só o comprimento é verificado quando preenchidos
+    for field, value in (('description', description), ('code', code)):
+        if value:
+            length = len(value.strip())
+            minimum, maximum = FIELD_LIMITS[field]
+            if length < minimum:
+                issues.append(ValidationIssue(row, field, 'too_short'))
+            elif length > maximum:
+                issues.append(ValidationIssue(row, field, 'too_long'))
+    
+    if not supplier or not supplier.strip():
+        issues.append(ValidationIssue(row, 'supplier', 'required'))
+    
+    problem = _number_issue(price, 'price')
+    if problem:
+        issues.append(ValidationIssue(row, 'price', problem))
+    problem = _number_issue(quantity, 'quantity')
+    if problem:
+        issues.append(ValidationIssue(row, 'quantity', problem))
 
 
 class ItemValidator:
@@ -126,54 +232,37 @@ class ItemValidator:
     def validate_item_data(description: str, code: str, brand: str, 
                           supplier: str, price: str, quantity: str) -> List[str]:
         """Valida todos os dados de um item"""
-        errors = []
-        
-        # Validar descrição
-        desc_error = Validator.validate_length(
-            description, 
-            VALIDATION_CONFIG['min_description_length'],
-            VALIDATION_CONFIG['max_description_length'],
-            "Descrição"
-        )
-        if desc_error:
-            errors.append(desc_error)
-        
-        # Validar código
-        code_error = Validator.validate_length(
-            code,
-            VALIDATION_CONFIG['min_code_length'],
-            VALIDATION_CONFIG['max_code_length'],
-            "Código"
-        )
-        if code_error:
-            errors.append(code_error)
-        
-        # Validar fornecedor
-        supplier_error = Validator.validate_required(supplier, "Fornecedor")
-        if supplier_error:
-            errors.append(supplier_error)
-        
-        # Validar preço
-        price_error = Validator.validate_numeric(
-            price,
-            "Preço",
-            VALIDATION_CONFIG['min_price'],
-            VALIDATION_CONFIG['max_price']
-        )
-        if price_error:
-            errors.append(price_error)
-        
-        # Validar quantidade
-        quantity_error = Validator.validate_numeric(
-            quantity,
-            "Quantidade",
-            VALIDATION_CONFIG['min_quantity'],
-            VALIDATION_CONFIG['max_quantity']
-        )
-        if quantity_error:
-            errors.append(quantity_error)
-        
-        return errors
+        issues: List[ValidationIssue] = []
+        _append_item_issues(issues, 0, description, code, supplier, price, quantity)
+        return [issue.message for issue in issues]
+    
+    @staticmethod
+    def validate_items(rows: Iterable[Sequence], first_row: int = 0) -> List[ValidationIssue]:
+        """
+        Valida uma lista de itens de uma vez
+        
+        Args:
+            rows: Linhas no formato (descrição, código, marca, fornecedor, preço, quantidade)
+            first_row: Índice atribuído à primeira linha nos problemas
+        
+        Returns:
+            Problemas encontrados (linha, campo, código); mensagens via issue.message
+        """
+        issues: List[ValidationIssue] = []
+        for row, (description, code, _brand, supplier, price, quantity) in enumerate(rows, start=first_row):
+            _append_item_issues(issues, row, description, code, supplier, price, quantity)
+        return issues
+    
+    @staticmethod
+    def validate_item_columns(descriptions: Sequence, codes: Sequence, suppliers: Sequence,
+                              prices: Sequence, quantities: Sequence,
+                              first_row: int = 0) -> List[ValidationIssue]:
+        """Valida itens recebidos como colunas paralelas (mesmas regras de validate_items)"""
+        issues: List[ValidationIssue] = []
+        columns = zip(descriptions, codes, suppliers, prices, quantities)
+        for row, (description, code, supplier, price, quantity) in enumerate(columns, start=first_row):
+            _append_item_issues(issues, row, description, code, supplier, price, quantity)
+        return issues
 
 
 class CompanyValidator:
@@ -234,28 +323,24 @@ class ExcelValidator:
     @staticmethod
     def validate_excel_row(row_data: tuple) -> List[str]:
         """Valida uma linha de dados do Excel"""
-        errors = []
-        
-        if len(row_data) < 6:
-            errors.append("Linha deve ter pelo menos 6 colunas")
-            return errors
-        
-        description, code, brand, supplier, price, quantity = row_data[:6]
-        
-        # Validar dados básicos
-        item_errors = ItemValidator.validate_item_data(
-            str(description) if description else "",
-            str(code) if code else "",
-            str(brand) if brand else "",
-            str(supplier) if supplier else "",
-            str(price) if price else "",
-            str(quantity) if quantity else ""
-        )
-        
-        errors.extend(item_errors)
-        
-        return errors
-
-
-
-
+        return [issue.message for issue in ExcelValidator.validate_excel_rows([row_data])]
+    
+    @staticmethod
+    def validate_excel_rows(rows: Iterable[tuple], first_row: int = 0) -> List[ValidationIssue]:
+        """Valida linhas do Excel de uma vez; retorna apenas os problemas encontrados"""
+        issues: List[ValidationIssue] = []
+        for row, row_data in enumerate(rows, start=first_row):
+            if len(row_data) < 6:
+                issues.append(ValidationIssue(row, 'row', 'columns'))
+                continue
+            
+            description, code, _brand, supplier, price, quantity = row_data[:6]
+            _append_item_issues(
+                issues, row,
+                str(description) if description else "",
+                str(code) if code else "",
+                str(supplier) if supplier else "",
+                str(price) if price else "",
+                str(quantity) if quantity else ""
+            )
+        return issues
@@ -21,8 +21,9 @@ from services import BackupService
 class DashboardView:
     """Classe responsável pela tela de dashboard"""
     
-    def __init__(self, parent):
+    def __init__(self, parent, main_app=None):
         self.parent = parent
+        self.main_app = main_app
         self.frame = ttk.Frame(parent)
         self.backup_service = BackupService()
         
@@ -248,18 +249,19 @@ class DashboardView:
         try:
             self.suppliers_ax.clear()
             
-            suppliers = SupplierRepository.get_all()
+            # Resumo mantido pelos triggers: os 10 fornecedores de maior valor cotado
+            suppliers = SupplierRepository.get_spend_summary()[:10]
             
             if not suppliers:
-                self.suppliers_ax.text(0.5, 0.5, 'Nenhum fornecedor cadastrado', 
+                self.suppliers_ax.text(0.5, 0.5, 'Nenhum fornecedor com preços', 
                                      ha='center', va='center', transform=self.suppliers_ax.transAxes)
             else:
-                supplier_names = [s.name for s in suppliers]
-                supplier_counts = [1] * len(suppliers)  # Contador simples
+                supplier_names = [s['name'] for s in suppliers]
+                supplier_values = [s['total_value'] for s in suppliers]
                 
-                bars = self.suppliers_ax.bar(supplier_names, supplier_counts, color='#74c0fc')
-                self.suppliers_ax.set_title('Fornecedores Cadastrados', color='white', fontweight='bold')
-                self.suppliers_ax.set_ylabel('Quantidade', color='white')
+                bars = self.suppliers_ax.bar(supplier_names, supplier_values, color='#74c0fc')
+                self.suppliers_ax.set_title('Valor Cotado por Fornecedor', color='white', fontweight='bold')
+                self.suppliers_ax.set_ylabel('Valor (R$)', color='white')
                 
                 # Rotacionar labels se necessário
                 if len(supplier_names) > 3:
@@ -276,6 +278,10 @@ class DashboardView:
     
     def create_backup(self):
         """Cria um backup manual"""
+        if self.main_app:
+            # Em segundo plano, pela barra de status da janela principal
+            self.main_app.create_manual_backup(on_done=self.refresh_if_visible)
+            return
         try:
             backup_path = self.backup_service.create_backup("manual")
             if backup_path:
@@ -350,9 +356,16 @@ class DashboardView:
                 messagebox.showerror("Erro", "Backup não encontrado")
                 return
             
+            if self.main_app and self.main_app.tasks.active:
+                messagebox.showwarning("Aviso", "Aguarde o fim das tarefas em andamento", parent=window)
+                return
+            
             # Confirmar restauração
             if messagebox.askyesno("Confirmar", f"Restaurar backup {filename}?\n\nEsta ação substituirá o banco atual."):
-                if self.backup_service.restore_backup(backup_path):
+                if self.main_app:
+                    window.destroy()
+                    self.main_app.restore_backup_file(backup_path, on_done=self.refresh_if_visible)
+                elif self.backup_service.restore_backup(backup_path):
                     messagebox.showinfo("Sucesso", "Backup restaurado com sucesso!")
                     window.destroy()
                     self.update_data()
@@ -397,6 +410,11 @@ class DashboardView:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao excluir backup: {e}")
     
+    def refresh_if_visible(self):
+        """Atualiza os dados se o dashboard ainda estiver aberto (fim de uma tarefa em segundo plano)"""
+        if self.frame.winfo_exists():
+            self.update_data()
+    
     def pack(self, **kwargs):
         """Pack do frame principal"""
         self.frame.pack(**kwargs)
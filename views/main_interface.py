@@ -15,9 +15,13 @@ except Exception:
 import sys
 import os
 
-from models import Item, ItemRepository, Company, CompanyRepository, Supplier, SupplierRepository
+from models import Item, ItemFilter, ItemRepository, Company, CompanyRepository, Supplier, SupplierRepository, OrderRepository
+from models.changes import change_feed, ITEMS, COMPANIES, SUPPLIERS, DELETE
+from models.item import PAGE_ORDERS
 from utils import ItemValidator, CompanyValidator, SupplierValidator, ExcelValidator
-from services import BackupService
+from utils.tree_sync import TreeSync
+from utils.task_executor import TaskExecutor
+from services import BackupService, ImportService, ExportService, PdfService, unknown_suppliers_note
 from views.dashboard import DashboardView
 
 
@@ -32,6 +36,8 @@ class MainInterface:
         # Serviços
         self.backup_service = BackupService()
         self.backup_service.start_automatic_backup()
+        # Importações, exportações, PDFs e backups rodam fora da thread da interface
+        self.tasks = TaskExecutor(self.root)
         
         # Variáveis
         self.current_view = None
@@ -98,11 +104,17 @@ class MainInterface:
         # Indicador de backup
         self.backup_indicator = ttk.Label(self.status_frame, text="🔄 Backup: Ativo")
         self.backup_indicator.pack(side=RIGHT)
+        
+        # Andamento das tarefas em segundo plano (visível só enquanto houver alguma)
+        self.cancel_button = ttk.Button(self.status_frame, text="Cancelar", command=self.tasks.cancel_all,
+                                        bootstyle=DANGER)
+        self.progress_bar = ttk.Progressbar(self.status_frame, length=200, maximum=100, bootstyle=INFO)
+        self.tasks.add_listener(self.on_tasks_changed)
     
     def show_dashboard(self):
         """Mostra o dashboard"""
         self.clear_current_view()
-        self.current_view = DashboardView(self.main_frame)
+        self.current_view = DashboardView(self.main_frame, self)
         self.current_view.pack(fill=BOTH, expand=True)
         self.update_status("Dashboard carregado")
     
@@ -141,16 +153,65 @@ class MainInterface:
         """Atualiza a barra de status"""
         self.status_label.config(text=message)
     
-    def create_manual_backup(self):
+    def run_task(self, message, fn, on_done=None, error_title="Erro"):
+        """
+        Executa fn(task) em segundo plano, com andamento e cancelamento na barra de status
+        
+        Args:
+            message: Descrição da tarefa (ex.: "Importando")
+            fn: Função da tarefa; recebe o Task, cujo progress() serve de callback de progresso dos serviços
+            on_done: Recebe o retorno de fn, na thread da interface
+            error_title: Título da mensagem de erro
+        """
+        def on_progress(progress):
+            percent = progress.get('percent')
+            text = f"{message}: {progress['rows']} linhas"
+            if percent is not None:
+                text += f" ({percent:.0f}%)"
+            if progress.get('rows_per_second'):
+                text += f" - {progress['rows_per_second']:.0f} linhas/s"
+            self.update_status(text)
+            if percent is not None:
+                self.progress_bar.stop()
+                self.progress_bar.config(mode='determinate', value=percent)
+        
+        def on_error(error):
+            self.update_status(f"{message}: falhou")
+            messagebox.showerror(error_title, f"{message}: {error}")
+        
+        def on_cancel():
+            self.update_status(f"{message}: cancelado")
+        
+        self.update_status(f"{message}...")
+        return self.tasks.submit(fn, message, on_done=on_done, on_error=on_error,
+                                 on_cancel=on_cancel, on_progress=on_progress)
+    
+    def on_tasks_changed(self, active):
+        """Mostra o indicador de andamento enquanto houver tarefas em segundo plano"""
+        if not active:
+            self.progress_bar.stop()
+            self.progress_bar.pack_forget()
+            self.cancel_button.pack_forget()
+            return
+        if not self.progress_bar.winfo_manager():
+            self.cancel_button.pack(side=RIGHT, padx=5)
+            self.progress_bar.pack(side=RIGHT, padx=10)
+            # Sem percentual conhecido a barra fica animada até o primeiro relato de andamento
+            self.progress_bar.config(mode='indeterminate', value=0)
+            self.progress_bar.start(15)
+    
+    def create_manual_backup(self, on_done=None):
         """Cria backup manual"""
-        try:
-            backup_path = self.backup_service.create_backup("manual")
+        def done(backup_path):
             if backup_path:
+                self.update_status("Backup criado")
                 messagebox.showinfo("Sucesso", f"Backup criado com sucesso!\n{backup_path}")
+                if on_done:
+                    on_done()
             else:
                 messagebox.showerror("Erro", "Falha ao criar backup")
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao criar backup: {e}")
+        
+        self.run_task("Criando backup", lambda task: self.backup_service.create_backup("manual"), done)
     
     def show_backup_manager(self):
         """Mostra o gerenciador de backups"""
@@ -216,18 +277,33 @@ class MainInterface:
                 messagebox.showerror("Erro", "Backup não encontrado")
                 return
             
+            # A restauração fecha as conexões do banco: não pode concorrer com outras tarefas
+            if self.tasks.active:
+                messagebox.showwarning("Aviso", "Aguarde o fim das tarefas em andamento", parent=window)
+                return
+            
             # Confirmar restauração
             if messagebox.askyesno("Confirmar", f"Restaurar backup {filename}?\n\nEsta ação substituirá o banco atual."):
-                if self.backup_service.restore_backup(backup_path):
-                    messagebox.showinfo("Sucesso", "Backup restaurado com sucesso!")
-                    window.destroy()
-                    self.load_suppliers()  # Recarregar dados
-                else:
-                    messagebox.showerror("Erro", "Falha ao restaurar backup")
+                window.destroy()
+                self.restore_backup_file(backup_path)
                     
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao restaurar backup: {e}")
     
+    def restore_backup_file(self, backup_path, on_done=None):
+        """Restaura o backup em segundo plano e recarrega os dados"""
+        def done(restored):
+            if restored:
+                self.update_status("Backup restaurado")
+                messagebox.showinfo("Sucesso", "Backup restaurado com sucesso!")
+                self.load_suppliers()  # Recarregar dados
+                if on_done:
+                    on_done()
+            else:
+                messagebox.showerror("Erro", "Falha ao restaurar backup")
+        
+        self.run_task("Restaurando backup", lambda task: self.backup_service.restore_backup(backup_path), done)
+    
     def delete_backup(self, tree, window):
         """Exclui um backup selecionado"""
         try:
@@ -266,8 +342,6 @@ class MainInterface:
     def generate_excel(self):
         """Gera planilha Excel"""
         try:
-            import openpyxl
-            
             # Janela para selecionar fornecedor
             supplier_window = ttk.Toplevel(self.root)
             supplier_window.title("Exportar Excel")
@@ -281,120 +355,85 @@ class MainInterface:
             
             def export_excel():
                 supplier = supplier_combo.get().strip()
+                file_path = filedialog.asksaveasfilename(
+                    parent=supplier_window,
+                    title="Salvar planilha",
+                    defaultextension=".xlsx",
+                    initialfile="itens.xlsx",
+                    filetypes=[("Excel files", "*.xlsx")]
+                )
+                if not file_path:
+                    return
+                supplier_window.destroy()
                 
-                wb = openpyxl.Workbook()
-                ws = wb.active
-                ws.title = "Itens"
-                ws.append(["Descrição", "Código", "Marca", "Fornecedor", "Preço", "Quantidade", "Status"])
+                def export(task):
+                    rows = ExportService().export_items(file_path, supplier or None, progress=task.progress)
+                    return rows, ItemRepository.get_unregistered_suppliers(supplier=supplier or None)
                 
-                items = ItemRepository.get_all()
-                for item in items:
-                    if supplier:
-                        # Filtrar por fornecedor
-                        if supplier in item.suppliers_prices:
-                            ws.append([
-                                item.description, item.code, item.brand, supplier,
-                                f"R${item.suppliers_prices[supplier]:.2f}", 
-                                item.quantity, item.status
-                            ])
-                    else:
-                        # Todos os fornecedores
-                        for s, p in item.suppliers_prices.items():
-                            ws.append([
-                                item.description, item.code, item.brand, s,
-                                f"R${p:.2f}", item.quantity, item.status
-                            ])
+                def done(result):
+                    rows, unknown = result
+                    self.update_status(f"Planilha exportada: {rows} linhas")
+                    message = f"Planilha gerada com {rows} linhas em:\n{file_path}"
+                    if unknown:
+                        message += "\nPreços não exportados de " + unknown_suppliers_note(unknown)
+                    messagebox.showinfo("Sucesso", message)
                 
-                wb.save("itens.xlsx")
-                messagebox.showinfo("Sucesso", "Planilha gerada como 'itens.xlsx'")
+                self.run_task("Exportando", export, done, "Erro ao gerar Excel")
+            
+            def export_by_supplier():
+                output = filedialog.askdirectory(parent=supplier_window,
+                                                 title="Pasta para as planilhas dos fornecedores")
+                if not output:
+                    return
                 supplier_window.destroy()
+                
+                def export(task):
+                    files = ExportService().export_by_supplier(
+                        output, workers=os.cpu_count() or 1, progress=task.progress
+                    )
+                    return files, ItemRepository.get_unregistered_suppliers()
+                
+                def done(result):
+                    files, unknown = result
+                    self.update_status(f"{len(files)} planilhas de fornecedores exportadas")
+                    message = f"{len(files)} planilhas geradas em:\n{output}"
+                    if unknown:
+                        message += "\nPreços não exportados de " + unknown_suppliers_note(unknown)
+                    messagebox.showinfo("Sucesso", message)
+                
+                self.run_task("Exportando por fornecedor", export, done, "Erro ao gerar Excel")
             
             ttk.Button(supplier_window, text="Exportar", command=export_excel).pack(pady=10)
+            ttk.Button(supplier_window, text="Uma planilha por fornecedor",
+                       command=export_by_supplier).pack(pady=5)
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerar Excel: {e}")
     
     def import_excel(self):
-        """Importa planilha Excel"""
+        """Importa planilha Excel ou CSV"""
         try:
             file_path = filedialog.askopenfilename(
-                title="Selecione o arquivo Excel",
-                filetypes=[("Excel files", "*.xlsx")]
+                title="Selecione a planilha",
+                filetypes=[("Planilhas", "*.xlsx *.csv *.tsv"), ("Excel files", "*.xlsx"),
+                           ("CSV files", "*.csv *.tsv *.txt")]
             )
             
             if not file_path:
                 return
             
-            import openpyxl
-            
-            wb = openpyxl.load_workbook(file_path)
-            ws = wb.active
-            
-            updated_items = 0
-            added_items = 0
-            
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if len(row) < 6:
-                    continue
-                
-                description, code, brand, supplier, price, quantity, *rest = row
-                
-                # Normalizar dados
-                description = str(description).strip().upper() if description else ""
-                code = str(code).strip() if code else ""
-                brand = str(brand).strip().upper() if brand else "N/A"
-                supplier = str(supplier).strip() if supplier else ""
-                
-                if not description or not code or not supplier:
-                    continue
-                
-                # Validar dados
-                errors = ItemValidator.validate_item_data(
-                    description, code, brand, supplier, str(price), str(quantity)
-                )
-                
-                if errors:
-                    print(f"Erro na linha: {errors}")
-                    continue
-                
-                # Processar preço
-                if isinstance(price, str):
-                    price = price.replace('R$', '').replace(',', '.').strip()
-                price_value = float(price) if price else 0.0
-                quantity_value = float(quantity) if quantity else 0.0
-                
-                # Buscar item existente
-                items = ItemRepository.get_all()
-                found_match = False
-                
-                for item in items:
-                    if (item.description.upper() == description and 
-                        item.code == code and 
-                        item.brand.upper() == brand):
-                        
-                        # Atualizar item existente
-                        item.suppliers_prices[supplier] = price_value
-                        item.quantity = quantity_value
-                        ItemRepository.update(item)
-                        updated_items += 1
-                        found_match = True
-                        break
-                
-                # Adicionar novo item se não encontrado
-                if not found_match:
-                    new_item = Item(
-                        description=description,
-                        code=code,
-                        brand=brand,
-                        status="A Comprar",
-                        quantity=quantity_value,
-                        suppliers_prices={supplier: price_value}
-                    )
-                    ItemRepository.create(new_item)
-                    added_items += 1
+            def done(result):
+                print(f"Importação concluída: {result} em {result.timings['total']:.2f}s")
+                self.update_status(f"Importação concluída: {result.total_rows} linhas em {result.timings['total']:.1f}s")
+                self.load_suppliers()
+                messagebox.showinfo("Sucesso", result.summary())
             
-            messagebox.showinfo("Sucesso", 
-                              f"{updated_items} itens atualizados e {added_items} itens adicionados!")
+            # A importação é uma única transação: cancelada, nada é gravado
+            self.run_task(
+                "Importando",
+                lambda task: ImportService(workers=os.cpu_count() or 1).import_file(file_path, progress=task.progress),
+                done, "Erro ao importar Excel"
+            )
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao importar Excel: {e}")
@@ -404,8 +443,7 @@ class MainInterface:
         try:
             # Import opcional com fallback amigável
             try:
-                from reportlab.lib.pagesizes import letter
-                from reportlab.pdfgen import canvas
+                import reportlab  # noqa: F401
             except Exception:
                 messagebox.showerror("Dependência ausente", "Biblioteca reportlab não instalada. Instale para gerar PDF.")
                 return
@@ -429,37 +467,60 @@ class MainInterface:
             
             def generate_pdf_file():
                 supplier = supplier_combo.get().strip()
+                order_number = OrderRepository.next_number()
                 
-                items = ItemRepository.get_all()
-                order_number = len(items) + 1
+                file_path = filedialog.asksaveasfilename(
+                    parent=supplier_window,
+                    title="Salvar pedido",
+                    defaultextension=".pdf",
+                    initialfile=f"pedido_{order_number}.pdf",
+                    filetypes=[("PDF files", "*.pdf")]
+                )
+                if not file_path:
+                    return
+                supplier_window.destroy()
                 
-                c = canvas.Canvas(f"pedido_{order_number}.pdf", pagesize=letter)
-                c.drawString(100, 750, f"Pedido #{order_number}")
-                c.drawString(100, 730, f"Empresa: {company.name} - CNPJ: {company.cnpj}")
-                c.drawString(100, 710, f"Comprador: {company.buyer_name}")
+                def generate(task):
+                    # O pedido é gravado antes da impressão; o PDF sai das linhas gravadas
+                    order = OrderRepository.create_from_items(company, supplier or None)
+                    if order is None:
+                        raise RuntimeError("Falha ao gravar o pedido")
+                    task.check()
+                    return order, PdfService().generate_order(file_path, order)
                 
-                y = 690
-                for item in items:
-                    if supplier and supplier not in item.suppliers_prices:
-                        continue
-                    
-                    item_info = f"I: {item.description}  Cdg: {item.code}  M: {item.brand}  Qtd: {item.quantity}"
-                    
-                    if supplier:
-                        price = item.suppliers_prices.get(supplier, 0)
-                        prices_str = f"  Prç: {supplier}: R${price:.2f}"
-                    else:
-                        prices_str = "  Prç: " + ", ".join([f"{s}: R${p:.2f}" for s, p in item.suppliers_prices.items()])
-                    
-                    full_line = item_info + prices_str
-                    c.drawString(100, y, full_line)
-                    y -= 30
+                def done(result):
+                    order, summary = result
+                    self.update_status(f"Pedido #{order.number} gerado")
+                    message = f"Pedido #{order.number} gerado com {summary['rows']} linhas em {summary['pages']} página(s):\n{file_path}"
+                    if order.unknown_suppliers:
+                        message += "\nPreços fora do pedido de " + unknown_suppliers_note(order.unknown_suppliers)
+                    messagebox.showinfo("Sucesso", message)
                 
-                c.save()
-                messagebox.showinfo("Sucesso", f"Pedido gerado como 'pedido_{order_number}.pdf'")
+                self.run_task("Gerando pedido", generate, done, "Erro ao gerar PDF")
+            
+            def generate_supplier_pdfs():
+                output = filedialog.askdirectory(parent=supplier_window, title="Pasta para os pedidos")
+                if not output:
+                    return
                 supplier_window.destroy()
+                
+                def done(manifest):
+                    self.update_status(f"{len(manifest['orders'])} pedidos gerados em {manifest['seconds']:.1f}s")
+                    messagebox.showinfo("Sucesso", f"{len(manifest['orders'])} pedidos gerados em:\n{output}")
+                
+                self.run_task(
+                    "Gerando pedidos por fornecedor",
+                    # Cancelada, a tarefa para antes de gravar o pedido do próximo fornecedor
+                    lambda task: PdfService().generate_supplier_orders(
+                        output, company, workers=os.cpu_count() or 1,
+                        progress=task.progress, cancel_check=task.check
+                    ),
+                    done, "Erro ao gerar PDF"
+                )
             
             ttk.Button(supplier_window, text="Gerar PDF", command=generate_pdf_file).pack(pady=10)
+            ttk.Button(supplier_window, text="Um pedido por fornecedor",
+                       command=generate_supplier_pdfs).pack(pady=5)
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerar PDF: {e}")
@@ -489,6 +550,8 @@ Funcionalidades:
     def run(self):
         """Executa a aplicação"""
         self.root.mainloop()
+        # Tarefas canceladas param no próximo relato de andamento (importações são desfeitas)
+        self.tasks.shutdown()
     
     def __del__(self):
         """Destrutor - para o backup automático"""
@@ -496,6 +559,24 @@ Funcionalidades:
             self.backup_service.stop_automatic_backup()
 
 
+# Pausa na digitação (ms) antes de consultar a busca de itens
+SEARCH_DELAY_MS = 300
+
+
+# Linha da lista de itens e, para cada ordenação de PAGE_ORDERS, a chave
+# crescente equivalente calculada a partir da linha
+def item_row(item):
+    return (item.id, item.description, item.code, item.brand, item.status, f"{item.quantity:.2f}")
+
+
+ITEM_ROW_ORDER = {
+    'id': lambda row: -row[0],
+    'description': lambda row: (row[1], row[2], row[3]),
+    'code': lambda row: row[2],
+    'status': lambda row: row[4],
+}
+
+
 # Views específicas serão implementadas em arquivos separados
 class ItemsView:
     """View para gerenciamento de itens"""
@@ -550,17 +631,53 @@ class ItemsView:
         list_frame = ttk.LabelFrame(self.frame, text="Itens", padding=10)
         list_frame.pack(fill=BOTH, expand=True, padx=10, pady=5)
 
+        # Busca enquanto se digita (a consulta roda quando a digitação pausa) e
+        # filtros por status e fornecedor, combinados em um ItemFilter
+        search_frame = ttk.Frame(list_frame)
+        search_frame.pack(fill=X, pady=(0, 5))
+        ttk.Label(search_frame, text="Buscar").pack(side=LEFT, padx=5)
+        self.search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.search_var, width=40).pack(side=LEFT, padx=5)
+        self.search_job = None
+        self.search_var.trace_add('write', self.on_search_typed)
+
+        ttk.Label(search_frame, text="Status").pack(side=LEFT, padx=5)
+        self.filter_status_var = tk.StringVar()
+        status_combo = ttk.Combobox(search_frame, textvariable=self.filter_status_var, state='readonly', width=22,
+                                    values=["", "A Comprar", "Comprado", "Parcialmente Comprado"])
+        status_combo.pack(side=LEFT, padx=5)
+        status_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_items())
+
+        ttk.Label(search_frame, text="Fornecedor").pack(side=LEFT, padx=5)
+        self.filter_supplier_var = tk.StringVar()
+        self.filter_supplier_combo = ttk.Combobox(search_frame, textvariable=self.filter_supplier_var,
+                                                  state='readonly', width=30, values=[""] + self.main_app.suppliers)
+        self.filter_supplier_combo.pack(side=LEFT, padx=5)
+        self.filter_supplier_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_items())
+
+        # A lista é carregada em páginas conforme a rolagem (ver load_more_items)
+        tree_frame = ttk.Frame(list_frame)
+        tree_frame.pack(fill=BOTH, expand=True)
         cols = ("id", "description", "code", "brand", "status", "quantity")
-        self.items_tree = ttk.Treeview(list_frame, columns=cols, show='headings')
+        self.items_tree = ttk.Treeview(tree_frame, columns=cols, show='headings')
         for col, title in zip(cols, ["ID", "Descrição", "Código", "Marca", "Status", "Qtd"]):
-            self.items_tree.heading(col, text=title)
+            if col in PAGE_ORDERS:
+                self.items_tree.heading(col, text=title, command=lambda order_by=col: self.sort_items(order_by))
+            else:
+                self.items_tree.heading(col, text=title)
         self.items_tree.column("id", width=50, anchor='center')
         self.items_tree.column("description", width=350)
         self.items_tree.column("code", width=100)
         self.items_tree.column("brand", width=140)
         self.items_tree.column("status", width=140)
         self.items_tree.column("quantity", width=80, anchor='e')
-        self.items_tree.pack(fill=BOTH, expand=True)
+        self.items_scrollbar = ttk.Scrollbar(tree_frame, orient=VERTICAL, command=self.items_tree.yview)
+        self.items_tree.configure(yscrollcommand=self.on_items_scroll)
+        self.items_scrollbar.pack(side=RIGHT, fill=Y)
+        self.items_tree.pack(side=LEFT, fill=BOTH, expand=True)
+
+        self.items_count_var = tk.StringVar()
+        ttk.Label(list_frame, textvariable=self.items_count_var).pack(anchor='w')
 
         # Botões de CRUD
         list_actions = ttk.Frame(list_frame)
@@ -572,20 +689,109 @@ class ItemsView:
         ttk.Button(list_actions, text="Marcar Parcial", command=lambda: self.update_status_selected("Parcialmente Comprado"), bootstyle=WARNING).pack(side=LEFT, padx=5)
 
         self.editing_id = None
+        self.page_size = 200
+        self.order_by = 'id'
+        self.items_rows = TreeSync(self.items_tree, item_row, ITEM_ROW_ORDER[self.order_by])
         self.refresh_items()
+        # Gravações de itens (aqui ou em outras telas) atualizam só as linhas afetadas
+        self.changes_listener = change_feed.subscribe(ITEMS, self.main_app.tasks.on_main_thread(self.on_items_changed))
     
     def pack(self, **kwargs):
         self.frame.pack(**kwargs)
     
     def destroy(self):
+        change_feed.unsubscribe(ITEMS, self.changes_listener)
+        self.changes_listener.close()
+        if self.search_job:
+            self.frame.after_cancel(self.search_job)
         self.frame.destroy()
 
+    def current_filter(self):
+        """Filtro da lista a partir da busca, dos filtros e da coluna de ordenação"""
+        return ItemFilter(
+            status=self.filter_status_var.get() or None,
+            supplier=self.filter_supplier_var.get() or None,
+            text=self.search_var.get().strip() or None,
+            order_by=self.order_by
+        )
+
     def refresh_items(self):
-        for i in self.items_tree.get_children():
-            self.items_tree.delete(i)
-        items = ItemRepository.get_all()
-        for item in items:
-            self.items_tree.insert('', 'end', values=(item.id, item.description, item.code, item.brand, item.status, f"{item.quantity:.2f}"))
+        """Volta à primeira página da lista; as demais são carregadas ao rolar"""
+        item_filter = self.current_filter()
+        if item_filter.text:
+            self.show_search_results(item_filter)
+            return
+        self.items_rows.sort_key = ITEM_ROW_ORDER[self.order_by]
+        self.items_rows.clear()
+        self.items_rows.complete = False
+        self.loading_items = False
+        self.total_items = ItemRepository.count(item_filter)
+        self.load_more_items()
+
+    def load_more_items(self):
+        """Acrescenta a próxima página de itens à lista"""
+        self.loading_items = False
+        if self.items_rows.complete:
+            return
+        page = ItemRepository.find_rows(self.current_filter(), self.page_size, self.items_rows.last_id)
+        self.items_rows.append(page)
+        self.items_rows.complete = len(page) < self.page_size
+        self.update_items_count()
+
+    def update_items_count(self):
+        self.items_count_var.set(f"Exibindo {len(self.items_rows)} de {self.total_items} itens")
+
+    def on_search_typed(self, *args):
+        """Reagenda a busca a cada tecla; só a última, após a pausa, consulta o banco"""
+        if self.search_job:
+            self.frame.after_cancel(self.search_job)
+        self.search_job = self.frame.after(SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self.search_job = None
+        self.refresh_items()
+
+    def show_search_results(self, item_filter):
+        """Mostra os itens mais relevantes para a busca, dentro dos filtros (sem paginação)"""
+        query = item_filter.text
+        results = ItemRepository.search_rows(query, self.page_size, item_filter)
+        # A lista segue a ordem de relevância da busca
+        rank = {item.id: position for position, item in enumerate(results)}
+        self.items_rows.sort_key = lambda row: rank.get(row[0], len(rank))
+        self.items_rows.clear()
+        self.items_rows.append(results)
+        self.loading_items = False
+        self.items_count_var.set(f"{len(results)} resultado(s) para \"{query}\"")
+
+    def on_items_scroll(self, first, last):
+        """Atualiza a barra de rolagem e busca mais itens ao chegar perto do fim"""
+        self.items_scrollbar.set(first, last)
+        if float(last) > 0.9 and not self.items_rows.complete and not self.loading_items:
+            # Fora do callback de rolagem, que é chamado durante o desenho da lista
+            self.loading_items = True
+            self.items_tree.after_idle(self.load_more_items)
+
+    def sort_items(self, order_by):
+        """Ordena a lista pela coluna clicada (apenas colunas com índice; a busca segue por relevância)"""
+        self.order_by = order_by
+        self.refresh_items()
+
+    def on_items_changed(self, event):
+        """Aplica na lista apenas as linhas alteradas (ver models.changes)"""
+        item_filter = self.current_filter()
+        if len(event.ids) > self.page_size or item_filter._replace(order_by='id') != ItemFilter():
+            # Gravações em massa (ex.: importação): mais simples recarregar a primeira página.
+            # Com busca ou filtro ativo a alteração pode mudar quais itens entram: refaz a consulta.
+            self.refresh_items()
+            return
+        for item_id in event.ids:
+            item = None if event.action == DELETE else ItemRepository.get_row(item_id)
+            if item is None:
+                self.items_rows.remove(item_id)
+            else:
+                self.items_rows.upsert(item)
+        self.total_items = ItemRepository.count(item_filter)
+        self.update_items_count()
 
     def clear_form(self):
         self.editing_id = None
@@ -634,6 +840,16 @@ class ItemsView:
             if supplier and price_val is not None:
                 suppliers_prices[supplier] = price_val
 
+            # O preço fica no item, mas só entra em pedidos, exportações e
+            # estatísticas depois que o fornecedor for cadastrado
+            if suppliers_prices and supplier not in SupplierRepository.get_names():
+                if not messagebox.askyesno(
+                    "Fornecedor não cadastrado",
+                    f"O fornecedor '{supplier}' não está cadastrado: o preço não entra em pedidos, "
+                    "exportações e estatísticas até o cadastro. Salvar mesmo assim?"
+                ):
+                    return
+
             if self.editing_id:
                 item = ItemRepository.get_by_id(self.editing_id)
                 if not item:
@@ -658,7 +874,6 @@ class ItemsView:
                 else:
                     messagebox.showerror("Erro", "Falha ao criar item")
 
-            self.refresh_items()
             self.clear_form()
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao salvar item: {e}")
@@ -672,7 +887,6 @@ class ItemsView:
         if messagebox.askyesno("Confirmar", f"Excluir item ID {vals[0]}?"):
             if ItemRepository.delete(int(vals[0])):
                 messagebox.showinfo("Sucesso", "Item excluído")
-                self.refresh_items()
             else:
                 messagebox.showerror("Erro", "Falha ao excluir item")
 
@@ -688,7 +902,6 @@ class ItemsView:
             return
         item.status = new_status
         if ItemRepository.update(item):
-            self.refresh_items()
             messagebox.showinfo("Sucesso", f"Status atualizado para {new_status}")
         else:
             messagebox.showerror("Erro", "Falha ao atualizar status")
@@ -741,6 +954,9 @@ class CompaniesView:
         self.company_tree.column("cnpj", width=140)
         self.company_tree.column("buyer", width=180)
         self.company_tree.pack(fill=BOTH, expand=True)
+        # Mesma ordem de CompanyRepository.get_all (mais recentes primeiro)
+        self.company_rows = TreeSync(self.company_tree, lambda c: (c.id, c.name, c.cnpj, c.buyer_name),
+                                     lambda row: -row[0])
 
         la = ttk.Frame(list_frame)
         la.pack(fill=X, pady=5)
@@ -749,19 +965,28 @@ class CompaniesView:
 
         self.editing_id = None
         self.refresh_companies()
+        self.changes_listener = change_feed.subscribe(COMPANIES, self.main_app.tasks.on_main_thread(self.on_companies_changed))
     
     def pack(self, **kwargs):
         self.frame.pack(**kwargs)
     
     def destroy(self):
+        change_feed.unsubscribe(COMPANIES, self.changes_listener)
+        self.changes_listener.close()
         self.frame.destroy()
 
     def refresh_companies(self):
-        for i in self.company_tree.get_children():
-            self.company_tree.delete(i)
-        from models import CompanyRepository
-        for c in CompanyRepository.get_all():
-            self.company_tree.insert('', 'end', values=(c.id, c.name, c.cnpj, c.buyer_name))
+        self.company_rows.clear()
+        self.company_rows.append(CompanyRepository.get_all())
+
+    def on_companies_changed(self, event):
+        """Aplica na lista apenas as empresas alteradas"""
+        for company_id in event.ids:
+            company = None if event.action == DELETE else CompanyRepository.get_by_id(company_id)
+            if company is None:
+                self.company_rows.remove(company_id)
+            else:
+                self.company_rows.upsert(company)
 
     def clear_form(self):
         self.editing_id = None
@@ -811,7 +1036,6 @@ class CompaniesView:
                 messagebox.showinfo("Sucesso", "Empresa criada")
             else:
                 messagebox.showerror("Erro", "Falha ao criar empresa")
-        self.refresh_companies()
         self.clear_form()
 
     def delete_selected(self):
@@ -824,7 +1048,6 @@ class CompaniesView:
         if messagebox.askyesno("Confirmar", f"Excluir empresa ID {vals[0]}?"):
             if CompanyRepository.delete(int(vals[0])):
                 messagebox.showinfo("Sucesso", "Empresa excluída")
-                self.refresh_companies()
             else:
                 messagebox.showerror("Erro", "Falha ao excluir empresa")
 
@@ -876,6 +1099,9 @@ class SuppliersView:
         self.supplier_tree.column("cnpj", width=140)
         self.supplier_tree.column("seller", width=200)
         self.supplier_tree.pack(fill=BOTH, expand=True)
+        # Mesma ordem de SupplierRepository.get_all (por nome)
+        self.supplier_rows = TreeSync(self.supplier_tree, lambda s: (s.id, s.name, s.cnpj, s.seller_name),
+                                      lambda row: row[1])
 
         la = ttk.Frame(list_frame)
         la.pack(fill=X, pady=5)
@@ -884,19 +1110,30 @@ class SuppliersView:
 
         self.editing_id = None
         self.refresh_suppliers()
+        self.changes_listener = change_feed.subscribe(SUPPLIERS, self.main_app.tasks.on_main_thread(self.on_suppliers_changed))
     
     def pack(self, **kwargs):
         self.frame.pack(**kwargs)
     
     def destroy(self):
+        change_feed.unsubscribe(SUPPLIERS, self.changes_listener)
+        self.changes_listener.close()
         self.frame.destroy()
 
     def refresh_suppliers(self):
-        for i in self.supplier_tree.get_children():
-            self.supplier_tree.delete(i)
-        from models import SupplierRepository
-        for s in SupplierRepository.get_all():
-            self.supplier_tree.insert('', 'end', values=(s.id, s.name, s.cnpj, s.seller_name))
+        self.supplier_rows.clear()
+        self.supplier_rows.append(SupplierRepository.get_all())
+        # atualizar lista para outras partes
+        self.main_app.load_suppliers()
+
+    def on_suppliers_changed(self, event):
+        """Aplica na lista apenas os fornecedores alterados"""
+        for supplier_id in event.ids:
+            supplier = None if event.action == DELETE else SupplierRepository.get_by_id(supplier_id)
+            if supplier is None:
+                self.supplier_rows.remove(supplier_id)
+            else:
+                self.supplier_rows.upsert(supplier)
         # atualizar lista para outras partes
         self.main_app.load_suppliers()
 
@@ -948,7 +1185,6 @@ class SuppliersView:
                 messagebox.showinfo("Sucesso", "Fornecedor criado")
             else:
                 messagebox.showerror("Erro", "Falha ao criar fornecedor")
-        self.refresh_suppliers()
         self.clear_form()
 
     def delete_selected(self):
@@ -958,10 +1194,14 @@ class SuppliersView:
             return
         vals = self.supplier_tree.item(sel[0], 'values')
         from models import SupplierRepository
+        item_count = SupplierRepository.get_item_count(int(vals[0]))
+        if item_count:
+            messagebox.showwarning("Aviso", f"O fornecedor tem preços em {item_count} itens.\n"
+                                            "Remova esses preços dos itens antes de excluí-lo.")
+            return
         if messagebox.askyesno("Confirmar", f"Excluir fornecedor ID {vals[0]}?"):
             if SupplierRepository.delete(int(vals[0])):
                 messagebox.showinfo("Sucesso", "Fornecedor excluído")
-                self.refresh_suppliers()
             else:
                 messagebox.showerror("Erro", "Falha ao excluir fornecedor")
 